@@ -1,28 +1,22 @@
 """
 Script pour analyser le fichier de données combiné.
-"""
-import pandas as pd
 
-# Charger le fichier CSV
-print("Chargement du fichier...")
-df = pd.read_csv('data/processed/combined_data.csv')
+Les données sont lues dans la base analytique publiée par le pipeline
+(``data_processing.panel_store``): seules les colonnes analysées et, si des
+filtres sont donnés, les lignes des régions et années retenues sont chargées;
+les moyennes par région sont lues dans le cube d'agrégats de la base.
 
-# Afficher des informations générales
-print(f"\nInformations générales:")
-print(f"- Nombre total de lignes: {len(df)}")
-print(f"- Nombre total de colonnes: {len(df.columns)}")
-
-# Liste des colonnes
-print(f"\nColonnes disponibles: {', '.join(df.columns)}")
-
-# Statistiques sur les pays et années
-print(f"\nStatistiques:")
-print(f"- Nombre de pays uniques: {df['country_name'].nunique()}")
-print(f"- Années couvertes: {sorted(df['year'].unique())}")
+Utilisation:
+    python analyze_data.py [--region Africa Asia] [--min-year 2015] [--max-year 2020]
+"""
+import argparse
+from data_processing.panel_store import query_panel, cube_means
 
-# Afficher quelques lignes d'exemple
-print("\nAperçu du jeu de données:")
-print(df.head(3).to_string())
+parser = argparse.ArgumentParser(description="Analyse du fichier de données combiné")
+parser.add_argument('--region', nargs='+', help="Régions analysées (toutes par défaut)")
+parser.add_argument('--min-year', type=int, help="Première année analysée")
+parser.add_argument('--max-year', type=int, help="Dernière année analysée")
+args = parser.parse_args()
 
 # Statistiques descriptives pour les indicateurs numériques principaux
 numeric_cols = [
@@ -52,16 +46,7 @@ numeric_cols = [
     'fertility_rate'
 ]
 
-print("\nStatistiques descriptives des indicateurs principaux:")
-print(df[numeric_cols].describe().round(2).to_string())
-
-# Afficher un échantillon diversifié
-print("\nÉchantillon diversifié (différents pays):")
-sample = df.groupby('country_name').first().reset_index().head(5)
-print(sample[['country_name', 'region', 'primary_enrollment_rate', 'gni_per_capita', 'total_population']].to_string())
-
-# Analyse des corrélations entre les indicateurs clés
-print("\nCorrélations entre les indicateurs clés:")
+# Indicateurs clés pour l'analyse des corrélations
 key_indicators = [
     'primary_enrollment_rate',
     'secondary_enrollment_rate',
@@ -71,5 +56,47 @@ key_indicators = [
     'poverty_rate_1.9',
     'life_expectancy'
 ]
+
+# Filtres sur les régions et les années
+filters = {'regions': args.region, 'min_year': args.min_year, 'max_year': args.max_year}
+
+# Charger uniquement les colonnes analysées (les indicateurs absents de la base sont ignorés)
+print("Chargement des données...")
+df = query_panel(['country_code', 'region', 'year'] + numeric_cols, **filters)
+numeric_cols = [col for col in numeric_cols if col in df.columns]
+key_indicators = [col for col in key_indicators if col in df.columns]
+
+# Afficher des informations générales
+print(f"\nInformations générales:")
+print(f"- Nombre total de lignes: {len(df)}")
+print(f"- Nombre total de colonnes: {len(df.columns)}")
+
+# Liste des colonnes
+print(f"\nColonnes disponibles: {', '.join(df.columns)}")
+
+# Statistiques sur les pays et années
+print(f"\nStatistiques:")
+print(f"- Nombre de pays uniques: {df['country_code'].nunique()}")
+print(f"- Années couvertes: {sorted(df['year'].unique())}")
+
+# Afficher quelques lignes d'exemple
+print("\nAperçu du jeu de données:")
+print(df.head(3).to_string())
+
+print("\nStatistiques descriptives des indicateurs principaux:")
+print(df[numeric_cols].describe().round(2).to_string())
+
+print("\nMoyennes par région:")
+print(cube_means(numeric_cols, by=('region',), **filters).round(2).to_string(index=False))
+
+# Afficher un échantillon diversifié
+print("\nÉchantillon diversifié (différents pays):")
+sample = df.groupby('country_code', observed=True).first().reset_index().head(5)
+sample_cols = [col for col in ['country_code', 'region', 'primary_enrollment_rate', 'gni_per_capita', 'total_population']
+               if col in sample.columns]
+print(sample[sample_cols].to_string())
+
+# Analyse des corrélations entre les indicateurs clés
+print("\nCorrélations entre les indicateurs clés:")
 correlation_matrix = df[key_indicators].corr().round(2)
-print(correlation_matrix.to_string()) 
\ No newline at end of file
+print(correlation_matrix.to_string())
\ No newline at end of file
@@ -0,0 +1 @@
+"""Outils de mesure des performances des collecteurs."""
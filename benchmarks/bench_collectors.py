@@ -0,0 +1,145 @@
+"""
+Banc d'essai des collecteurs contre le serveur API simulé.
+
+Mesure, pour chaque mode de collecte, le nombre de requêtes servies, le débit
+(requêtes/s), la durée totale et le pic mémoire Python (tracemalloc), de façon
+reproductible et sans accès aux API réelles.
+
+Utilisation:
+    python benchmarks/bench_collectors.py --modes batch async --latency 0.05
+"""
+import os
+import gc
+import json
+import shutil
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_api_server import start_mock_server
+from config import UNESCO_SOURCE_FILES
+from data_collectors import worldbank_collector, uis_sdmx_collector
+from data_collectors.http_cache import http_cache
+from data_collectors import rate_control
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def measure(name, server, results):
+    """
+    Mesure la durée, le pic mémoire et les requêtes servies d'un bloc de code.
+    """
+    gc.collect()
+    requests_before = server.RequestHandlerClass.state.request_count
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        request_count = server.RequestHandlerClass.state.request_count - requests_before
+        results.append({
+            'collector': name,
+            'requests': request_count,
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(request_count / elapsed, 2) if elapsed else None,
+            'peak_memory_mb': round(peak / 1024 ** 2, 2)
+        })
+
+def bench_worldbank(mode, base_url, server, results, countries=None, years=None):
+    """
+    Exécute la collecte World Bank dans le mode demandé contre le serveur simulé.
+    """
+    worldbank_collector.WORLDBANK_API_URL = f"{base_url}/v2"
+    rate_control.run_budget.restart()
+    with measure(f"worldbank:{mode}", server, results):
+        if mode == 'async':
+            df = asyncio.run(worldbank_collector.get_worldbank_data_async(countries=countries, years=years))
+        else:
+            df = worldbank_collector.get_worldbank_data(countries=countries, years=years, batch=(mode == 'batch'))
+    results[-1]['rows'] = len(df)
+
+def bench_unesco(base_url, server, results):
+    """
+    Exécute la collecte UIS SDMX contre le serveur simulé, sur des copies
+    temporaires des extraits UIS pour ne pas modifier ceux du dépôt.
+    """
+    uis_sdmx_collector.UNESCO_BASE_URL = f"{base_url}/sdmx"
+    rate_control.run_budget.restart()
+    output_dir = tempfile.mkdtemp()
+    try:
+        output_files = {}
+        for column, path in UNESCO_SOURCE_FILES.items():
+            output_files[column] = os.path.join(output_dir, os.path.basename(path))
+            shutil.copy(path, output_files[column])
+        with measure("unesco:sdmx", server, results):
+            rows = asyncio.run(uis_sdmx_collector.collect_uis_sdmx_async(output_files=output_files))
+    finally:
+        shutil.rmtree(output_dir)
+    results[-1]['rows'] = sum(rows.values())
+
+def print_results(results):
+    """
+    Affiche les résultats sous forme de tableau.
+    """
+    header = f"{'collecteur':<20}{'requêtes':>10}{'req/s':>10}{'durée (s)':>12}{'pic mém. (Mo)':>16}{'lignes':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        rps = result['requests_per_second'] if result['requests_per_second'] is not None else '-'
+        print(f"{result['collector']:<20}{result['requests']:>10}{rps:>10}{result['seconds']:>12}"
+              f"{result['peak_memory_mb']:>16}{result.get('rows', '-'):>10}")
+
+def main():
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Banc d'essai des collecteurs contre le serveur API simulé")
+    parser.add_argument('--modes', nargs='+', default=['batch', 'async'], choices=['unit', 'batch', 'async'],
+                        help="Modes de collecte World Bank à mesurer")
+    parser.add_argument('--countries', type=int, default=None,
+                        help="Limiter la collecte aux N premiers pays (utile pour le mode unitaire)")
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help="Débit maximal par hôte (requêtes/s), par défaut RATE_LIMIT")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence moyenne injectée (secondes)")
+    parser.add_argument('--error-rate-429', type=float, default=0.0)
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0)
+    parser.add_argument('--use-cache', action='store_true', help="Laisser le cache HTTP disque actif")
+    parser.add_argument('--skip-unesco', action='store_true')
+    parser.add_argument('--json', help="Écrire les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        latency=args.latency, error_rate_429=args.error_rate_429, error_rate_5xx=args.error_rate_5xx
+    )
+    http_cache.enabled = args.use_cache
+    if args.rate_limit:
+        rate_control.host_controller(base_url, max_rate=args.rate_limit)
+
+    _, countries, years = worldbank_collector.resolve_collection_params()
+    if args.countries:
+        countries = countries[:args.countries]
+
+    results = []
+    for mode in args.modes:
+        bench_worldbank(mode, base_url, server, results, countries=countries, years=years)
+    if not args.skip_unesco:
+        bench_unesco(base_url, server, results)
+    server.shutdown()
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Serveur HTTP local imitant les API World Bank v2 et UIS (SDMX) à partir des
+données brutes enregistrées dans ``data/raw``.
+
+Il permet de mesurer et de tester les collecteurs sans accéder aux API réelles:
+pagination World Bank, latence injectée et erreurs 429/5xx configurables.
+
+Utilisation:
+    python benchmarks/mock_api_server.py --port 8000 --latency 0.05 --error-rate-429 0.02
+"""
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import WORLDBANK_RAW_FILE, UNESCO_SOURCE_FILES, UNESCO_INDICATOR_KEYS, UNESCO_AREA_DIMENSION
+from data_collectors.worldbank_collector import DEFAULT_INDICATORS
+
+logger = logging.getLogger(__name__)
+
+# Extraits UIS enregistrés servis par le point d'accès SDMX
+UIS_RECORDED_FILES = list(UNESCO_SOURCE_FILES.values())
+
+# Dimensions de la structure (DSD) du flux UIS EDU_NON_FINANCE, dans l'ordre de la clé SDMX
+UIS_DIMENSIONS = ['STAT_UNIT', 'UNIT_MEASURE', 'EDU_LEVEL', 'EDU_CAT', 'SEX', 'AGE', 'GRADE', 'SECTOR_EDU',
+                  'EDU_ATTAIN', 'WEALTH_QUINTILE', 'LOCATION', 'EDU_TYPE', 'EDU_FIELD', 'SE_BKGRD',
+                  'SOURCE_FUND', 'FUND_FLOW', 'IMM_STATUS', 'REF_AREA']
+
+SDMX_CSV_COLUMNS = ['DATAFLOW'] + UIS_DIMENSIONS + ['TIME_PERIOD', 'OBS_VALUE', 'OBS_STATUS', 'UNIT_MULT']
+
+def load_worldbank_records(path=WORLDBANK_RAW_FILE, indicators=DEFAULT_INDICATORS):
+    """
+    Charge les valeurs World Bank enregistrées.
+
+    Returns:
+        dict: {code indicateur: {(code pays, année): valeur}}
+    """
+    df = pd.read_csv(path)
+    records = {}
+    for code, column in indicators.items():
+        if column in df.columns:
+            series = df.set_index(['country_code', 'year'])[column].dropna()
+            records[code] = {key: float(value) for key, value in series.items()}
+        else:
+            records[code] = {}
+    return records
+
+def load_uis_records(paths=UIS_RECORDED_FILES):
+    """
+    Charge les observations UIS enregistrées au format long et leur associe
+    les codes des dimensions SDMX de leur indicateur (``_Z`` pour les
+    dimensions qui ne le caractérisent pas).
+
+    Returns:
+        pandas.DataFrame: Colonnes indicatorId, geoUnit, year, value, qualifier,
+        magnitude et une colonne par dimension de UIS_DIMENSIONS
+    """
+    frames = [pd.read_csv(path, dtype={'qualifier': str, 'magnitude': str}) for path in paths if os.path.exists(path)]
+    df = pd.concat(frames, ignore_index=True)
+    for dimension in UIS_DIMENSIONS:
+        if dimension == UNESCO_AREA_DIMENSION:
+            df[dimension] = df['geoUnit']
+        else:
+            df[dimension] = df['indicatorId'].map(
+                lambda indicator_id: UNESCO_INDICATOR_KEYS.get(indicator_id, {}).get(dimension, '_Z'))
+    return df
+
+class MockApiState:
+    """
+    Données servies et paramètres d'injection de pannes du serveur simulé.
+
+    Args:
+        latency (float, optional): Latence ajoutée à chaque réponse (secondes)
+        error_rate_429 (float, optional): Proportion de réponses 429
+        error_rate_5xx (float, optional): Proportion de réponses 503
+        retry_after (int, optional): Valeur de l'en-tête ``Retry-After`` des 429
+        seed (int, optional): Graine du générateur aléatoire
+    """
+
+    def __init__(self, latency=0.0, error_rate_429=0.0, error_rate_5xx=0.0, retry_after=1, seed=0):
+        self.latency = latency
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.worldbank = load_worldbank_records()
+        self.uis = load_uis_records()
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def next_fault(self):
+        """
+        Tire au sort une éventuelle erreur à injecter.
+
+        Returns:
+            int: Statut d'erreur (429 ou 503), ou None
+        """
+        with self._lock:
+            self.request_count += 1
+            draw = self.random.random()
+        if draw < self.error_rate_429:
+            return 429
+        if draw < self.error_rate_429 + self.error_rate_5xx:
+            return 503
+        return None
+
+def parse_years(date_param):
+    """
+    Interprète le paramètre ``date`` de l'API World Bank (``2015`` ou ``2013:2022``).
+    """
+    bounds = date_param.split(':')
+    return list(range(int(bounds[0]), int(bounds[-1]) + 1))
+
+def worldbank_response(state, countries, indicator_code, query):
+    """
+    Construit une page de réponse World Bank v2 au format JSON.
+    """
+    years = parse_years(query.get('date', '2013:2022'))
+    per_page = int(query.get('per_page', 50))
+    page = int(query.get('page', 1))
+    values = state.worldbank.get(indicator_code, {})
+
+    records = [
+        {
+            'indicator': {'id': indicator_code, 'value': indicator_code},
+            'country': {'id': country, 'value': country},
+            'countryiso3code': '',
+            'date': str(year),
+            'value': values.get((country, year)),
+            'unit': '',
+            'obs_status': '',
+            'decimal': 1
+        }
+        for country in countries
+        for year in sorted(years, reverse=True)
+    ]
+    pages = max(1, -(-len(records) // per_page))
+    meta = {
+        'page': page,
+        'pages': pages,
+        'per_page': per_page,
+        'total': len(records),
+        'sourceid': '2',
+        'lastupdated': '2024-01-01'
+    }
+    return [meta, records[(page - 1) * per_page:page * per_page] or None]
+
+def sdmx_structure_response():
+    """
+    Construit la réponse SDMX-JSON d'une requête de structure du flux
+    (``dataflow/...?references=datastructure``): la liste ordonnée des dimensions.
+    """
+    dimensions = [{'id': dimension, 'position': position} for position, dimension in enumerate(UIS_DIMENSIONS)]
+    return {'data': {'dataStructures': [{
+        'id': 'EDU_NON_FINANCE',
+        'agencyID': 'UNESCO',
+        'version': '3.0',
+        'dataStructureComponents': {'dimensionList': {
+            'dimensions': dimensions,
+            'timeDimensions': [{'id': 'TIME_PERIOD', 'position': len(UIS_DIMENSIONS)}]
+        }}
+    }]}}
+
+def sdmx_csv_response(state, key, query):
+    """
+    Construit une réponse SDMX-CSV pour une clé SDMX: un segment par dimension
+    de UIS_DIMENSIONS, séparés par des points, chaque segment acceptant
+    plusieurs codes séparés par ``+`` (vide = toutes les valeurs).
+
+    Returns:
+        tuple: (statut HTTP, corps de la réponse)
+    """
+    segments = key.split('.')
+    if len(segments) != len(UIS_DIMENSIONS):
+        return 400, f"Clé SDMX invalide: {len(segments)} dimensions au lieu de {len(UIS_DIMENSIONS)}\n"
+    df = state.uis
+    mask = pd.Series(True, index=df.index)
+    for dimension, segment in zip(UIS_DIMENSIONS, segments):
+        codes = set(filter(None, segment.split('+')))
+        if codes:
+            mask &= df[dimension].isin(codes)
+    if 'startPeriod' in query:
+        mask &= df['year'] >= int(query['startPeriod'])
+    if 'endPeriod' in query:
+        mask &= df['year'] <= int(query['endPeriod'])
+    selected = df[mask]
+
+    lines = [','.join(SDMX_CSV_COLUMNS)]
+    for row in selected.to_dict('records'):
+        lines.append(','.join(
+            ['UNESCO:EDU_NON_FINANCE(3.0)']
+            + [row[dimension] for dimension in UIS_DIMENSIONS]
+            + [str(row['year']), repr(float(row['value'])),
+               row['qualifier'] if isinstance(row['qualifier'], str) else '',
+               row['magnitude'] if isinstance(row['magnitude'], str) else '']
+        ))
+    return 200, '\n'.join(lines) + '\n'
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """
+    Gestionnaire des requêtes du serveur simulé (HTTP/1.1 keep-alive).
+    """
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, status, body, content_type, headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.state._lock:
+            self.state.bytes_sent += len(payload)
+
+    def do_GET(self):
+        state = self.state
+        if state.latency:
+            time.sleep(state.latency * (0.5 + state.random.random()))
+
+        fault = state.next_fault()
+        if fault == 429:
+            self._send(429, '', 'text/plain', {'Retry-After': str(state.retry_after)})
+            return
+        if fault == 503:
+            self._send(503, '', 'text/plain')
+            return
+
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+
+        # /v2/country/{pays}/indicator/{indicateur}
+        if len(parts) == 5 and parts[0] == 'v2' and parts[1] == 'country' and parts[3] == 'indicator':
+            body = worldbank_response(state, parts[2].split(';'), parts[4], query)
+            self._send(200, json.dumps(body), 'application/json')
+        # /sdmx/dataflow/{agence}/{flux}/{version}: structure du flux
+        elif len(parts) == 5 and parts[0] == 'sdmx' and parts[1] == 'dataflow':
+            self._send(200, json.dumps(sdmx_structure_response()), 'application/vnd.sdmx.structure+json')
+        # /sdmx/data/{flux}/{clé}
+        elif len(parts) >= 3 and parts[0] == 'sdmx' and parts[1] == 'data':
+            key = parts[3] if len(parts) > 3 else ''
+            status, body = sdmx_csv_response(state, key, query)
+            self._send(status, body, 'application/vnd.sdmx.data+csv')
+        else:
+            self._send(404, json.dumps([{'message': [{'id': '120', 'value': 'Invalid endpoint'}]}]),
+                       'application/json')
+
+def start_mock_server(host='127.0.0.1', port=0, **options):
+    """
+    Démarre le serveur simulé dans un thread d'arrière-plan.
+
+    Args:
+        host (str, optional): Adresse d'écoute
+        port (int, optional): Port d'écoute (0 = port libre choisi par le système)
+        **options: Paramètres de ``MockApiState``
+
+    Returns:
+        tuple: (serveur, URL de base ``http://hôte:port``)
+    """
+    handler = type('BoundMockApiHandler', (MockApiHandler,), {'state': MockApiState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://{host}:{server.server_address[1]}"
+    logger.info(f"Serveur API simulé démarré sur {base_url}")
+    return server, base_url
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Serveur local simulant les API World Bank et UIS")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence moyenne injectée (secondes)")
+    parser.add_argument('--error-rate-429', type=float, default=0.0, help="Proportion de réponses 429")
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0, help="Proportion de réponses 503")
+    parser.add_argument('--retry-after', type=int, default=1, help="Valeur de Retry-After des réponses 429")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        args.host, args.port, latency=args.latency, error_rate_429=args.error_rate_429,
+        error_rate_5xx=args.error_rate_5xx, retry_after=args.retry_after
+    )
+    logger.info(f"World Bank: {base_url}/v2 - UIS: {base_url}/sdmx")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -32,12 +32,91 @@ WORLDBANK_APP_KEY = os.getenv("WORLDBANK_APP_KEY", "demo")
 REQUEST_TIMEOUT = 30  # secondes
 MAX_RETRIES = 3
 RATE_LIMIT = 5  # Nombre maximal de requêtes par seconde
+MAX_CONCURRENT_REQUESTS = 10  # Nombre maximal de requêtes simultanées (moteur asynchrone)
+
+# Contrôle adaptatif du débit et tolérance aux pannes
+MIN_RATE_LIMIT = 0.5  # Débit plancher (requêtes par seconde) après ralentissements
+RATE_RECOVERY_STEP = 0.1  # Hausse du débit après chaque réponse réussie
+RETRY_BACKOFF_BASE = 1  # secondes, backoff exponentiel avec gigue
+RETRY_BACKOFF_CAP = 60  # secondes, délai maximal entre deux tentatives
+COLLECTION_DEADLINE = 2 * 3600  # secondes, budget de temps d'une collecte
+CIRCUIT_FAILURE_THRESHOLD = 5  # Échecs consécutifs avant ouverture du disjoncteur
+CIRCUIT_COOLDOWN = 60  # secondes de suspension lorsque le disjoncteur est ouvert
+CIRCUIT_PROBE_WAIT = 1  # secondes d'attente des autres requêtes pendant la requête d'essai
+
+# Collecte groupée World Bank (plusieurs pays et plage d'années par requête)
+WORLDBANK_BATCH_COUNTRIES = 50  # Nombre de pays par requête (limite la longueur de l'URL)
+WORLDBANK_PER_PAGE = 1000  # Nombre d'observations par page de résultats
+
+# Collecte UIS via l'API SDMX (plusieurs indicateurs et pays par requête)
+UNESCO_DATAFLOW = "UNESCO,EDU_NON_FINANCE,3.0"  # Flux SDMX interrogé
+UNESCO_AREA_DIMENSION = "REF_AREA"  # Dimension des pays dans la structure (DSD) du flux
+UNESCO_BATCH_COUNTRIES = 50  # Nombre de pays par requête (limite la longueur de l'URL)
+
+# Années récentes encore susceptibles d'être révisées par les sources
+REVISABLE_YEARS = 2
+
+# Cache disque des réponses HTTP
+HTTP_CACHE_DIR = RAW_DATA_DIR / ".http_cache"
+HTTP_CACHE_TTL = 24 * 3600  # secondes, pour les réponses couvrant des années révisables
+HTTP_CACHE_CLOSED_TTL = 365 * 24 * 3600  # secondes, pour les années closes
+HTTP_CACHE_MAX_BYTES = 500 * 1024 * 1024  # taille maximale avant éviction LRU
 
 # Chemins des fichiers de sortie
 UNESCO_RAW_FILE = RAW_DATA_DIR / "unesco_data.csv"
 WORLDBANK_RAW_FILE = RAW_DATA_DIR / "worldbank_data2.csv"  # Updated to match actual filename
+WORLDBANK_JOURNAL_FILE = RAW_DATA_DIR / "worldbank_data2.journal.jsonl"  # Journal de reprise de la collecte
+WORLDBANK_ABSENT_FILE = RAW_DATA_DIR / "worldbank_data2.absent.csv"  # Cellules d'années closes absentes de la source (--delta)
+WDI_BULK_ARCHIVE = RAW_DATA_DIR / "WDI_CSV.zip"  # Archive CSV en masse WDI/EdStats (téléchargement manuel)
+BULK_CHUNK_ROWS = 50000  # Nombre de lignes lues par bloc dans les archives en masse
+JOURNAL_FLUSH_EVERY = 20  # Nombre d'unités (pays, indicateur) par lot synchronisé sur disque
+
+# Extraits UIS téléchargés (format long: indicatorId, geoUnit, year, value, qualifier, magnitude)
+UNESCO_SOURCE_FILES = {
+    'free_education_years': RAW_DATA_DIR / "free_education.csv",
+    'inbound_mobility_rate': RAW_DATA_DIR / "taux_mobilité_entrant.csv",
+    'outbound_mobility_rate': RAW_DATA_DIR / "taux_mobilité_sortant.csv",
+}
+# Indicateurs UIS et colonne correspondante dans les données combinées
+UNESCO_INDICATORS = {
+    'YEARS.FC.FREE.1T3': 'free_education_years',  # Années d'éducation gratuite
+    'MSEP.5T8': 'inbound_mobility_rate',  # Taux de mobilité entrante (tertiaire)
+    'MOR.5T8.40510': 'outbound_mobility_rate',  # Taux de mobilité sortante (tertiaire)
+}
+# Codes SDMX identifiant chaque indicateur UIS dans le flux UNESCO_DATAFLOW
+# (un code par dimension; les dimensions non listées prennent toutes leurs valeurs)
+UNESCO_INDICATOR_KEYS = {
+    'YEARS.FC.FREE.1T3': {'STAT_UNIT': 'YEARS_FREE', 'EDU_LEVEL': 'L1T3'},
+    'MSEP.5T8': {'STAT_UNIT': 'MSEP', 'EDU_LEVEL': 'L5T8'},
+    'MOR.5T8.40510': {'STAT_UNIT': 'MOR', 'EDU_LEVEL': 'L5T8'},
+}
 
 FINAL_OUTPUT_FILE = PROCESSED_DATA_DIR / "combined_data.csv"
+QUARANTINE_FILE = PROCESSED_DATA_DIR / "quarantine.csv"  # Cellules rejetées par la validation
+STAGE_CACHE_DIR = PROCESSED_DATA_DIR / ".stage_cache"  # Résultats des étapes du pipeline, par empreinte des entrées
+PANEL_CHANGES_FILE = PROCESSED_DATA_DIR / "panel_changes.csv"  # Clés modifiées à chaque mise à jour du panel
+ANALYTICS_DB_FILE = PROCESSED_DATA_DIR / "panel.sqlite"  # Base analytique interrogée par le dashboard et analyze_data.py
+FILTER_CACHE_ENTRIES = 16  # Sélections région/période conservées par le dashboard (cache LRU)
+FIGURE_CACHE_MB = 64  # Taille maximale des figures sérialisées conservées par le dashboard (cache LRU)
+
+# Cube d'agrégats publié dans la base analytique: effectif, somme, moyenne,
+# médiane et quantiles de chaque indicateur par (année, région) et, si
+# CUBE_BY_COUNTRY, par pays sur toute la période
+CUBE_QUANTILES = [0.25, 0.75]
+CUBE_BY_COUNTRY = True
+
+# Droites de régression des graphiques du dashboard
+TRENDLINE_CONFIDENCE = 0.95  # Niveau des bandes de confiance
+TRENDLINE_POINTS = 50  # Points d'évaluation de chaque droite et de sa bande
+
+# Jeux de données Parquet écrits en plus des fichiers CSV, partitionnés par
+# région et année (répertoires region=.../year=...)
+UNESCO_RAW_DATASET = RAW_DATA_DIR / "unesco_data.parquet"
+WORLDBANK_RAW_DATASET = RAW_DATA_DIR / "worldbank_data2.parquet"
+FINAL_OUTPUT_DATASET = PROCESSED_DATA_DIR / "combined_data.parquet"
+PARTITION_COLUMNS = ['region', 'year']
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_ROW_GROUP_ROWS = 100000  # Lignes minimales par groupe de lignes (évite les petits groupes lents à lire)
 
 # Mappings des noms de pays pour l'homogénéisation
 
@@ -62,4 +141,30 @@ FINAL_COLUMNS = [
     'total_population',
     'life_expectancy',
     'fertility_rate'
-]
\ No newline at end of file
+]
+
+# Schéma des colonnes (sources brutes et fichier final), appliqué à chaque
+# lecture et écriture: catégories pour les codes, int16 pour les années et
+# float32 lorsque la précision suffit
+COLUMN_SCHEMA = {
+    'country_code': 'category',
+    'country_name': 'category',
+    'region': 'category',
+    'year': 'int16',
+    'free_education_years': 'float32',
+    'inbound_mobility_rate': 'float32',
+    'outbound_mobility_rate': 'float32',
+    'education_expenditure_gdp': 'float32',
+    'student_teacher_ratio_primary': 'float32',
+    'primary_completion_rate': 'float32',
+    'school_life_expectancy': 'float32',
+    'gender_ratio_primary': 'float32',
+    'gender_ratio_secondary': 'float32',
+    'gender_ratio_tertiary': 'float32',
+    'gni_per_capita': 'float32',
+    'poverty_rate_1.9': 'float32',
+    'public_expenditure_per_student': 'float32',
+    'total_population': 'float64',  # Dépasse la précision de float32 (7 chiffres)
+    'life_expectancy': 'float32',
+    'fertility_rate': 'float32'
+}
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Référentiel des pays du projet: codes ISO-2, ISO-3, nom et région.
+
+Toutes les conversions de codes et l'affectation des régions passent par ce
+module. Les correspondances sont stockées sous forme de tableaux (colonnes
+catégorielles) et appliquées par jointures vectorisées: les valeurs distinctes
+d'une colonne sont résolues une seule fois, puis propagées à toutes les lignes.
+"""
+import numpy as np
+import pandas as pd
+
+AFRICA = 'Africa'
+ASIA = 'Asia'
+EUROPE = 'Europe'
+OTHER = 'Other'
+REGIONS = [AFRICA, ASIA, EUROPE]
+
+# (ISO-2, ISO-3, nom, région)
+_COUNTRIES = [
+    # African countries
+    ('DZ', 'DZA', 'Algeria', AFRICA),
+    ('AO', 'AGO', 'Angola', AFRICA),
+    ('BJ', 'BEN', 'Benin', AFRICA),
+    ('BW', 'BWA', 'Botswana', AFRICA),
+    ('BF', 'BFA', 'Burkina Faso', AFRICA),
+    ('BI', 'BDI', 'Burundi', AFRICA),
+    ('CM', 'CMR', 'Cameroon', AFRICA),
+    ('CV', 'CPV', 'Cape Verde', AFRICA),
+    ('CF', 'CAF', 'Central African Republic', AFRICA),
+    ('TD', 'TCD', 'Chad', AFRICA),
+    ('KM', 'COM', 'Comoros', AFRICA),
+    ('CG', 'COG', 'Congo', AFRICA),
+    ('CD', 'COD', 'DR Congo', AFRICA),
+    ('DJ', 'DJI', 'Djibouti', AFRICA),
+    ('EG', 'EGY', 'Egypt', AFRICA),
+    ('GQ', 'GNQ', 'Equatorial Guinea', AFRICA),
+    ('ER', 'ERI', 'Eritrea', AFRICA),
+    ('ET', 'ETH', 'Ethiopia', AFRICA),
+    ('GA', 'GAB', 'Gabon', AFRICA),
+    ('GM', 'GMB', 'Gambia', AFRICA),
+    ('GH', 'GHA', 'Ghana', AFRICA),
+    ('GN', 'GIN', 'Guinea', AFRICA),
+    ('GW', 'GNB', 'Guinea-Bissau', AFRICA),
+    ('CI', 'CIV', 'Ivory Coast', AFRICA),
+    ('KE', 'KEN', 'Kenya', AFRICA),
+    ('LS', 'LSO', 'Lesotho', AFRICA),
+    ('LR', 'LBR', 'Liberia', AFRICA),
+    ('LY', 'LBY', 'Libya', AFRICA),
+    ('MG', 'MDG', 'Madagascar', AFRICA),
+    ('MW', 'MWI', 'Malawi', AFRICA),
+    ('ML', 'MLI', 'Mali', AFRICA),
+    ('MR', 'MRT', 'Mauritania', AFRICA),
+    ('MU', 'MUS', 'Mauritius', AFRICA),
+    ('MA', 'MAR', 'Morocco', AFRICA),
+    ('MZ', 'MOZ', 'Mozambique', AFRICA),
+    ('NA', 'NAM', 'Namibia', AFRICA),
+    ('NE', 'NER', 'Niger', AFRICA),
+    ('NG', 'NGA', 'Nigeria', AFRICA),
+    ('RW', 'RWA', 'Rwanda', AFRICA),
+    ('ST', 'STP', 'Sao Tome and Principe', AFRICA),
+    ('SN', 'SEN', 'Senegal', AFRICA),
+    ('SC', 'SYC', 'Seychelles', AFRICA),
+    ('SL', 'SLE', 'Sierra Leone', AFRICA),
+    ('SO', 'SOM', 'Somalia', AFRICA),
+    ('ZA', 'ZAF', 'South Africa', AFRICA),
+    ('SS', 'SSD', 'South Sudan', AFRICA),
+    ('SD', 'SDN', 'Sudan', AFRICA),
+    ('SZ', 'SWZ', 'Eswatini (Swaziland)', AFRICA),
+    ('TZ', 'TZA', 'Tanzania', AFRICA),
+    ('TG', 'TGO', 'Togo', AFRICA),
+    ('TN', 'TUN', 'Tunisia', AFRICA),
+    ('UG', 'UGA', 'Uganda', AFRICA),
+    ('ZM', 'ZMB', 'Zambia', AFRICA),
+    ('ZW', 'ZWE', 'Zimbabwe', AFRICA),
+
+    # Asian countries
+    ('AF', 'AFG', 'Afghanistan', ASIA),
+    ('AM', 'ARM', 'Armenia', ASIA),
+    ('AZ', 'AZE', 'Azerbaijan', ASIA),
+    ('BH', 'BHR', 'Bahrain', ASIA),
+    ('BD', 'BGD', 'Bangladesh', ASIA),
+    ('BT', 'BTN', 'Bhutan', ASIA),
+    ('BN', 'BRN', 'Brunei', ASIA),
+    ('KH', 'KHM', 'Cambodia', ASIA),
+    ('CN', 'CHN', 'China', ASIA),
+    ('CY', 'CYP', 'Cyprus', ASIA),
+    ('GE', 'GEO', 'Georgia', ASIA),
+    ('HK', 'HKG', 'Hong Kong', ASIA),
+    ('IN', 'IND', 'India', ASIA),
+    ('ID', 'IDN', 'Indonesia', ASIA),
+    ('IR', 'IRN', 'Iran', ASIA),
+    ('IQ', 'IRQ', 'Iraq', ASIA),
+    ('IL', 'ISR', 'Israel', ASIA),
+    ('JP', 'JPN', 'Japan', ASIA),
+    ('JO', 'JOR', 'Jordan', ASIA),
+    ('KZ', 'KAZ', 'Kazakhstan', ASIA),
+    ('KW', 'KWT', 'Kuwait', ASIA),
+    ('KG', 'KGZ', 'Kyrgyzstan', ASIA),
+    ('LA', 'LAO', 'Laos', ASIA),
+    ('LB', 'LBN', 'Lebanon', ASIA),
+    ('MO', 'MAC', 'Macao', ASIA),
+    ('MY', 'MYS', 'Malaysia', ASIA),
+    ('MV', 'MDV', 'Maldives', ASIA),
+    ('MN', 'MNG', 'Mongolia', ASIA),
+    ('MM', 'MMR', 'Myanmar', ASIA),
+    ('NP', 'NPL', 'Nepal', ASIA),
+    ('OM', 'OMN', 'Oman', ASIA),
+    ('PK', 'PAK', 'Pakistan', ASIA),
+    ('PS', 'PSE', 'Palestine', ASIA),
+    ('PH', 'PHL', 'Philippines', ASIA),
+    ('QA', 'QAT', 'Qatar', ASIA),
+    ('SA', 'SAU', 'Saudi Arabia', ASIA),
+    ('SG', 'SGP', 'Singapore', ASIA),
+    ('KR', 'KOR', 'South Korea', ASIA),
+    ('LK', 'LKA', 'Sri Lanka', ASIA),
+    ('SY', 'SYR', 'Syria', ASIA),
+    ('TW', 'TWN', 'Taiwan', ASIA),
+    ('TJ', 'TJK', 'Tajikistan', ASIA),
+    ('TH', 'THA', 'Thailand', ASIA),
+    ('TL', 'TLS', 'Timor-Leste', ASIA),
+    ('TR', 'TUR', 'Turkey', ASIA),
+    ('TM', 'TKM', 'Turkmenistan', ASIA),
+    ('AE', 'ARE', 'United Arab Emirates', ASIA),
+    ('UZ', 'UZB', 'Uzbekistan', ASIA),
+    ('VN', 'VNM', 'Vietnam', ASIA),
+    ('YE', 'YEM', 'Yemen', ASIA),
+
+    # European countries
+    ('AL', 'ALB', 'Albania', EUROPE),
+    ('AD', 'AND', 'Andorra', EUROPE),
+    ('AT', 'AUT', 'Austria', EUROPE),
+    ('BY', 'BLR', 'Belarus', EUROPE),
+    ('BE', 'BEL', 'Belgium', EUROPE),
+    ('BA', 'BIH', 'Bosnia and Herzegovina', EUROPE),
+    ('BG', 'BGR', 'Bulgaria', EUROPE),
+    ('HR', 'HRV', 'Croatia', EUROPE),
+    ('CZ', 'CZE', 'Czech Republic', EUROPE),
+    ('DK', 'DNK', 'Denmark', EUROPE),
+    ('EE', 'EST', 'Estonia', EUROPE),
+    ('FI', 'FIN', 'Finland', EUROPE),
+    ('FR', 'FRA', 'France', EUROPE),
+    ('DE', 'DEU', 'Germany', EUROPE),
+    ('GR', 'GRC', 'Greece', EUROPE),
+    ('HU', 'HUN', 'Hungary', EUROPE),
+    ('IS', 'ISL', 'Iceland', EUROPE),
+    ('IE', 'IRL', 'Ireland', EUROPE),
+    ('IT', 'ITA', 'Italy', EUROPE),
+    ('LV', 'LVA', 'Latvia', EUROPE),
+    ('LI', 'LIE', 'Liechtenstein', EUROPE),
+    ('LT', 'LTU', 'Lithuania', EUROPE),
+    ('LU', 'LUX', 'Luxembourg', EUROPE),
+    ('MT', 'MLT', 'Malta', EUROPE),
+    ('MD', 'MDA', 'Moldova', EUROPE),
+    ('MC', 'MCO', 'Monaco', EUROPE),
+    ('ME', 'MNE', 'Montenegro', EUROPE),
+    ('NL', 'NLD', 'Netherlands', EUROPE),
+    ('MK', 'MKD', 'North Macedonia', EUROPE),
+    ('NO', 'NOR', 'Norway', EUROPE),
+    ('PL', 'POL', 'Poland', EUROPE),
+    ('PT', 'PRT', 'Portugal', EUROPE),
+    ('RO', 'ROU', 'Romania', EUROPE),
+    ('RU', 'RUS', 'Russia', EUROPE),
+    ('SM', 'SMR', 'San Marino', EUROPE),
+    ('RS', 'SRB', 'Serbia', EUROPE),
+    ('SK', 'SVK', 'Slovakia', EUROPE),
+    ('SI', 'SVN', 'Slovenia', EUROPE),
+    ('ES', 'ESP', 'Spain', EUROPE),
+    ('SE', 'SWE', 'Sweden', EUROPE),
+    ('CH', 'CHE', 'Switzerland', EUROPE),
+    ('UA', 'UKR', 'Ukraine', EUROPE),
+    ('GB', 'GBR', 'United Kingdom', EUROPE),
+    ('VA', 'VAT', 'Vatican City', EUROPE),
+]
+
+COUNTRIES = pd.DataFrame(_COUNTRIES, columns=['iso2', 'iso3', 'name', 'region']).astype({
+    'iso2': 'category',
+    'iso3': 'category',
+    'region': pd.CategoricalDtype(REGIONS + [OTHER])
+})
+
+# Index de recherche par type de code
+_INDEXES = {code: pd.Index(COUNTRIES[code].astype(str)) for code in ('iso2', 'iso3')}
+
+def countries_in_region(region, code='iso2'):
+    """
+    Retourne les codes des pays d'une région.
+
+    Args:
+        region (str): Nom de la région (AFRICA, ASIA, EUROPE)
+        code (str, optional): Type de code retourné ('iso2' ou 'iso3')
+
+    Returns:
+        list: Codes pays de la région, dans l'ordre du référentiel
+    """
+    return COUNTRIES.loc[COUNTRIES['region'] == region, code].astype(str).tolist()
+
+def _lookup(values, code):
+    """
+    Résout chaque valeur distincte une seule fois dans le référentiel.
+
+    Returns:
+        tuple: (valeurs d'entrée, positions dans le référentiel par ligne, -1 si inconnue)
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    row_codes, uniques = pd.factorize(values)
+    positions = _INDEXES[code].get_indexer(uniques)
+    row_positions = np.where(row_codes >= 0, positions[row_codes], -1)
+    return values, row_positions
+
+def convert_codes(values, source='iso2', target='iso3'):
+    """
+    Convertit des codes pays d'un format à l'autre.
+    Les codes inconnus du référentiel sont conservés tels quels.
+
+    Args:
+        values (array-like): Codes pays
+        source (str, optional): Format des codes d'entrée ('iso2' ou 'iso3')
+        target (str, optional): Format des codes de sortie ('iso2' ou 'iso3')
+
+    Returns:
+        pandas.Series: Codes convertis (même index que ``values`` si c'est une Series)
+    """
+    values, positions = _lookup(values, source)
+    converted = COUNTRIES[target].astype(str).to_numpy()[positions]
+    return values.where(positions < 0, converted)
+
+def region_of(values, code='iso2', default=OTHER):
+    """
+    Retourne la région de chaque code pays.
+
+    Args:
+        values (array-like): Codes pays
+        code (str, optional): Format des codes ('iso2' ou 'iso3')
+        default (str, optional): Région des codes inconnus du référentiel
+
+    Returns:
+        pandas.Series: Régions (catégorielles)
+    """
+    values, positions = _lookup(values, code)
+    region_codes = COUNTRIES['region'].cat.codes.to_numpy()[positions]
+    categories = COUNTRIES['region'].cat.categories
+    if default not in categories:
+        categories = categories.append(pd.Index([default]))
+    region_codes = np.where(positions >= 0, region_codes, categories.get_loc(default))
+    return pd.Series(pd.Categorical.from_codes(region_codes, categories), index=values.index)
@@ -3,9 +3,17 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import functools
 import seaborn as sns
 import matplotlib.pyplot as plt
 from pathlib import Path
+from config import FINAL_COLUMNS
+from country_registry import REGIONS
+from data_processing.schema import read_only, log_memory
+from data_processing.panel_store import query_panel, cube_means, store_version
+from data_processing.panel_filter import PanelFilter
+from data_processing.regression import fit_trendlines, trendline_band
+from data_processing.figure_cache import FigureCache
 
 # Configuration de la page avec un thème personnalisé
 st.set_page_config(
@@ -134,13 +142,58 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Copy-on-write: les sélections des sessions partagent les colonnes du panel
+# commun et ne copient que les colonnes qu'elles modifient
+pd.set_option('mode.copy_on_write', True)
+
 # Chargement des données
-@st.cache_data
-def load_data():
-    df = pd.read_csv('data/processed/combined_data.csv')
+@st.cache_resource(max_entries=1)
+def load_panel(version):
+    # Panel unique, en lecture seule, partagé par toutes les sessions (rechargé
+    # à chaque nouvelle version de la base). Trié par année puis région: une
+    # période sur toutes les régions est une plage contiguë de lignes.
+    st.cache_data.clear()
+    df = query_panel(FINAL_COLUMNS, regions=REGIONS).sort_values(['year', 'region', 'country_code'])
+    df = read_only(df.reset_index(drop=True))
+    log_memory(df, "Dashboard - panel partagé")
     return df
 
-df = load_data()
+@st.cache_resource(max_entries=1)
+def load_panel_filter(version):
+    # Index région/année et cache LRU des sélections, partagés par toutes les sessions
+    return PanelFilter(load_panel(version))
+
+@st.cache_resource(max_entries=1)
+def load_figure_cache(version):
+    # Figures sérialisées des helpers create_*, partagées par toutes les sessions
+    return FigureCache()
+
+@st.cache_data
+def load_aggregates(indicators, by=(), level='region', regions=None, countries=None, min_year=None, max_year=None):
+    # Moyennes lues dans le cube d'agrégats publié par le pipeline, sans parcourir les lignes du panel
+    return cube_means(list(indicators), by=by, level=level, regions=regions, countries=countries,
+                      min_year=min_year, max_year=max_year)
+
+# Couples (x, y, transformation de x) des graphiques avec droite de régression
+TRENDLINES = [
+    ('education_expenditure_gdp', 'primary_completion_rate', 'linear'),
+    ('free_education_years', 'school_life_expectancy', 'linear'),
+    ('gni_per_capita', 'school_life_expectancy', 'log')
+]
+
+@st.cache_data
+def load_trendlines(version, regions, min_year, max_year):
+    # Droites de régression par région de tous les graphiques, ajustées en une
+    # passe pour un état des filtres et partagées par les sessions
+    rows, _ = load_panel_filter(version).select(list(regions), min_year, max_year)
+    return fit_trendlines(rows, TRENDLINES)
+
+version = store_version()
+panel = load_panel(version)
+panel_filter = load_panel_filter(version)
+figure_cache = load_figure_cache(version)
+all_regions = panel_filter.regions
+years = panel_filter.years
 
 # En-tête du dashboard
 st.markdown("<h1 style='text-align: center; color: #2c3e50;'>🌍 Analyse de l'Éducation Mondiale</h1>", unsafe_allow_html=True)
@@ -150,7 +203,6 @@ st.markdown("<p style='text-align: center; color: #7f8c8d;'>Une exploration inte
 st.sidebar.markdown("## 🎯 Filtres")
 
 # Filtre des régions
-all_regions = sorted(df['region'].unique())
 selected_regions = st.sidebar.multiselect(
     "Sélectionner les régions",
     options=all_regions,
@@ -159,7 +211,6 @@ selected_regions = st.sidebar.multiselect(
 )
 
 # Filtre des années
-years = sorted(df['year'].unique())
 min_year, max_year = st.sidebar.select_slider(
     "Sélectionner la période",
     options=years,
@@ -168,10 +219,20 @@ min_year, max_year = st.sidebar.select_slider(
 )
 
 # Appliquer les filtres au dataframe
-filtered_df = df[
-    (df['region'].isin(selected_regions)) &
-    (df['year'].between(min_year, max_year))
-]
+filtered_df, filter_lookup = panel_filter.select(selected_regions, min_year, max_year)
+log_memory(filtered_df, "Dashboard - session", shared_with=panel)
+trendlines = load_trendlines(version, tuple(selected_regions), min_year, max_year)
+
+# Panneau de débogage des caches des sélections et des figures
+with st.sidebar.expander("🛠️ Débogage - caches des filtres et des figures"):
+    filter_stats = panel_filter.stats()
+    st.write(f"Sélection: {'cache ✅' if filter_lookup['hit'] else 'calculée ❌'} "
+             f"en {filter_lookup['ms']:.2f} ms ({len(filtered_df)} lignes)")
+    st.write(f"Succès: {filter_stats['hits']} · Échecs: {filter_stats['misses']} · "
+             f"Entrées: {filter_stats['entries']}/{filter_stats['max_entries']}")
+    figure_stats = figure_cache.stats()
+    st.write(f"Figures: {figure_stats['hits']} succès · {figure_stats['misses']} échecs · "
+             f"{figure_stats['entries']} entrées ({figure_stats['size_mb']:.1f}/{figure_stats['max_mb']:.0f} Mo)")
 
 # Sidebar améliorée avec des icônes et un style personnalisé
 st.sidebar.markdown("<h2 style='text-align: center; color: blue;'>🎯 Navigation</h2>", unsafe_allow_html=True)
@@ -226,6 +287,26 @@ PLOT_CONFIG = {
     'autosize': False
 }
 
+def cached_figure(helper):
+    """
+    Sert les figures d'un helper create_* depuis le cache des figures. La clé
+    réunit la version du panel, le helper, ses paramètres (x, y, titre,
+    couleur), l'état des filtres et le nombre de lignes reçues; les autres
+    arguments (droites précalculées) découlent de l'état des filtres.
+    """
+    @functools.wraps(helper)
+    def wrapper(data, x, y, title, color=None, **kwargs):
+        key = (version, helper.__name__, x, y, title, color, filter_lookup['key'], len(data))
+        figure, _ = figure_cache.get(key, lambda: helper(data, x, y, title, color, **kwargs))
+        return figure
+    return wrapper
+
+def padded_range(values, margin=0.05):
+    # Étendue des valeurs élargie d'une marge de chaque côté (min et max calculés une fois)
+    low, high = values.min(), values.max()
+    return [low - (high - low) * margin, high + (high - low) * margin]
+
+@cached_figure
 def create_bar_plot(data, x, y, title, color=None):
     fig = px.bar(data, x=x, y=y, color=color if color else None,
                  title=title,
@@ -255,6 +336,7 @@ def create_bar_plot(data, x, y, title, color=None):
 
 import plotly.graph_objects as go
 
+@cached_figure
 def create_scatter_plot(data, x, y, title, color=None):
     fig = go.Figure()
 
@@ -303,28 +385,51 @@ def create_scatter_plot(data, x, y, title, color=None):
 
     # Marges
     fig.update_layout(
-        xaxis_range=[
-            data[x].min() - (data[x].max() - data[x].min()) * 0.05,
-            data[x].max() + (data[x].max() - data[x].min()) * 0.05
-        ],
-        yaxis_range=[
-            data[y].min() - (data[y].max() - data[y].min()) * 0.05,
-            data[y].max() + (data[y].max() - data[y].min()) * 0.05
-        ]
+        xaxis_range=padded_range(data[x]),
+        yaxis_range=padded_range(data[y])
     )
 
     return fig
 
 
-def create_scatter_plot_no_line(data, x, y, title, color=None):
+def add_trendlines(fig, fits, x, y, transform='linear'):
+    """
+    Ajoute à un graphique de dispersion les droites de régression ajustées
+    (voir ``fit_trendlines``) et leurs bandes de confiance, de la couleur des
+    points de chaque groupe.
+    """
+    colors = {trace.name: trace.marker.color for trace in fig.data}
+    selected = fits[(fits['x'] == x) & (fits['y'] == y) & (fits['transform'] == transform)]
+    for fit in selected.to_dict('records'):
+        color = colors.get(fit['group'], COLORS[0])
+        xs, fitted, lower, upper = trendline_band(fit)
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([xs, xs[::-1]]), y=np.concatenate([upper, lower[::-1]]),
+            fill='toself', fillcolor=color, opacity=0.15, line=dict(width=0),
+            hoverinfo='skip', showlegend=False, legendgroup=fit['group']
+        ))
+        fig.add_trace(go.Scatter(
+            x=xs, y=fitted, mode='lines', line=dict(color=color, width=2),
+            showlegend=False, legendgroup=fit['group'],
+            hovertemplate=(f"<b>{fit['group']}</b><br>y = {fit['intercept']:.3g} + {fit['slope']:.3g} x"
+                           f"<br>R² = {fit['r2']:.3f} (n = {fit['n']})<extra></extra>")
+        ))
+    return fig
+
+@cached_figure
+def create_scatter_plot_no_line(data, x, y, title, color=None, fits=None):
     fig = px.scatter(data, x=x, y=y, color=color if color else None,
                     title=title,
                     color_discrete_sequence=COLORS,
                     opacity=0.8,
                     size_max=15,
                     height=450,
-                    render_mode='webgl',
-                    trendline="ols")  # Ajout de la ligne d'ajustement
+                    render_mode='webgl')
+
+    # Ajout de la ligne d'ajustement (droites précalculées pour l'état des filtres)
+    if fits is None:
+        fits = fit_trendlines(data, [(x, y, 'linear')], group=color)
+    add_trendlines(fig, fits, x, y)
     
     fig.update_layout(
         **PLOT_CONFIG,
@@ -348,18 +453,13 @@ def create_scatter_plot_no_line(data, x, y, title, color=None):
     
     # Ajouter des marges pour éviter le chevauchement des points
     fig.update_layout(
-        xaxis_range=[
-            data[x].min() - (data[x].max() - data[x].min()) * 0.05,
-            data[x].max() + (data[x].max() - data[x].min()) * 0.05
-        ],
-        yaxis_range=[
-            data[y].min() - (data[y].max() - data[y].min()) * 0.05,
-            data[y].max() + (data[y].max() - data[y].min()) * 0.05
-        ]
+        xaxis_range=padded_range(data[x]),
+        yaxis_range=padded_range(data[y])
     )
     
     return fig
 
+@cached_figure
 def create_scatter_plot_no_line_no_trendline(data, x, y, title, color=None):
     fig = px.scatter(data, x=x, y=y, color=color if color else None,
                     title=title,
@@ -391,25 +491,22 @@ def create_scatter_plot_no_line_no_trendline(data, x, y, title, color=None):
     
     # Ajouter des marges pour éviter le chevauchement des points
     fig.update_layout(
-        xaxis_range=[
-            data[x].min() - (data[x].max() - data[x].min()) * 0.05,
-            data[x].max() + (data[x].max() - data[x].min()) * 0.05
-        ],
-        yaxis_range=[
-            data[y].min() - (data[y].max() - data[y].min()) * 0.05,
-            data[y].max() + (data[y].max() - data[y].min()) * 0.05
-        ]
+        xaxis_range=padded_range(data[x]),
+        yaxis_range=padded_range(data[y])
     )
     
     return fig
 
-def create_log_scatter_plot(data, x, y, title, color=None):
+@cached_figure
+def create_log_scatter_plot(data, x, y, title, color=None, fits=None):
     """
     Crée un graphique de dispersion avec l'axe x en échelle logarithmique,
-    similaire au graphique de l'EDA.ipynb.
+    similaire au graphique de l'EDA.ipynb. Les droites de régression sont
+    ajustées sur log(x); fits contient les droites précalculées.
     """
-    # Créer une copie des données pour éviter de modifier l'original
-    plot_data = data.copy()
+    # Copie superficielle (copy-on-write): seule la colonne ajoutée est allouée,
+    # les autres restent partagées avec les données d'origine
+    plot_data = data.copy(deep=False)
     
     # Appliquer le log sur la variable x
     plot_data['log_x'] = np.log(plot_data[x])
@@ -424,8 +521,12 @@ def create_log_scatter_plot(data, x, y, title, color=None):
                     opacity=0.8,
                     size_max=15,
                     height=450,
-                    render_mode='webgl',
-                    trendline="ols")
+                    render_mode='webgl')
+
+    # Droites ajustées sur log(x), tracées sur l'axe log_x
+    if fits is None:
+        fits = fit_trendlines(data, [(x, y, 'log')], group=color)
+    add_trendlines(fig, fits, x, y, 'log')
     
     fig.update_layout(
         **PLOT_CONFIG,
@@ -449,14 +550,8 @@ def create_log_scatter_plot(data, x, y, title, color=None):
     
     # Ajouter des marges pour éviter le chevauchement des points
     fig.update_layout(
-        xaxis_range=[
-            plot_data['log_x'].min() - (plot_data['log_x'].max() - plot_data['log_x'].min()) * 0.05,
-            plot_data['log_x'].max() + (plot_data['log_x'].max() - plot_data['log_x'].min()) * 0.05
-        ],
-        yaxis_range=[
-            plot_data[y].min() - (plot_data[y].max() - plot_data[y].min()) * 0.05,
-            plot_data[y].max() + (plot_data[y].max() - plot_data[y].min()) * 0.05
-        ]
+        xaxis_range=padded_range(plot_data['log_x']),
+        yaxis_range=padded_range(plot_data[y])
     )
     
     return fig
@@ -467,7 +562,8 @@ if selected_hypothesis == "Hypothèse 1: Impact de l'investissement":
     
     # Évolution temporelle des dépenses en éducation
     st.markdown("### 📈 Évolution temporelle des dépenses en éducation")
-    evolution_data = filtered_df.groupby(['year', 'region'])['education_expenditure_gdp'].mean().reset_index()
+    evolution_data = load_aggregates(('education_expenditure_gdp',), by=('year', 'region'),
+                                     regions=tuple(selected_regions), min_year=min_year, max_year=max_year)
     fig1 = create_scatter_plot(evolution_data, 'year', 'education_expenditure_gdp', 'Évolution des dépenses en éducation par région', 'region')
     st.plotly_chart(fig1, use_container_width=True)
 
@@ -478,7 +574,8 @@ if selected_hypothesis == "Hypothèse 1: Impact de l'investissement":
         'education_expenditure_gdp',
         'primary_completion_rate',
         "Dépenses en éducation vs Taux d'achèvement du primaire",
-        'region'
+        'region',
+        fits=trendlines
     )
     st.plotly_chart(fig2, use_container_width=True)
 
@@ -510,7 +607,8 @@ if selected_hypothesis == "Hypothèse 1: Impact de l'investissement":
         'free_education_years',
         'school_life_expectancy',
         "Années d'éducation gratuite vs Espérance de vie scolaire",
-        'region'
+        'region',
+        fits=trendlines
     )
     st.plotly_chart(fig3, use_container_width=True)
 
@@ -546,7 +644,8 @@ elif selected_hypothesis == "Hypothèse 2: Impact de la richesse":
         'gni_per_capita',
         'school_life_expectancy',
         'GNI par habitant vs Espérance de vie scolaire',
-        'region'
+        'region',
+        fits=trendlines
     )
     st.plotly_chart(fig1, use_container_width=True)
 
@@ -1073,12 +1172,28 @@ elif selected_hypothesis == "Analyse de la Tunisie":
     
     import matplotlib.pyplot as plt
 
+    # Moyennes de la Tunisie et de l'Afrique sur toute la période, lues dans le cube d'agrégats
+    indicators = ('education_expenditure_gdp',
+                  'fertility_rate',
+                  'gender_ratio_primary',
+                  'gender_ratio_secondary',
+                  'gender_ratio_tertiary',
+                  'gni_per_capita',
+                  'inbound_mobility_rate',
+                  'life_expectancy',
+                  'outbound_mobility_rate',
+                  'primary_completion_rate',
+                  'school_life_expectancy',
+                  'student_teacher_ratio_primary')
+    tn_means = load_aggregates(indicators, level='country', countries=('TN',)).iloc[0]
+    africa_means = load_aggregates(indicators, regions=('Africa',)).iloc[0]
+
 # Création d'une figure avec 4 sous-graphiques
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
 
 # 1. Dépenses en éducation (% du PIB)
-    countries = df[df['country_code'] == 'TN']['education_expenditure_gdp'].mean()
-    regional = df[df['region'] == 'Africa']['education_expenditure_gdp'].mean()
+    countries = tn_means['education_expenditure_gdp']
+    regional = africa_means['education_expenditure_gdp']
     bars1 = ax1.bar(['Tunisie', 'Afrique'], [countries, regional], color=['#1f77b4', '#ff7f0e'])
     ax1.set_title('📊 Dépenses en éducation (% du PIB)')
     ax1.set_ylabel('% du PIB')
@@ -1087,8 +1202,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
      ax1.text(bar.get_x() + bar.get_width()/2., height, f'{height:.2f}%', ha='center', va='bottom')
 
 # 2. Taux d'achèvement du primaire
-    tn_completion = df[df['country_code'] == 'TN']['primary_completion_rate'].mean()
-    africa_completion = df[df['region'] == 'Africa']['primary_completion_rate'].mean()
+    tn_completion = tn_means['primary_completion_rate']
+    africa_completion = africa_means['primary_completion_rate']
     bars2 = ax2.bar(['Tunisie', 'Afrique'], [tn_completion, africa_completion], color=['#2ca02c', '#d62728'])
     ax2.set_title("🎓 Taux d'achèvement du primaire")
     ax2.set_ylabel('Taux (%)')
@@ -1097,8 +1212,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
      ax2.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}%', ha='center', va='bottom')
 
 # 3. Espérance de vie scolaire
-    tn_life = df[df['country_code'] == 'TN']['school_life_expectancy'].mean()
-    africa_life = df[df['region'] == 'Africa']['school_life_expectancy'].mean()
+    tn_life = tn_means['school_life_expectancy']
+    africa_life = africa_means['school_life_expectancy']
     bars3 = ax3.bar(['Tunisie', 'Afrique'], [tn_life, africa_life], color=['#9467bd', '#8c564b'])
     ax3.set_title('📚 Espérance de vie scolaire')
     ax3.set_ylabel('Années')
@@ -1107,8 +1222,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
      ax3.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}', ha='center', va='bottom')
 
 # 4. Ratio élèves/enseignant (primaire)
-    tn_ratio = df[df['country_code'] == 'TN']['student_teacher_ratio_primary'].mean()
-    africa_ratio = df[df['region'] == 'Africa']['student_teacher_ratio_primary'].mean()
+    tn_ratio = tn_means['student_teacher_ratio_primary']
+    africa_ratio = africa_means['student_teacher_ratio_primary']
     bars4 = ax4.bar(['Tunisie', 'Afrique'], [tn_ratio, africa_ratio], color=['#17becf', '#e377c2'])
     ax4.set_title('👨‍🏫 Ratio élèves/enseignant (primaire)')
     ax4.set_ylabel("Nombre d'élèves par enseignant")
@@ -1154,8 +1269,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
     st.markdown("### 💰 GNI par habitant : Tunisie vs Afrique")
 
 # --- Calcul des moyennes ---
-    tn_gni = df[df['country_code'] == 'TN']['gni_per_capita'].mean()
-    africa_gni = df[df['region'] == 'Africa']['gni_per_capita'].mean()
+    tn_gni = tn_means['gni_per_capita']
+    africa_gni = africa_means['gni_per_capita']
 
 # --- Création de la figure ---
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -1203,14 +1318,14 @@ elif selected_hypothesis == "Analyse de la Tunisie":
     st.markdown("### 👧👦 Comparaison des ratios filles/garçons par niveau d'éducation")
 
 # --- Calcul des moyennes Tunisie ---
-    tn_primary = df[df['country_code'] == 'TN']['gender_ratio_primary'].mean()
-    tn_secondary = df[df['country_code'] == 'TN']['gender_ratio_secondary'].mean()
-    tn_tertiary = df[df['country_code'] == 'TN']['gender_ratio_tertiary'].mean()
+    tn_primary = tn_means['gender_ratio_primary']
+    tn_secondary = tn_means['gender_ratio_secondary']
+    tn_tertiary = tn_means['gender_ratio_tertiary']
 
 # --- Calcul des moyennes Afrique ---
-    africa_primary = df[df['region'] == 'Africa']['gender_ratio_primary'].mean()
-    africa_secondary = df[df['region'] == 'Africa']['gender_ratio_secondary'].mean()
-    africa_tertiary = df[df['region'] == 'Africa']['gender_ratio_tertiary'].mean()
+    africa_primary = africa_means['gender_ratio_primary']
+    africa_secondary = africa_means['gender_ratio_secondary']
+    africa_tertiary = africa_means['gender_ratio_tertiary']
 
 # --- Préparation des données ---
     x = np.arange(3)
@@ -1277,8 +1392,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
 
 # --- 1. Espérance de vie scolaire ---
-    school_life_tn = df[df['country_code'] == 'TN']['school_life_expectancy'].mean()
-    school_life_af = df[df['region'] == 'Africa']['school_life_expectancy'].mean()
+    school_life_tn = tn_means['school_life_expectancy']
+    school_life_af = africa_means['school_life_expectancy']
     bars1 = ax1.bar(['Tunisie', 'Afrique'], [school_life_tn, school_life_af], color=['#3498db', '#e74c3c'])
     ax1.set_title("Espérance de vie scolaire (années)")
     for bar in bars1:
@@ -1286,8 +1401,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
         ax1.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}', ha='center', va='bottom')
 
 # --- 2. Taux de fécondité ---
-    fertility_tn = df[df['country_code'] == 'TN']['fertility_rate'].mean()
-    fertility_af = df[df['region'] == 'Africa']['fertility_rate'].mean()
+    fertility_tn = tn_means['fertility_rate']
+    fertility_af = africa_means['fertility_rate']
     bars2 = ax2.bar(['Tunisie', 'Afrique'], [fertility_tn, fertility_af], color=['#3498db', '#e74c3c'])
     ax2.set_title("Taux de fécondité (enfants par femme)")
     for bar in bars2:
@@ -1295,8 +1410,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
         ax2.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}', ha='center', va='bottom')
 
 # --- 3. Espérance de vie ---
-    life_exp_tn = df[df['country_code'] == 'TN']['life_expectancy'].mean()
-    life_exp_af = df[df['region'] == 'Africa']['life_expectancy'].mean()
+    life_exp_tn = tn_means['life_expectancy']
+    life_exp_af = africa_means['life_expectancy']
     bars3 = ax3.bar(['Tunisie', 'Afrique'], [life_exp_tn, life_exp_af], color=['#3498db', '#e74c3c'])
     ax3.set_title("Espérance de vie (années)")
     for bar in bars3:
@@ -1304,8 +1419,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
         ax3.text(bar.get_x() + bar.get_width()/2., height, f'{height:.1f}', ha='center', va='bottom')
 
 # --- 4. Taux d'achèvement du primaire ---
-    completion_tn = df[df['country_code'] == 'TN']['primary_completion_rate'].mean()
-    completion_af = df[df['region'] == 'Africa']['primary_completion_rate'].mean()
+    completion_tn = tn_means['primary_completion_rate']
+    completion_af = africa_means['primary_completion_rate']
     bars4 = ax4.bar(['Tunisie', 'Afrique'], [completion_tn, completion_af], color=['#3498db', '#e74c3c'])
     ax4.set_title("Taux d'achèvement du primaire (%)")
     for bar in bars4:
@@ -1353,8 +1468,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
 # --- 1. Taux de mobilité entrante ---
-    tn_inbound = df[df['country_code'] == 'TN']['inbound_mobility_rate'].mean()
-    africa_inbound = df[df['region'] == 'Africa']['inbound_mobility_rate'].mean()
+    tn_inbound = tn_means['inbound_mobility_rate']
+    africa_inbound = africa_means['inbound_mobility_rate']
     bars1 = ax1.bar(['Tunisie', 'Afrique'], [tn_inbound, africa_inbound], color=['#2980b9', '#e67e22'])
     ax1.set_title("Taux de mobilité entrante")
     ax1.set_ylabel("Pourcentage")
@@ -1363,8 +1478,8 @@ elif selected_hypothesis == "Analyse de la Tunisie":
         ax1.text(bar.get_x() + bar.get_width()/2., height, f'{height:.2f}%', ha='center', va='bottom')
 
 # --- 2. Taux de mobilité sortante ---
-    tn_outbound = df[df['country_code'] == 'TN']['outbound_mobility_rate'].mean()
-    africa_outbound = df[df['region'] == 'Africa']['outbound_mobility_rate'].mean()
+    tn_outbound = tn_means['outbound_mobility_rate']
+    africa_outbound = africa_means['outbound_mobility_rate']
     bars2 = ax2.bar(['Tunisie', 'Afrique'], [tn_outbound, africa_outbound], color=['#2980b9', '#e67e22'])
     ax2.set_title("Taux de mobilité sortante")
     ax2.set_ylabel("Pourcentage")
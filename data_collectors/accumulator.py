@@ -0,0 +1,104 @@
+"""
+Accumulation colonnaire des valeurs collectées.
+
+Les valeurs sont rangées dans un tableau NumPy préalloué indexé par
+(indicateur, pays, année) au lieu d'un dictionnaire Python par ligne; le
+DataFrame large n'est construit qu'une seule fois, à la fin de la collecte.
+"""
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class IndicatorAccumulator:
+    """
+    Tableau préalloué des valeurs d'indicateurs par pays et par année.
+
+    Args:
+        countries (list): Codes pays, dans l'ordre des lignes du DataFrame final (sans doublons)
+        years (list): Années, dans l'ordre des lignes du DataFrame final
+        indicators (dict): Indicateurs {code: nom de colonne}
+        regions (dict, optional): Région de chaque code pays
+    """
+
+    def __init__(self, countries, years, indicators, regions=None):
+        self.countries = list(dict.fromkeys(countries))
+        self.years = list(years)
+        self.indicators = dict(indicators)
+        self.regions = regions or {}
+        self._country_index = pd.Index(self.countries)
+        self._year_index = pd.Index(self.years)
+        self._indicator_position = {code: i for i, code in enumerate(self.indicators)}
+        self.values = np.full(
+            (len(self.indicators), len(self.countries), len(self.years)), np.nan, dtype=np.float64
+        )
+
+    @property
+    def nbytes(self):
+        """
+        Taille du tableau des valeurs en octets.
+        """
+        return self.values.nbytes
+
+    def assign(self, indicator_code, countries, years, values):
+        """
+        Range un lot de valeurs d'un indicateur en une seule opération vectorisée.
+        Les couples (pays, année) hors de la grille sont ignorés.
+
+        Args:
+            indicator_code (str): Code de l'indicateur
+            countries (array-like): Codes pays
+            years (array-like): Années
+            values (array-like): Valeurs (None pour une valeur absente)
+        """
+        country_pos = self._country_index.get_indexer(countries)
+        year_pos = self._year_index.get_indexer(years)
+        inside = (country_pos >= 0) & (year_pos >= 0)
+        values = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+        self.values[self._indicator_position[indicator_code], country_pos[inside], year_pos[inside]] = values[inside]
+
+    def update(self, indicator_code, cells):
+        """
+        Range les valeurs d'un dictionnaire {(pays, année): valeur}.
+
+        Args:
+            indicator_code (str): Code de l'indicateur
+            cells (dict): Valeurs indexées par (code pays, année)
+        """
+        if not cells:
+            return
+        countries, years = zip(*cells.keys())
+        self.assign(indicator_code, list(countries), list(years), list(cells.values()))
+
+    def to_frame(self):
+        """
+        Construit le DataFrame large (une ligne par pays et par année).
+
+        Returns:
+            pandas.DataFrame: Colonnes country_code, country_name, region, year
+            puis une colonne par indicateur
+        """
+        start = time.perf_counter()
+        n_countries, n_years = len(self.countries), len(self.years)
+        country_codes = np.repeat(np.array(self.countries, dtype=object), n_years)
+        region_by_country = np.array([self.regions.get(country, 'Unknown') for country in self.countries], dtype=object)
+
+        columns = {
+            'country_code': country_codes,
+            'country_name': country_codes,  # Utiliser directement le code pays comme nom
+            'region': np.repeat(region_by_country, n_years),
+            'year': np.tile(np.array(self.years, dtype=np.int64), n_countries)
+        }
+        for position, indicator_name in enumerate(self.indicators.values()):
+            columns[indicator_name] = self.values[position].reshape(-1)
+        df = pd.DataFrame(columns)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"DataFrame construit en {elapsed:.3f}s: tableau des valeurs {self.nbytes / 1024 ** 2:.2f} Mo, "
+            f"DataFrame {df.memory_usage(deep=True).sum() / 1024 ** 2:.2f} Mo"
+        )
+        return df
@@ -0,0 +1,136 @@
+"""
+Moteur de collecte asynchrone partagé par les collecteurs World Bank et UNESCO.
+
+Les requêtes sont émises via un pool de connexions HTTP persistantes (keep-alive)
+avec un nombre borné de requêtes simultanées. Le débit par hôte, plafonné à
+``RATE_LIMIT``, et le disjoncteur sont partagés avec ``make_request`` (voir
+``rate_control``), tout comme le cache disque des réponses.
+"""
+import os
+import json
+import asyncio
+import logging
+
+import aiohttp
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REQUEST_TIMEOUT, MAX_RETRIES, RATE_LIMIT, MAX_CONCURRENT_REQUESTS
+from data_collectors.http_cache import http_cache, OfflineCacheMiss
+from data_collectors.rate_control import host_controller, retry_delay, can_retry
+
+logger = logging.getLogger(__name__)
+
+class AsyncHttpClient:
+    """
+    Client HTTP asynchrone avec pool de connexions, requêtes simultanées
+    bornées et limitation de débit par hôte.
+
+    S'utilise comme gestionnaire de contexte asynchrone::
+
+        async with AsyncHttpClient() as client:
+            data = await client.get_json(url, params)
+
+    Args:
+        max_in_flight (int, optional): Nombre maximal de requêtes simultanées
+        rate_limit (float, optional): Nombre maximal de requêtes par seconde et par hôte
+        timeout (float, optional): Délai d'expiration d'une requête en secondes
+        headers (dict, optional): En-têtes envoyés avec chaque requête (clé d'API)
+    """
+
+    def __init__(self, max_in_flight=MAX_CONCURRENT_REQUESTS, rate_limit=RATE_LIMIT,
+                 timeout=REQUEST_TIMEOUT, headers=None):
+        self.max_in_flight = max_in_flight
+        self.rate_limit = rate_limit
+        self.timeout = timeout
+        self.headers = headers
+        self.session = None
+        self._semaphore = None
+        self.request_count = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.max_in_flight)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=self.headers
+        )
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    async def get(self, url, params=None, ttl=None, validate=None):
+        """
+        Effectue une requête GET avec cache disque, contrôle adaptatif du débit
+        et nouvelles tentatives.
+
+        Args:
+            url (str): URL de la requête
+            params (dict, optional): Paramètres de la requête
+            ttl (float, optional): Durée de validité de la réponse en cache (secondes)
+            validate (callable, optional): Vérifie le corps de la réponse avant sa
+                mise en cache (lève une exception pour une réponse invalide)
+
+        Returns:
+            bytes: Corps de la réponse
+        """
+        params = {k: str(v) for k, v in (params or {}).items()}
+        entry = http_cache.lookup(url, params)
+        if entry is not None and (entry['fresh'] or http_cache.offline):
+            http_cache.hits += 1
+            return entry['body']
+        if http_cache.offline:
+            raise OfflineCacheMiss(f"Réponse absente du cache en mode hors-ligne: {url} {params}")
+
+        http_cache.misses += 1
+        headers = http_cache.validators(entry)
+        controller = host_controller(url, self.rate_limit)
+        for attempt in range(MAX_RETRIES):
+            await controller.wait_async()
+            retryable, retry_after = False, None
+            try:
+                async with self._semaphore:
+                    self.request_count += 1
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        retryable, retry_after = controller.on_response(response.status, response.headers)
+                        if response.status == 304 and entry is not None:
+                            http_cache.refresh(entry, ttl)
+                            return entry['body']
+                        response.raise_for_status()
+                        body = await response.read()
+                        if validate is not None:
+                            validate(body)
+                        http_cache.store(url, params, body, response.headers, ttl)
+                        return body
+            except aiohttp.ClientResponseError as e:
+                if not retryable:
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                controller.on_error()
+                error = e
+
+            delay = retry_delay(attempt, retry_after)
+            if not can_retry(attempt, delay):
+                logger.error(f"Échec de la requête après {attempt + 1} tentatives: {url}")
+                raise error
+            logger.warning(f"Tentative {attempt + 1}/{MAX_RETRIES} échouée: {error} (nouvel essai dans {delay:.1f}s)")
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url, params=None, ttl=None, validate=None):
+        """
+        Effectue une requête GET et décode la réponse JSON.
+
+        Args:
+            url (str): URL de la requête
+            params (dict, optional): Paramètres de la requête
+            ttl (float, optional): Durée de validité de la réponse en cache (secondes)
+            validate (callable, optional): Vérifie le corps de la réponse avant sa mise en cache
+
+        Returns:
+            object: Réponse JSON décodée
+        """
+        return json.loads(await self.get(url, params, ttl, validate))
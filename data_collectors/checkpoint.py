@@ -0,0 +1,158 @@
+"""
+Journal de reprise des collectes longues.
+
+Chaque unité de travail terminée (pays, indicateur) est ajoutée en fin de
+fichier au format JSON Lines, par lots synchronisés sur disque (fsync). Une
+collecte interrompue peut ainsi reprendre en ignorant les unités déjà
+terminées, sans jamais réécrire les données déjà journalisées.
+"""
+import os
+import json
+import logging
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import JOURNAL_FLUSH_EVERY
+
+logger = logging.getLogger(__name__)
+
+class CollectionJournal:
+    """
+    Journal append-only des unités (pays, indicateur) collectées.
+
+    Args:
+        path (Path): Chemin du fichier journal
+        years (list): Années de la collecte, enregistrées en en-tête du journal
+        resume (bool, optional): Reprendre un journal existant au lieu d'en créer un nouveau
+        flush_every (int, optional): Nombre d'unités par lot synchronisé sur disque
+    """
+
+    def __init__(self, path, years, resume=False, flush_every=JOURNAL_FLUSH_EVERY):
+        self.path = path
+        self.years = sorted(years)
+        self.flush_every = flush_every
+        self.values = {}
+        self.completed = set()
+        self._pending = []
+        self._valid_bytes = 0
+
+        if resume and os.path.exists(self.path) and self._load():
+            logger.info(f"Reprise de la collecte: {len(self.completed)} unités déjà terminées")
+            # Une ligne tronquée est retirée pour que les ajouts repartent d'une ligne complète
+            os.truncate(self.path, self._valid_bytes)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write(json.dumps({'years': self.years}) + '\n')
+            self._sync()
+
+    def _load(self):
+        """
+        Relit le journal existant. Une dernière ligne tronquée par un arrêt
+        brutal (JSON invalide ou sans fin de ligne) est ignorée, et la taille
+        de la partie valide du fichier est retenue.
+
+        Returns:
+            bool: True si le journal est compatible avec la collecte demandée
+        """
+        with open(self.path, 'rb') as f:
+            lines = f.readlines()
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return False
+        if not lines[0].endswith(b'\n'):
+            return False
+        if header.get('years') != self.years:
+            logger.warning("Journal existant ignoré: années de collecte différentes")
+            return False
+
+        self._valid_bytes = len(lines[0])
+        for line in lines[1:]:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError("ligne sans fin de ligne")
+                record = json.loads(line)
+            except ValueError:
+                logger.warning("Dernière entrée du journal incomplète ignorée")
+                break
+            self._apply(record)
+            self._valid_bytes += len(line)
+        return True
+
+    def _apply(self, record):
+        unit = (record['country'], record['indicator'])
+        self.completed.add(unit)
+        indicator_values = self.values.setdefault(record['indicator'], {})
+        for year, value in record['values'].items():
+            indicator_values[(record['country'], int(year))] = value
+
+    def is_done(self, country, indicator_code):
+        """
+        Indique si l'unité (pays, indicateur) est déjà journalisée.
+        """
+        return (country, indicator_code) in self.completed
+
+    def record(self, country, indicator_code, values):
+        """
+        Ajoute une unité terminée au journal.
+
+        Args:
+            country (str): Code pays ISO-2
+            indicator_code (str): Code de l'indicateur
+            values (dict): Valeurs de l'unité indexées par année
+        """
+        record = {
+            'country': country,
+            'indicator': indicator_code,
+            'values': {str(year): value for year, value in values.items()}
+        }
+        self._apply(record)
+        self._pending.append(json.dumps(record))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def record_chunk(self, indicator_code, countries, values):
+        """
+        Journalise toutes les unités d'un groupe de pays collecté en une fois.
+
+        Args:
+            indicator_code (str): Code de l'indicateur
+            countries (list): Codes pays du groupe
+            values (dict): Valeurs indexées par (code pays, année)
+        """
+        by_country = {country: {} for country in countries}
+        for (country, year), value in values.items():
+            if country in by_country:
+                by_country[country][year] = value
+        for country, country_values in by_country.items():
+            self.record(country, indicator_code, country_values)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def flush(self):
+        """
+        Écrit le lot d'unités en attente et le synchronise sur disque.
+        """
+        if self._pending:
+            self._file.write('\n'.join(self._pending) + '\n')
+            self._pending = []
+            self._sync()
+
+    def close(self):
+        """
+        Écrit les unités en attente et ferme le journal.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def discard(self):
+        """
+        Ferme et supprime le journal une fois compacté dans le fichier final.
+        """
+        self.close()
+        os.remove(self.path)
+        logger.info(f"Journal de collecte compacté et supprimé: {self.path}")
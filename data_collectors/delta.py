@@ -0,0 +1,209 @@
+"""
+Planification des collectes incrémentales.
+
+À partir du fichier brut existant, détermine les cellules (pays, année,
+indicateur) à collecter: celles qui manquent et celles des dernières années
+de la collecte, encore révisables par la source. Les cellules d'années closes
+que la source ne fournit pas sont consignées dans un registre et ne sont plus
+redemandées. Les valeurs collectées sont ensuite fusionnées (upsert) dans les
+valeurs existantes.
+"""
+import os
+import logging
+from itertools import groupby
+
+import pandas as pd
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REVISABLE_YEARS
+
+logger = logging.getLogger(__name__)
+
+def first_revisable_year(years, revisable_years=REVISABLE_YEARS):
+    """
+    Retourne la première année considérée comme révisable: les
+    ``revisable_years`` dernières années de la collecte.
+
+    Args:
+        years (list): Années de la collecte
+        revisable_years (int, optional): Nombre d'années récentes révisables
+
+    Returns:
+        int: Première année révisable
+    """
+    return max(years) - revisable_years + 1
+
+def frame_to_cells(df, columns, keys=('country_code', 'year')):
+    """
+    Convertit un fichier brut large en valeurs non nulles par colonne.
+
+    Args:
+        df (pandas.DataFrame): Données existantes au format large
+        columns (iterable): Colonnes d'indicateurs à extraire
+        keys (tuple, optional): Colonnes identifiant une ligne
+
+    Returns:
+        dict: {colonne: {(pays, année): valeur}}
+    """
+    indexed = df.set_index(list(keys))
+    cells = {}
+    for column in columns:
+        if column in indexed.columns:
+            cells[column] = indexed[column].dropna().to_dict()
+        else:
+            cells[column] = {}
+    return cells
+
+def plan_delta(cells, countries, years, columns, revisable_from=None, absent=None):
+    """
+    Détermine les cellules à collecter pour chaque indicateur.
+
+    Args:
+        cells (dict): Valeurs existantes retournées par ``frame_to_cells``
+        countries (list): Pays de la collecte
+        years (list): Années de la collecte
+        columns (iterable): Colonnes d'indicateurs
+        revisable_from (int, optional): Première année révisable, toujours recollectée
+        absent (dict, optional): Cellules d'années closes absentes de la source
+            ({colonne: ensemble des (pays, année)}), qui ne sont pas redemandées
+
+    Returns:
+        dict: {colonne: ensemble des (pays, année) à collecter}
+    """
+    if revisable_from is None:
+        revisable_from = first_revisable_year(years)
+    absent = absent or {}
+    plan = {}
+    skipped = 0
+    for column in columns:
+        existing = cells.get(column, {})
+        known_absent = absent.get(column, set())
+        missing = {
+            (country, year)
+            for country in countries
+            for year in years
+            if year >= revisable_from or (country, year) not in existing
+        }
+        plan[column] = {cell for cell in missing if cell[1] >= revisable_from or cell not in known_absent}
+        skipped += len(missing) - len(plan[column])
+    total = len(countries) * len(years) * len(plan)
+    planned = sum(len(needed) for needed in plan.values())
+    logger.info(f"Collecte incrémentale: {planned}/{total} cellules à collecter (années révisables à partir de "
+                f"{revisable_from}, {skipped} cellules absentes de la source ignorées)")
+    return plan
+
+def year_ranges(years):
+    """
+    Découpe des années en plages d'années consécutives.
+
+    Args:
+        years (iterable): Années
+
+    Returns:
+        list: Plages (première année, dernière année), triées
+    """
+    ranges = []
+    for _, run in groupby(enumerate(sorted(years)), key=lambda item: item[1] - item[0]):
+        run = [year for _, year in run]
+        ranges.append((run[0], run[-1]))
+    return ranges
+
+def plan_requests(needed, countries):
+    """
+    Regroupe les cellules à collecter d'un indicateur en requêtes groupées:
+    les années de chaque pays sont découpées en plages consécutives, et les
+    pays partageant une même plage sont demandés ensemble. Seules les
+    cellules planifiées sont demandées.
+
+    Args:
+        needed (set): Cellules (pays, année) à collecter
+        countries (list): Pays de la collecte, dans l'ordre de collecte
+
+    Returns:
+        list: Requêtes [(pays concernés, années de la plage), ...]
+    """
+    years_by_country = {}
+    for country, year in needed:
+        years_by_country.setdefault(country, set()).add(year)
+    countries_by_range = {}
+    for country in countries:
+        for year_range in year_ranges(years_by_country.get(country, ())):
+            countries_by_range.setdefault(year_range, []).append(country)
+    return [
+        (range_countries, list(range(first, last + 1)))
+        for (first, last), range_countries in sorted(countries_by_range.items())
+    ]
+
+def read_absent_cells(path):
+    """
+    Lit le registre des cellules absentes de la source.
+
+    Args:
+        path (Path): Fichier CSV (colonnes column, country_code, year)
+
+    Returns:
+        dict: {colonne: ensemble des (pays, année)}
+    """
+    absent = {}
+    if not os.path.exists(path):
+        return absent
+    # Codes lus tels quels: "NA" (Namibie) n'est pas une valeur manquante
+    for row in pd.read_csv(path, dtype={'country_code': str}, keep_default_na=False).itertuples(index=False):
+        absent.setdefault(row.column, set()).add((row.country_code, int(row.year)))
+    return absent
+
+def write_absent_cells(path, absent):
+    """
+    Écrit le registre des cellules absentes de la source.
+
+    Args:
+        path (Path): Fichier CSV
+        absent (dict): {colonne: ensemble des (pays, année)}
+    """
+    rows = [
+        (column, country, year)
+        for column, column_cells in sorted(absent.items())
+        for country, year in sorted(column_cells)
+    ]
+    pd.DataFrame(rows, columns=['column', 'country_code', 'year']).to_csv(path, index=False)
+
+def absent_cells(needed, fetched, revisable_from, failed=()):
+    """
+    Retourne les cellules d'années closes demandées mais sans valeur dans la
+    réponse de la source (pays en échec exclus).
+
+    Args:
+        needed (set): Cellules planifiées
+        fetched (dict): Valeurs collectées {(pays, année): valeur}
+        revisable_from (int): Première année révisable
+        failed (iterable, optional): Pays dont la collecte a échoué
+
+    Returns:
+        set: Cellules (pays, année) absentes de la source
+    """
+    failed = set(failed)
+    return {
+        (country, year) for country, year in needed
+        if year < revisable_from and country not in failed and fetched.get((country, year)) is None
+    }
+
+def upsert_cells(existing, fetched, needed):
+    """
+    Fusionne les valeurs collectées dans les valeurs existantes, pour les
+    seules cellules planifiées.
+
+    Args:
+        existing (dict): Valeurs existantes {(pays, année): valeur}
+        fetched (dict): Valeurs collectées {(pays, année): valeur}
+        needed (set): Cellules planifiées
+
+    Returns:
+        int: Nombre de cellules mises à jour
+    """
+    updated = 0
+    for key in needed:
+        if key in fetched:
+            existing[key] = fetched[key]
+            updated += 1
+    return updated
@@ -0,0 +1,232 @@
+"""
+Cache disque des réponses HTTP des collecteurs.
+
+Chaque réponse est stockée sous une clé dérivée de l'URL et des paramètres
+(SHA-256), avec une durée de validité propre à l'entrée et ses validateurs
+``ETag``/``Last-Modified`` pour la revalidation conditionnelle. La taille du
+cache est bornée par une éviction LRU, et le mode hors-ligne rejoue les
+réponses stockées sans aucun accès réseau.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+from datetime import date
+from pathlib import Path
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_CLOSED_TTL, HTTP_CACHE_MAX_BYTES,
+                    REVISABLE_YEARS)
+
+logger = logging.getLogger(__name__)
+
+class OfflineCacheMiss(Exception):
+    """
+    Levée en mode hors-ligne lorsqu'aucune réponse n'est en cache pour une requête.
+    """
+
+def cache_key(url, params=None):
+    """
+    Calcule la clé de cache d'une requête.
+
+    Args:
+        url (str): URL de la requête
+        params (dict, optional): Paramètres de la requête
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale de l'URL et des paramètres triés
+    """
+    canonical = json.dumps(
+        [url, sorted((str(k), str(v)) for k, v in (params or {}).items())],
+        separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def ttl_for_years(years):
+    """
+    Choisit la durée de validité d'une réponse selon les années qu'elle couvre:
+    les années closes ne changent plus et peuvent être conservées longtemps.
+
+    Args:
+        years (iterable): Années couvertes par la requête
+
+    Returns:
+        int: Durée de validité en secondes
+    """
+    if max(years) < date.today().year - REVISABLE_YEARS:
+        return HTTP_CACHE_CLOSED_TTL
+    return HTTP_CACHE_TTL
+
+class HttpCache:
+    """
+    Cache disque adressé par contenu pour les réponses HTTP.
+
+    Args:
+        cache_dir (Path, optional): Répertoire du cache
+        ttl (float, optional): Durée de validité par défaut d'une entrée (secondes)
+        max_bytes (int, optional): Taille maximale du cache avant éviction LRU
+        offline (bool, optional): Rejouer uniquement les réponses en cache
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL,
+                 max_bytes=HTTP_CACHE_MAX_BYTES, offline=False):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.enabled = True
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def _paths(self, key):
+        directory = self.cache_dir / key[:2]
+        return directory / f"{key}.body", directory / f"{key}.json"
+
+    def lookup(self, url, params=None):
+        """
+        Recherche une réponse en cache.
+
+        Args:
+            url (str): URL de la requête
+            params (dict, optional): Paramètres de la requête
+
+        Returns:
+            dict: Métadonnées de l'entrée (avec ``fresh`` et ``body``), ou None
+        """
+        if not self.enabled:
+            return None
+        body_path, meta_path = self._paths(cache_key(url, params))
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            meta['body'] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        meta['fresh'] = time.time() < meta['stored_at'] + meta['ttl']
+        # L'horodatage du fichier de métadonnées sert d'ordre LRU
+        os.utime(meta_path)
+        return meta
+
+    def validators(self, entry):
+        """
+        Construit les en-têtes de revalidation conditionnelle d'une entrée.
+
+        Args:
+            entry (dict): Entrée retournée par ``lookup``
+
+        Returns:
+            dict: En-têtes ``If-None-Match``/``If-Modified-Since``
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, params, body, headers=None, ttl=None):
+        """
+        Enregistre une réponse dans le cache.
+
+        Args:
+            url (str): URL de la requête
+            params (dict): Paramètres de la requête
+            body (bytes): Corps de la réponse
+            headers (Mapping, optional): En-têtes de la réponse
+            ttl (float, optional): Durée de validité de l'entrée (secondes)
+        """
+        if not self.enabled:
+            return
+        headers = headers or {}
+        key = cache_key(url, params)
+        body_path, meta_path = self._paths(key)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        previous_size = body_path.stat().st_size if body_path.exists() else 0
+
+        meta = {
+            'url': url,
+            'params': {str(k): str(v) for k, v in (params or {}).items()},
+            'stored_at': time.time(),
+            'ttl': self.ttl if ttl is None else ttl,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'size': len(body)
+        }
+        # Écriture atomique pour ne jamais laisser d'entrée tronquée
+        tmp_body = body_path.with_suffix('.body.tmp')
+        tmp_body.write_bytes(body)
+        os.replace(tmp_body, body_path)
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+        tmp_meta.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(tmp_meta, meta_path)
+
+        if self._size is not None:
+            self._size += len(body) - previous_size
+        self.evict()
+
+    def refresh(self, entry, ttl=None):
+        """
+        Prolonge la validité d'une entrée après une réponse 304 Not Modified.
+
+        Args:
+            entry (dict): Entrée retournée par ``lookup``
+            ttl (float, optional): Nouvelle durée de validité (secondes)
+        """
+        self.revalidations += 1
+        _, meta_path = self._paths(cache_key(entry['url'], entry['params']))
+        meta = {k: v for k, v in entry.items() if k not in ('body', 'fresh')}
+        meta['stored_at'] = time.time()
+        if ttl is not None:
+            meta['ttl'] = ttl
+        meta_path.write_text(json.dumps(meta), encoding='utf-8')
+
+    def _entries(self):
+        for meta_path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = meta_path.stat()
+                size = meta_path.with_suffix('.body').stat().st_size
+            except OSError:
+                continue
+            yield stat.st_mtime, size, meta_path
+
+    def size(self):
+        """
+        Retourne la taille totale des corps de réponse en cache (octets).
+        """
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def evict(self):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à repasser
+        sous 90% de la taille maximale.
+        """
+        if self.size() <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, meta_path in sorted(self._entries()):
+            if self._size <= target:
+                break
+            meta_path.with_suffix('.body').unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            self._size -= size
+            removed += 1
+        logger.info(f"Cache HTTP: {removed} entrées évincées ({self._size} octets conservés)")
+
+    def clear(self):
+        """
+        Vide entièrement le cache.
+        """
+        for _, _, meta_path in list(self._entries()):
+            meta_path.with_suffix('.body').unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        self._size = 0
+
+http_cache = HttpCache()
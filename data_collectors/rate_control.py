@@ -0,0 +1,330 @@
+"""
+Contrôle adaptatif du débit des requêtes vers les API.
+
+Pour chaque hôte, un limiteur à seau de jetons ajuste son débit selon les
+réponses du serveur (réduction multiplicative sur 429/503, respect de
+``Retry-After``, remontée progressive sur succès) et un disjoncteur suspend
+toutes les requêtes vers un hôte défaillant au lieu de le solliciter en boucle.
+Les nouvelles tentatives utilisent un backoff exponentiel avec gigue, dans la
+limite d'un budget de temps global par collecte.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (MAX_RETRIES, RATE_LIMIT, MIN_RATE_LIMIT, RATE_RECOVERY_STEP, RETRY_BACKOFF_BASE,
+                    RETRY_BACKOFF_CAP, COLLECTION_DEADLINE, CIRCUIT_FAILURE_THRESHOLD,
+                    CIRCUIT_COOLDOWN, CIRCUIT_PROBE_WAIT)
+
+logger = logging.getLogger(__name__)
+
+# Statuts HTTP transitoires pour lesquels une nouvelle tentative a un sens
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Statuts indiquant que le serveur demande de ralentir
+THROTTLE_STATUSES = {429, 503}
+
+class CircuitOpenError(Exception):
+    """
+    Levée lorsqu'un hôte reste indisponible au-delà du budget de la collecte.
+    """
+
+def parse_retry_after(value):
+    """
+    Interprète un en-tête ``Retry-After`` (délai en secondes ou date HTTP).
+
+    Args:
+        value (str): Valeur de l'en-tête, ou None
+
+    Returns:
+        float: Délai d'attente en secondes, ou None si absent ou invalide
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def retry_delay(attempt, retry_after=None):
+    """
+    Calcule le délai avant une nouvelle tentative.
+
+    Args:
+        attempt (int): Numéro de la tentative échouée (à partir de 0)
+        retry_after (float, optional): Délai imposé par le serveur
+
+    Returns:
+        float: Délai en secondes (``Retry-After`` ou backoff exponentiel avec gigue)
+    """
+    if retry_after is not None:
+        return retry_after
+    backoff = min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** attempt)
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+class RunBudget:
+    """
+    Budget de temps global d'une collecte: aucune attente ne doit le dépasser.
+
+    Args:
+        seconds (float, optional): Durée maximale de la collecte
+    """
+
+    def __init__(self, seconds=COLLECTION_DEADLINE):
+        self.restart(seconds)
+
+    def restart(self, seconds=COLLECTION_DEADLINE):
+        """
+        Démarre un nouveau budget pour une nouvelle collecte.
+        """
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        """
+        Retourne le temps restant en secondes.
+        """
+        return self.deadline - time.monotonic()
+
+    def allows(self, delay):
+        """
+        Indique si une attente de ``delay`` secondes tient dans le budget.
+        """
+        return delay <= self.remaining()
+
+class AdaptiveRateLimiter:
+    """
+    Seau de jetons à débit adaptatif, utilisable depuis du code synchrone
+    (threads) comme asynchrone: ``reserve`` retourne le délai à attendre.
+
+    Args:
+        max_rate (float, optional): Débit maximal en requêtes par seconde
+        min_rate (float, optional): Débit plancher après ralentissements
+        recovery_step (float, optional): Hausse du débit après chaque succès
+    """
+
+    def __init__(self, max_rate=RATE_LIMIT, min_rate=MIN_RATE_LIMIT, recovery_step=RATE_RECOVERY_STEP):
+        self.max_rate = float(max_rate)
+        self.min_rate = float(min_rate)
+        self.recovery_step = recovery_step
+        self.rate = self.max_rate
+        self.capacity = max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Réserve un créneau de requête.
+
+        Returns:
+            float: Délai à attendre avant d'envoyer la requête (secondes)
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(0.0, now - self.updated_at)
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = max(now, self.updated_at)
+            self.tokens -= 1
+            # Un créneau dans le futur (pause Retry-After) reporte la requête d'autant
+            wait = self.updated_at - now
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def on_success(self):
+        """
+        Remonte progressivement le débit après une réponse réussie.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self, retry_after=None):
+        """
+        Divise le débit par deux et suspend les requêtes pendant ``retry_after``.
+
+        Args:
+            retry_after (float, optional): Délai imposé par le serveur (secondes)
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            if retry_after:
+                self.updated_at = max(self.updated_at, time.monotonic() + retry_after)
+        logger.warning(f"Ralentissement demandé par le serveur: débit réduit à {self.rate:.2f} req/s")
+
+class CircuitBreaker:
+    """
+    Disjoncteur par hôte: après ``failure_threshold`` échecs consécutifs, les
+    requêtes sont suspendues pendant ``cooldown`` secondes, puis une seule
+    requête d'essai décide de la reprise; les autres attendent son issue.
+
+    Args:
+        failure_threshold (int, optional): Nombre d'échecs consécutifs avant ouverture
+        cooldown (float, optional): Durée de suspension en secondes
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = 'closed'
+        self.opened_at = None
+        self.probing = False
+        self.probe_started_at = None
+        self._lock = threading.Lock()
+
+    def pause(self):
+        """
+        Retourne le temps de suspension restant (0 si les requêtes sont permises).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == 'open':
+                remaining = self.opened_at + self.cooldown - now
+                if remaining > 0:
+                    return remaining
+                self.state = 'half_open'
+            if self.state != 'half_open':
+                return 0.0
+            # Une seule requête d'essai; si elle ne conclut pas (429, réponse
+            # invalide), une nouvelle est permise après ``cooldown`` secondes
+            if self.probing and now - self.probe_started_at < self.cooldown:
+                return CIRCUIT_PROBE_WAIT
+            self.probing = True
+            self.probe_started_at = now
+            return 0.0
+
+    def record_success(self):
+        """
+        Referme le disjoncteur après une réponse réussie.
+        """
+        with self._lock:
+            if self.state != 'closed':
+                logger.info("Disjoncteur refermé: reprise de la collecte")
+            self.failures = 0
+            self.state = 'closed'
+            self.probing = False
+
+    def record_failure(self):
+        """
+        Enregistre un échec et ouvre le disjoncteur si le seuil est atteint.
+        """
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                logger.warning(f"Disjoncteur ouvert après {self.failures} échecs: collecte suspendue {self.cooldown}s")
+
+class HostController:
+    """
+    Regroupe le limiteur adaptatif et le disjoncteur d'un hôte.
+
+    Args:
+        max_rate (float, optional): Débit maximal en requêtes par seconde
+    """
+
+    def __init__(self, max_rate=RATE_LIMIT):
+        self.limiter = AdaptiveRateLimiter(max_rate)
+        self.breaker = CircuitBreaker()
+
+    def _check_pause(self):
+        pause = self.breaker.pause()
+        if pause > 0 and not run_budget.allows(pause):
+            raise CircuitOpenError("Hôte indisponible au-delà du budget de la collecte")
+        return pause
+
+    def wait(self):
+        """
+        Attend (de manière bloquante) l'autorisation d'envoyer une requête.
+        """
+        pause = self._check_pause()
+        while pause > 0:
+            time.sleep(pause)
+            pause = self._check_pause()
+        time.sleep(self.limiter.reserve())
+
+    async def wait_async(self):
+        """
+        Attend (de manière asynchrone) l'autorisation d'envoyer une requête.
+        """
+        pause = self._check_pause()
+        while pause > 0:
+            await asyncio.sleep(pause)
+            pause = self._check_pause()
+        await asyncio.sleep(self.limiter.reserve())
+
+    def on_response(self, status, headers=None):
+        """
+        Met à jour le débit et le disjoncteur selon le statut d'une réponse.
+
+        Args:
+            status (int): Statut HTTP de la réponse
+            headers (Mapping, optional): En-têtes de la réponse
+
+        Returns:
+            tuple: (nouvelle tentative pertinente, délai ``Retry-After`` ou None)
+        """
+        if status not in RETRYABLE_STATUSES:
+            self.limiter.on_success()
+            self.breaker.record_success()
+            return False, None
+        retry_after = parse_retry_after((headers or {}).get('Retry-After'))
+        if status in THROTTLE_STATUSES:
+            self.limiter.on_throttle(retry_after)
+        if status != 429:
+            self.breaker.record_failure()
+        return True, retry_after
+
+    def on_error(self):
+        """
+        Enregistre une erreur réseau (connexion, délai dépassé).
+        """
+        self.breaker.record_failure()
+
+run_budget = RunBudget()
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+def host_controller(url, max_rate=RATE_LIMIT):
+    """
+    Retourne le contrôleur partagé de l'hôte d'une URL.
+
+    Args:
+        url (str): URL de la requête
+        max_rate (float, optional): Débit maximal si le contrôleur est créé
+
+    Returns:
+        HostController: Contrôleur de l'hôte
+    """
+    host = urlsplit(url).netloc
+    with _controllers_lock:
+        if host not in _controllers:
+            _controllers[host] = HostController(max_rate)
+        return _controllers[host]
+
+def can_retry(attempt, delay):
+    """
+    Indique si une nouvelle tentative est permise après l'échec ``attempt``.
+
+    Args:
+        attempt (int): Numéro de la tentative échouée (à partir de 0)
+        delay (float): Délai d'attente avant la nouvelle tentative
+
+    Returns:
+        bool: True si le nombre de tentatives et le budget le permettent
+    """
+    return attempt < MAX_RETRIES - 1 and run_budget.allows(delay)
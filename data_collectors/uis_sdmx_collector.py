@@ -0,0 +1,333 @@
+"""
+Module pour collecter les données éducatives depuis l'API SDMX de l'UNESCO UIS.
+
+La clé SDMX des requêtes suit l'ordre des dimensions de la structure (DSD) du
+flux ``UNESCO_DATAFLOW``, téléchargée au préalable: un segment par dimension,
+séparés par des points, chaque segment acceptant plusieurs codes séparés par
+``+`` (vide = toutes les valeurs). Les indicateurs sont sélectionnés par leurs
+codes de dimensions (``UNESCO_INDICATOR_KEYS``) et chaque requête couvre tous
+les indicateurs, un groupe de pays et la période demandée
+(``startPeriod``/``endPeriod``). Les réponses SDMX-CSV sont lues par blocs et
+les observations fusionnées (upsert) dans les extraits ``UNESCO_SOURCE_FILES``,
+au format long consommé par ``unesco_collector``: les années hors de la période
+collectée sont conservées.
+
+Utilisation:
+    python data_collectors/uis_sdmx_collector.py --min-year 2013 --max-year 2022
+"""
+import io
+import os
+import json
+import asyncio
+import logging
+import argparse
+
+import aiohttp
+import pandas as pd
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (UNESCO_BASE_URL, UNESCO_API_KEY, UNESCO_DATAFLOW, UNESCO_AREA_DIMENSION,
+                    UNESCO_BATCH_COUNTRIES, UNESCO_INDICATORS, UNESCO_INDICATOR_KEYS,
+                    UNESCO_SOURCE_FILES, HTTP_CACHE_CLOSED_TTL, BULK_CHUNK_ROWS)
+from data_collectors.async_engine import AsyncHttpClient
+from data_collectors.http_cache import http_cache, ttl_for_years
+from data_collectors.rate_control import run_budget
+from data_collectors.unesco_collector import (tous_pays, MIN_YEAR, MAX_YEAR, collect_unesco_data,
+                                              save_unesco_data)
+
+logger = logging.getLogger(__name__)
+
+# Colonnes du format long des extraits UIS
+UIS_COLUMNS = ['indicatorId', 'geoUnit', 'year', 'value', 'qualifier', 'magnitude']
+UIS_KEY = ['indicatorId', 'geoUnit', 'year']
+
+# Colonnes SDMX-CSV de mesure et d'attributs, et leur nom dans le format long
+SDMX_COLUMNS = {
+    'TIME_PERIOD': 'year',
+    'OBS_VALUE': 'value',
+    'OBS_STATUS': 'qualifier',
+    'UNIT_MULT': 'magnitude'
+}
+# Colonnes présentes dans l'en-tête de toute réponse SDMX-CSV valide
+SDMX_REQUIRED_COLUMNS = ['DATAFLOW', UNESCO_AREA_DIMENSION, 'TIME_PERIOD', 'OBS_VALUE']
+SDMX_DTYPES = {
+    'TIME_PERIOD': 'int32',
+    'OBS_VALUE': 'float64',
+    'OBS_STATUS': str,
+    'UNIT_MULT': str
+}
+
+def api_headers():
+    """
+    Retourne les en-têtes d'authentification de l'API UIS, si une clé est configurée.
+    """
+    if not UNESCO_API_KEY:
+        return None
+    return {'Ocp-Apim-Subscription-Key': UNESCO_API_KEY}
+
+def structure_dimensions(body):
+    """
+    Extrait l'ordre des dimensions d'une réponse de structure SDMX-JSON.
+
+    Args:
+        body (bytes): Corps de la réponse ``dataflow/...?references=datastructure``
+
+    Returns:
+        list: Identifiants des dimensions, dans l'ordre de la clé SDMX
+
+    Raises:
+        ValueError: Si la réponse ne contient pas de structure de données
+    """
+    structures = json.loads(body).get('data', {}).get('dataStructures')
+    if not structures:
+        raise ValueError("Réponse de structure SDMX sans dataStructures")
+    dimensions = structures[0]['dataStructureComponents']['dimensionList']['dimensions']
+    return [dimension['id'] for dimension in sorted(dimensions, key=lambda d: d['position'])]
+
+async def fetch_dimensions(client):
+    """
+    Télécharge la structure du flux UNESCO_DATAFLOW.
+
+    Returns:
+        list: Identifiants des dimensions, dans l'ordre de la clé SDMX
+    """
+    url = f"{UNESCO_BASE_URL}/dataflow/{UNESCO_DATAFLOW.replace(',', '/')}"
+    params = {'references': 'datastructure', 'format': 'sdmx-json'}
+    body = await client.get(url, params, ttl=HTTP_CACHE_CLOSED_TTL, validate=structure_dimensions)
+    return structure_dimensions(body)
+
+def sdmx_key(dimensions, indicator_keys, countries):
+    """
+    Construit la clé SDMX sélectionnant des indicateurs pour un groupe de pays.
+
+    Une dimension reçoit l'union des codes des indicateurs, ou toutes ses
+    valeurs (segment vide) si un indicateur ne la précise pas.
+
+    Args:
+        dimensions (list): Dimensions du flux, dans l'ordre de la clé
+        indicator_keys (dict): Codes de dimensions {identifiant UIS: {dimension: code}}
+        countries (list): Codes pays ISO-3
+
+    Returns:
+        str: Clé SDMX
+
+    Raises:
+        ValueError: Si un indicateur utilise une dimension absente du flux
+    """
+    unknown = {dimension for codes in indicator_keys.values() for dimension in codes} - set(dimensions)
+    if unknown:
+        raise ValueError(f"Dimensions absentes de la structure du flux {UNESCO_DATAFLOW}: {sorted(unknown)}")
+    segments = []
+    for dimension in dimensions:
+        if dimension == UNESCO_AREA_DIMENSION:
+            codes = countries
+        elif all(dimension in codes for codes in indicator_keys.values()):
+            codes = sorted({codes[dimension] for codes in indicator_keys.values()})
+        else:
+            codes = []
+        segments.append('+'.join(codes))
+    return '.'.join(segments)
+
+def sdmx_query(dimensions, indicator_keys, countries, min_year, max_year):
+    """
+    Construit une requête SDMX groupée.
+
+    Args:
+        dimensions (list): Dimensions du flux, dans l'ordre de la clé
+        indicator_keys (dict): Codes de dimensions {identifiant UIS: {dimension: code}}
+        countries (list): Codes pays ISO-3
+        min_year (int): Première année
+        max_year (int): Dernière année
+
+    Returns:
+        tuple: (URL, paramètres de la requête)
+    """
+    key = sdmx_key(dimensions, indicator_keys, countries)
+    url = f"{UNESCO_BASE_URL}/data/{UNESCO_DATAFLOW}/{key}"
+    params = {'startPeriod': min_year, 'endPeriod': max_year, 'format': 'csv'}
+    return url, params
+
+def check_sdmx_csv(body):
+    """
+    Vérifie qu'un corps de réponse est un SDMX-CSV avant sa mise en cache:
+    une erreur ou un corps vide servis avec un statut 200 ne doivent pas être
+    rejoués pendant toute la durée de validité du cache.
+
+    Args:
+        body (bytes): Corps de la réponse
+
+    Raises:
+        ValueError: Si l'en-tête SDMX-CSV attendu est absent
+    """
+    header = body.split(b'\n', 1)[0].decode('utf-8-sig', errors='replace').strip()
+    missing = [column for column in SDMX_REQUIRED_COLUMNS if column not in header.split(',')]
+    if missing:
+        raise ValueError(f"Réponse SDMX-CSV invalide, colonnes absentes de l'en-tête: {missing}")
+
+def parse_sdmx_csv(body, indicator_keys, chunk_rows=BULK_CHUNK_ROWS):
+    """
+    Lit une réponse SDMX-CSV par blocs et la convertit au format long UIS.
+
+    Chaque observation est rattachée à l'indicateur dont tous les codes de
+    dimensions correspondent; les autres observations sont ignorées.
+
+    Args:
+        body (bytes): Corps de la réponse
+        indicator_keys (dict): Codes de dimensions {identifiant UIS: {dimension: code}}
+        chunk_rows (int, optional): Nombre de lignes lues par bloc
+
+    Yields:
+        pandas.DataFrame: Colonnes indicatorId, geoUnit, year, value, qualifier, magnitude
+    """
+    if not body.strip():
+        return
+    key_dimensions = sorted({dimension for codes in indicator_keys.values() for dimension in codes})
+    usecols = key_dimensions + [UNESCO_AREA_DIMENSION] + list(SDMX_COLUMNS)
+    dtypes = {**dict.fromkeys(key_dimensions + [UNESCO_AREA_DIMENSION], str), **SDMX_DTYPES}
+    chunks = pd.read_csv(io.BytesIO(body), usecols=usecols, dtype=dtypes, keep_default_na=False,
+                         na_values={'OBS_VALUE': [''], 'OBS_STATUS': [''], 'UNIT_MULT': ['']},
+                         chunksize=chunk_rows)
+    for chunk in chunks:
+        chunk['indicatorId'] = None
+        for indicator_id, codes in indicator_keys.items():
+            mask = pd.Series(True, index=chunk.index)
+            for dimension, code in codes.items():
+                mask &= chunk[dimension] == code
+            chunk.loc[mask, 'indicatorId'] = indicator_id
+        chunk = chunk[chunk['indicatorId'].notna()]
+        yield (chunk.rename(columns={UNESCO_AREA_DIMENSION: 'geoUnit', **SDMX_COLUMNS})[UIS_COLUMNS]
+               .reset_index(drop=True))
+
+def upsert_extract(path, observations):
+    """
+    Fusionne des observations dans un extrait UIS: les clés (indicateur, pays,
+    année) collectées remplacent les existantes, les autres sont conservées.
+    L'extrait est réécrit de façon atomique.
+
+    Args:
+        path (str): Chemin de l'extrait
+        observations (pandas.DataFrame): Observations collectées au format long
+
+    Returns:
+        int: Nombre d'observations de l'extrait après fusion
+    """
+    frames = [observations]
+    if os.path.exists(path):
+        existing = pd.read_csv(path, dtype={'geoUnit': str, 'qualifier': str, 'magnitude': str},
+                               keep_default_na=False, na_values={'value': [''], 'qualifier': [''],
+                                                                 'magnitude': ['']})
+        frames.insert(0, existing[UIS_COLUMNS])
+    merged = (pd.concat(frames, ignore_index=True)
+              .drop_duplicates(UIS_KEY, keep='last')
+              .sort_values(UIS_KEY))
+    temp_path = f"{path}.tmp"
+    merged.to_csv(temp_path, index=False)
+    os.replace(temp_path, path)
+    return len(merged)
+
+async def fetch_sdmx_chunk(client, dimensions, indicator_keys, countries, min_year, max_year):
+    """
+    Télécharge les observations d'un groupe de pays pour tous les indicateurs.
+
+    Les erreurs HTTP et les réponses invalides sont comptées comme un échec du
+    groupe; le mode hors-ligne sans réponse en cache et l'épuisement du budget
+    de la collecte interrompent la collecte.
+
+    Returns:
+        bytes: Corps de la réponse SDMX-CSV, ou None en cas d'échec
+    """
+    url, params = sdmx_query(dimensions, indicator_keys, countries, min_year, max_year)
+    try:
+        return await client.get(url, params, ttl=ttl_for_years([max_year]), validate=check_sdmx_csv)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.warning(f"Erreur lors de la collecte UIS pour {len(countries)} pays: {e}")
+        return None
+
+async def collect_uis_sdmx_async(indicators=None, countries=None, min_year=MIN_YEAR, max_year=MAX_YEAR,
+                                 output_files=None, chunk_rows=BULK_CHUNK_ROWS):
+    """
+    Collecte les indicateurs UIS via l'API SDMX et les fusionne dans les extraits au format long.
+
+    Les extraits ne sont mis à jour que si toutes les requêtes ont abouti; les
+    observations hors de la période ou des pays collectés sont conservées.
+
+    Args:
+        indicators (dict, optional): Indicateurs {identifiant UIS: nom de colonne}
+        countries (list, optional): Codes pays ISO-3 (par défaut tous_pays)
+        min_year (int, optional): Première année collectée
+        max_year (int, optional): Dernière année collectée
+        output_files (dict, optional): Extraits {nom de colonne: chemin}
+        chunk_rows (int, optional): Nombre de lignes lues par bloc
+
+    Returns:
+        dict: Nombre d'observations collectées par nom de colonne
+    """
+    if indicators is None:
+        indicators = UNESCO_INDICATORS
+    if countries is None:
+        countries = tous_pays
+    if output_files is None:
+        output_files = UNESCO_SOURCE_FILES
+
+    indicator_keys = {indicator_id: UNESCO_INDICATOR_KEYS[indicator_id] for indicator_id in indicators}
+    collected = {column: [] for column in indicators.values()}
+    failed_chunks = 0
+    country_chunks = [countries[start:start + UNESCO_BATCH_COUNTRIES]
+                      for start in range(0, len(countries), UNESCO_BATCH_COUNTRIES)]
+    logger.info(f"Collecte UIS SDMX pour {len(indicators)} indicateurs, {len(countries)} pays "
+                f"({len(country_chunks)} requêtes) de {min_year} à {max_year}")
+
+    async with AsyncHttpClient(headers=api_headers()) as client:
+        dimensions = await fetch_dimensions(client)
+        tasks = [fetch_sdmx_chunk(client, dimensions, indicator_keys, chunk, min_year, max_year)
+                 for chunk in country_chunks]
+        for task in asyncio.as_completed(tasks):
+            body = await task
+            if body is None:
+                failed_chunks += 1
+                continue
+            for observations in parse_sdmx_csv(body, indicator_keys, chunk_rows):
+                for indicator_id, group in observations.groupby('indicatorId', sort=False):
+                    collected[indicators[indicator_id]].append(group)
+        logger.info(f"{client.request_count} requêtes UIS effectuées")
+
+    if failed_chunks:
+        raise RuntimeError(f"{failed_chunks} requêtes UIS ont échoué, extraits existants conservés")
+
+    rows_collected = {}
+    for column, groups in collected.items():
+        observations = pd.concat(groups, ignore_index=True) if groups else pd.DataFrame(columns=UIS_COLUMNS)
+        rows_collected[column] = len(observations)
+        total = upsert_extract(output_files[column], observations)
+        logger.info(f"{len(observations)} observations {column} fusionnées dans {output_files[column]} "
+                    f"({total} au total)")
+    return rows_collected
+
+def collect_uis_sdmx(**kwargs):
+    """
+    Version synchrone de ``collect_uis_sdmx_async``.
+    """
+    run_budget.restart()
+    return asyncio.run(collect_uis_sdmx_async(**kwargs))
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Collecte des données UIS via l'API SDMX")
+    parser.add_argument('--min-year', type=int, default=MIN_YEAR, help="Première année collectée")
+    parser.add_argument('--max-year', type=int, default=MAX_YEAR, help="Dernière année collectée")
+    parser.add_argument('--offline', action='store_true',
+                        help="Rejouer uniquement les réponses du cache HTTP, sans accès réseau")
+    parser.add_argument('--no-cache', action='store_true', help="Ignorer le cache HTTP disque")
+    parser.add_argument('--skip-combine', action='store_true',
+                        help="Ne pas régénérer le fichier UNESCO combiné après la collecte")
+    args = parser.parse_args()
+    http_cache.offline = args.offline
+    http_cache.enabled = not args.no_cache
+
+    collect_uis_sdmx(min_year=args.min_year, max_year=args.max_year)
+    if not args.skip_combine:
+        save_unesco_data(collect_unesco_data(min_year=args.min_year, max_year=args.max_year))
@@ -1,124 +1,188 @@
+"""
+Module pour charger les données éducatives UNESCO UIS depuis les extraits CSV
+téléchargés (format long ``indicatorId, geoUnit, year, value, ...``).
+
+Les fichiers sont lus par blocs, en ne conservant que les colonnes utiles avec
+des types explicites; les filtres sur les indicateurs, les années et les pays
+sont appliqués à chaque bloc pendant la lecture, ce qui permet de charger des
+extraits UIS complets (plusieurs millions de lignes) avec une mémoire bornée.
+Les observations de tous les fichiers sont ensuite passées au format large en
+un seul pivot, selon la correspondance ``UNESCO_INDICATORS``.
+
+Utilisation:
+    python data_collectors/unesco_collector.py --min-year 2013 --max-year 2022
+"""
+import os
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-# Définir les listes des pays par continent
-pays_afrique = [
-    'DZA', 'AGO', 'BEN', 'BWA', 'BFA', 'BDI', 'CMR', 'CPV', 'CAF', 'TCD', 
-    'COM', 'COG', 'COD', 'DJI', 'EGY', 'GNQ', 'ERI', 'ETH', 'GAB', 'GMB', 
-    'GHA', 'GIN', 'GNB', 'CIV', 'KEN', 'LSO', 'LBR', 'LBY', 'MDG', 'MWI', 
-    'MLI', 'MRT', 'MUS', 'MAR', 'MOZ', 'NAM', 'NER', 'NGA', 'RWA', 'STP', 
-    'SEN', 'SYC', 'SLE', 'SOM', 'ZAF', 'SSD', 'SDN', 'SWZ', 'TZA', 'TGO', 
-    'TUN', 'UGA', 'ZMB', 'ZWE'
-]
-
-pays_asie = [
-    'AFG', 'ARM', 'AZE', 'BHR', 'BGD', 'BTN', 'BRN', 'KHM', 'CHN', 'CYP', 
-    'GEO', 'HKG', 'IND', 'IDN', 'IRN', 'IRQ', 'ISR', 'JPN', 'JOR', 'KAZ', 
-    'KWT', 'KGZ', 'LAO', 'LBN', 'MAC', 'MYS', 'MDV', 'MNG', 'MMR', 'NPL', 
-    'OMN', 'PAK', 'PSE', 'PHL', 'QAT', 'SAU', 'SGP', 'KOR', 'LKA', 'SYR', 
-    'TWN', 'TJK', 'THA', 'TLS', 'TUR', 'TKM', 'ARE', 'UZB', 'VNM', 'YEM'
-]
-
-pays_europe = [
-    'ALB', 'AND', 'AUT', 'BLR', 'BEL', 'BIH', 'BGR', 'HRV', 'CZE', 'DNK', 
-    'EST', 'FIN', 'FRA', 'DEU', 'GRC', 'HUN', 'ISL', 'IRL', 'ITA', 'LVA', 
-    'LIE', 'LTU', 'LUX', 'MLT', 'MDA', 'MCO', 'MNE', 'NLD', 'MKD', 'NOR', 
-    'POL', 'PRT', 'ROU', 'RUS', 'SMR', 'SRB', 'SVK', 'SVN', 'ESP', 'SWE', 
-    'CHE', 'UKR', 'GBR', 'VAT'
-]
-
-# Lecture des fichiers CSV
-free_education = pd.read_csv('free_education.csv')
-mobilite_entrant = pd.read_csv('taux_mobilité_entrant.csv')
-mobilite_sortant = pd.read_csv('taux_mobilité_sortant.csv')
-
-# Supprimer les colonnes non nécessaires
-columns_to_drop = ['indicatorId', 'qualifier', 'magnitude']
-free_education = free_education.drop(columns=columns_to_drop)
-mobilite_entrant = mobilite_entrant.drop(columns=columns_to_drop)
-mobilite_sortant = mobilite_sortant.drop(columns=columns_to_drop)
-
-# Renommer les colonnes pour chaque dataset
-column_mapping = {
-    'geoUnit': 'country_code',
-    'year': 'year',
-    'value': 'value'
-}
-
-free_education = free_education.rename(columns=column_mapping)
-mobilite_entrant = mobilite_entrant.rename(columns=column_mapping)
-mobilite_sortant = mobilite_sortant.rename(columns=column_mapping)
-
-# Filtrer les données entre 2013 et 2022
-min_year = 2013
-max_year = 2022
-
-free_education = free_education[
-    (free_education['year'] >= min_year) & 
-    (free_education['year'] <= max_year)
-]
-
-mobilite_entrant = mobilite_entrant[
-    (mobilite_entrant['year'] >= min_year) & 
-    (mobilite_entrant['year'] <= max_year)
-]
-
-mobilite_sortant = mobilite_sortant[
-    (mobilite_sortant['year'] >= min_year) & 
-    (mobilite_sortant['year'] <= max_year)
-]
-
-# Filtrer les pays par continent
-tous_pays = pays_afrique + pays_asie + pays_europe
-free_education = free_education[free_education['country_code'].isin(tous_pays)]
-mobilite_entrant = mobilite_entrant[mobilite_entrant['country_code'].isin(tous_pays)]
-mobilite_sortant = mobilite_sortant[mobilite_sortant['country_code'].isin(tous_pays)]
-
-# Renommer les colonnes de valeur pour chaque dataset
-free_education = free_education.rename(columns={'value': 'free_education_years'})
-mobilite_entrant = mobilite_entrant.rename(columns={'value': 'inbound_mobility_rate'})
-mobilite_sortant = mobilite_sortant.rename(columns={'value': 'outbound_mobility_rate'})
-
-# Fusionner les datasets
-donnees_combinees = free_education.merge(
-    mobilite_entrant[['country_code', 'year', 'inbound_mobility_rate']],
-    on=['country_code', 'year'],
-    how='outer'
-).merge(
-    mobilite_sortant[['country_code', 'year', 'outbound_mobility_rate']],
-    on=['country_code', 'year'],
-    how='outer'
-)
-
-# Ajouter la colonne région
-def get_region(pays):
-    if pays in pays_afrique:
-        return 'Africa'
-    elif pays in pays_asie:
-        return 'Asia'
-    elif pays in pays_europe:
-        return 'Europe'
-    return 'Other'
-
-donnees_combinees['region'] = donnees_combinees['country_code'].apply(get_region)
-
-# Trier les données
-donnees_combinees = donnees_combinees.sort_values(['region', 'country_code', 'year'])
-
-# Sauvegarder le fichier final
-donnees_combinees.to_csv('unesco_data.csv', index=False)
-
-# Afficher les statistiques
-print("\nStatistiques par région :")
-print("\nNombre d'enregistrements par région :")
-print(donnees_combinees['region'].value_counts())
-
-print("\nMoyennes par région :")
-for region in ['Africa', 'Asia', 'Europe']:
-    print(f"\n{region} :")
-    region_data = donnees_combinees[donnees_combinees['region'] == region]
-    print(f"Nombre moyen d'années d'éducation gratuite : {region_data['free_education_years'].mean():.2f}")
-    print(f"Taux moyen de mobilité entrante : {region_data['inbound_mobility_rate'].mean():.2f}")
-    print(f"Taux moyen de mobilité sortante : {region_data['outbound_mobility_rate'].mean():.2f}")
-
-print("\nStructure des données après nettoyage :")
-print(donnees_combinees.head())
\ No newline at end of file
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import UNESCO_RAW_FILE, UNESCO_RAW_DATASET, UNESCO_SOURCE_FILES, UNESCO_INDICATORS, BULK_CHUNK_ROWS
+from country_registry import REGIONS, countries_in_region, region_of
+from data_processing.schema import write_partitioned, KEY_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Pays collectés (codes ISO-3 utilisés par l'UIS)
+tous_pays = [country for region in REGIONS for country in countries_in_region(region, code='iso3')]
+
+# Période collectée par défaut
+MIN_YEAR = 2013
+MAX_YEAR = 2022
+
+# Colonnes lues dans les extraits UIS et leurs types
+UIS_COLUMNS = ['indicatorId', 'geoUnit', 'year', 'value']
+UIS_DTYPES = {'indicatorId': str, 'geoUnit': str, 'year': 'int32', 'value': 'float64'}
+
+def read_uis_files(paths, indicator_ids, countries=None, min_year=MIN_YEAR, max_year=MAX_YEAR,
+                   chunk_rows=BULK_CHUNK_ROWS):
+    """
+    Lit des extraits UIS au format long par blocs, en filtrant les indicateurs,
+    les années et les pays pendant la lecture, et les concatène une seule fois.
+
+    Args:
+        paths (iterable): Chemins des fichiers CSV UIS
+        indicator_ids (iterable): Identifiants UIS des indicateurs à conserver
+        countries (list, optional): Codes pays ISO-3 à conserver (par défaut tous_pays)
+        min_year (int, optional): Première année conservée
+        max_year (int, optional): Dernière année conservée
+        chunk_rows (int, optional): Nombre de lignes lues par bloc
+
+    Returns:
+        pandas.DataFrame: Colonnes indicatorId, geoUnit, year et value
+    """
+    wanted_countries = set(tous_pays if countries is None else countries)
+    wanted_indicators = set(indicator_ids)
+    kept = []
+    for path in paths:
+        rows_read, rows_kept = 0, 0
+        chunks = pd.read_csv(path, usecols=UIS_COLUMNS, dtype=UIS_DTYPES, chunksize=chunk_rows)
+        for chunk in chunks:
+            rows_read += len(chunk)
+            mask = (chunk['year'].between(min_year, max_year)
+                    & chunk['geoUnit'].isin(wanted_countries)
+                    & chunk['indicatorId'].isin(wanted_indicators))
+            if mask.any():
+                kept.append(chunk[mask])
+                rows_kept += int(mask.sum())
+        logger.info(f"{path}: {rows_kept} lignes conservées sur {rows_read} lues")
+
+    if not kept:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in UIS_DTYPES.items()})
+    return pd.concat(kept, ignore_index=True)
+
+def pivot_uis_data(long_df, indicators):
+    """
+    Passe les observations UIS du format long au format large en un seul
+    passage: chaque (pays, année) devient une ligne et chaque indicateur une
+    colonne. Une seule observation est conservée par (pays, année, indicateur)
+    et les indicateurs absents de ``indicators`` sont ignorés.
+
+    Args:
+        long_df (pandas.DataFrame): Observations retournées par ``read_uis_files``
+        indicators (dict): Indicateurs {identifiant UIS: nom de colonne}
+
+    Returns:
+        pandas.DataFrame: Colonnes country_code, year, une colonne par indicateur
+        et region, triées par région, pays et année
+    """
+    columns = list(indicators.values())
+    long_df = long_df[long_df['indicatorId'].isin(indicators)]
+    row_codes, keys = pd.MultiIndex.from_arrays([long_df['geoUnit'], long_df['year']]).factorize()
+    column_codes = pd.Index(list(indicators)).get_indexer(long_df['indicatorId'])
+
+    values = np.full((len(keys), len(columns)), np.nan)
+    values[row_codes, column_codes] = long_df['value'].to_numpy()
+
+    donnees_combinees = pd.DataFrame(values, columns=columns)
+    donnees_combinees.insert(0, 'country_code', keys.get_level_values(0))
+    donnees_combinees.insert(1, 'year', keys.get_level_values(1))
+    donnees_combinees['region'] = region_of(donnees_combinees['country_code'], code='iso3')
+    return donnees_combinees.sort_values(['region', 'country_code', 'year'])
+
+def collect_unesco_data(source_files=None, indicators=None, countries=None, min_year=MIN_YEAR,
+                        max_year=MAX_YEAR, chunk_rows=BULK_CHUNK_ROWS):
+    """
+    Charge et combine les extraits UIS configurés.
+
+    Args:
+        source_files (iterable, optional): Chemins des extraits UIS, un dictionnaire
+            {nom de colonne: chemin} étant accepté (par défaut ``UNESCO_SOURCE_FILES``)
+        indicators (dict, optional): Indicateurs {identifiant UIS: nom de colonne}
+            (par défaut ``UNESCO_INDICATORS``)
+        countries (list, optional): Codes pays ISO-3 à conserver
+        min_year (int, optional): Première année conservée
+        max_year (int, optional): Dernière année conservée
+        chunk_rows (int, optional): Nombre de lignes lues par bloc
+
+    Returns:
+        pandas.DataFrame: Données UNESCO combinées
+    """
+    if source_files is None:
+        source_files = UNESCO_SOURCE_FILES
+    if isinstance(source_files, dict):
+        source_files = source_files.values()
+    if indicators is None:
+        indicators = UNESCO_INDICATORS
+
+    long_df = read_uis_files(source_files, indicators, countries, min_year, max_year, chunk_rows)
+    donnees_combinees = pivot_uis_data(long_df, indicators)
+    logger.info(f"Collectées {len(donnees_combinees)} lignes de données UNESCO")
+    return donnees_combinees
+
+def save_unesco_data(df, path=UNESCO_RAW_FILE, dataset_path=UNESCO_RAW_DATASET):
+    """
+    Sauvegarde les données UNESCO dans un fichier CSV et un jeu de données
+    Parquet partitionné par région et année.
+
+    Args:
+        df (pandas.DataFrame): DataFrame à sauvegarder
+        path (Path, optional): Chemin du fichier de sortie
+        dataset_path (Path, optional): Répertoire du jeu de données Parquet
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+    write_partitioned(df, dataset_path, KEY_SCHEMA)
+    logger.info(f"Données UNESCO sauvegardées dans {path}")
+
+def print_statistics(donnees_combinees):
+    """
+    Affiche les statistiques par région des données combinées.
+    """
+    print("\nStatistiques par région :")
+    print("\nNombre d'enregistrements par région :")
+    print(donnees_combinees['region'].value_counts())
+
+    print("\nMoyennes par région :")
+    for region in REGIONS:
+        print(f"\n{region} :")
+        region_data = donnees_combinees[donnees_combinees['region'] == region]
+        print(f"Nombre moyen d'années d'éducation gratuite : {region_data['free_education_years'].mean():.2f}")
+        print(f"Taux moyen de mobilité entrante : {region_data['inbound_mobility_rate'].mean():.2f}")
+        print(f"Taux moyen de mobilité sortante : {region_data['outbound_mobility_rate'].mean():.2f}")
+
+    print("\nStructure des données après nettoyage :")
+    print(donnees_combinees.head())
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Chargement des extraits UNESCO UIS")
+    parser.add_argument('--min-year', type=int, default=MIN_YEAR, help="Première année conservée")
+    parser.add_argument('--max-year', type=int, default=MAX_YEAR, help="Dernière année conservée")
+    parser.add_argument('--chunk-rows', type=int, default=BULK_CHUNK_ROWS,
+                        help="Nombre de lignes lues par bloc (borne la mémoire utilisée)")
+    parser.add_argument('--output', default=str(UNESCO_RAW_FILE), help="Fichier CSV de sortie")
+    args = parser.parse_args()
+
+    donnees_combinees = collect_unesco_data(min_year=args.min_year, max_year=args.max_year,
+                                            chunk_rows=args.chunk_rows)
+    save_unesco_data(donnees_combinees, args.output, Path(args.output).with_suffix('.parquet'))
+    print_statistics(donnees_combinees)
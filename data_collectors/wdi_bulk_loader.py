@@ -0,0 +1,131 @@
+"""
+Ingestion des archives CSV en masse de la World Bank (WDI, EdStats).
+
+Pour une actualisation complète, l'archive ZIP publiée par la World Bank est lue
+en flux, par blocs, directement depuis le ZIP: seuls les indicateurs, pays et
+années configurés sont conservés pendant la lecture, sans jamais décompresser
+le fichier entier en mémoire. Le résultat a le même schéma que
+``get_worldbank_data``.
+
+Utilisation:
+    python data_collectors/wdi_bulk_loader.py chemin/vers/WDI_CSV.zip
+"""
+import os
+import logging
+import argparse
+import zipfile
+
+import pandas as pd
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import WDI_BULK_ARCHIVE, BULK_CHUNK_ROWS
+from data_collectors.worldbank_collector import resolve_collection_params, new_accumulator, save_worldbank_data
+
+logger = logging.getLogger(__name__)
+
+def find_archive_members(archive):
+    """
+    Repère le fichier de données et le fichier des pays dans une archive WDI/EdStats.
+
+    Args:
+        archive (zipfile.ZipFile): Archive ouverte
+
+    Returns:
+        tuple: (nom du fichier de données, nom du fichier des pays)
+    """
+    names = archive.namelist()
+    data_members = [name for name in names
+                    if name.endswith('Data.csv') or name.endswith('WDICSV.csv')]
+    country_members = [name for name in names if name.endswith('Country.csv')]
+    if not data_members or not country_members:
+        raise ValueError(f"Archive WDI/EdStats non reconnue, fichiers présents: {names}")
+    return data_members[0], country_members[0]
+
+def read_country_codes(archive, member):
+    """
+    Lit la correspondance ISO-3 -> ISO-2 fournie par l'archive.
+
+    Args:
+        archive (zipfile.ZipFile): Archive ouverte
+        member (str): Nom du fichier des pays dans l'archive
+
+    Returns:
+        dict: {code ISO-3: code ISO-2}
+    """
+    with archive.open(member) as stream:
+        # keep_default_na=False: 'NA' est le code ISO-2 de la Namibie
+        countries = pd.read_csv(stream, usecols=['Country Code', '2-alpha code'],
+                                dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    countries = countries[countries['2-alpha code'] != '']
+    return dict(zip(countries['Country Code'], countries['2-alpha code']))
+
+def load_wdi_archive(archive_path=WDI_BULK_ARCHIVE, indicators=None, countries=None, years=None,
+                     chunk_rows=BULK_CHUNK_ROWS):
+    """
+    Charge les indicateurs configurés depuis une archive CSV WDI/EdStats.
+
+    Args:
+        archive_path (Path, optional): Chemin de l'archive ZIP
+        indicators (dict, optional): Indicateurs {code: nom de colonne}
+        countries (list, optional): Liste des codes pays ISO-2
+        years (list, optional): Liste des années
+        chunk_rows (int, optional): Nombre de lignes lues par bloc
+
+    Returns:
+        pandas.DataFrame: DataFrame au même format que ``get_worldbank_data``
+    """
+    indicators, countries, years = resolve_collection_params(indicators, countries, years)
+    logger.info(f"Ingestion de l'archive {archive_path} pour {len(indicators)} indicateurs, {len(countries)} pays et {len(years)} années")
+
+    values = new_accumulator(countries, years, indicators)
+    wanted_countries = set(countries)
+    year_columns = [str(year) for year in years]
+    rows_read = 0
+
+    with zipfile.ZipFile(archive_path) as archive:
+        data_member, country_member = find_archive_members(archive)
+        iso3_to_iso2 = {iso3: iso2 for iso3, iso2 in read_country_codes(archive, country_member).items()
+                        if iso2 in wanted_countries}
+
+        with archive.open(data_member) as stream:
+            header = pd.read_csv(stream, nrows=0, encoding='utf-8-sig').columns
+        available_years = [column for column in year_columns if column in header]
+
+        with archive.open(data_member) as stream:
+            chunks = pd.read_csv(
+                stream,
+                usecols=['Country Code', 'Indicator Code'] + available_years,
+                dtype={'Country Code': str, 'Indicator Code': str},
+                chunksize=chunk_rows,
+                encoding='utf-8-sig'
+            )
+            for chunk in chunks:
+                rows_read += len(chunk)
+                chunk = chunk[chunk['Indicator Code'].isin(indicators) & chunk['Country Code'].isin(iso3_to_iso2)]
+                if chunk.empty:
+                    continue
+                long_chunk = chunk.melt(
+                    id_vars=['Country Code', 'Indicator Code'],
+                    value_vars=available_years,
+                    var_name='year'
+                ).dropna(subset=['value'])
+                for indicator_code, group in long_chunk.groupby('Indicator Code', sort=False):
+                    values.assign(indicator_code, group['Country Code'].map(iso3_to_iso2),
+                                  group['year'].astype(int), group['value'])
+
+    logger.info(f"{rows_read} lignes lues dans l'archive")
+    df = values.to_frame()
+    logger.info(f"Collectées {len(df)} lignes de données World Bank depuis l'archive")
+    return df
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Ingestion d'une archive CSV WDI/EdStats")
+    parser.add_argument('archive', nargs='?', default=str(WDI_BULK_ARCHIVE),
+                        help="Chemin de l'archive ZIP téléchargée depuis la World Bank")
+    args = parser.parse_args()
+    save_worldbank_data(load_wdi_archive(args.archive))
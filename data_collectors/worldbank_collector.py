@@ -3,16 +3,29 @@ Module pour collecter les données socio-économiques depuis l'API World Bank Ed
 """
 import os
 import time
+import asyncio
+import argparse
 import logging
 import json
 import pandas as pd
 import requests
-from ratelimit import limits, sleep_and_retry
 from tqdm import tqdm
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import WORLDBANK_API_URL, WORLDBANK_RAW_FILE, REQUEST_TIMEOUT, MAX_RETRIES, RATE_LIMIT
+from config import (WORLDBANK_API_URL, WORLDBANK_RAW_FILE, REQUEST_TIMEOUT, MAX_RETRIES,
+                    WORLDBANK_BATCH_COUNTRIES, WORLDBANK_PER_PAGE, WORLDBANK_JOURNAL_FILE,
+                    WORLDBANK_RAW_DATASET, WORLDBANK_ABSENT_FILE, HTTP_CACHE_TTL)
+from data_collectors.async_engine import AsyncHttpClient
+from data_collectors.http_cache import http_cache, ttl_for_years, OfflineCacheMiss
+from data_collectors.checkpoint import CollectionJournal
+from data_collectors.rate_control import (host_controller, retry_delay, can_retry, run_budget,
+                                          CircuitOpenError)
+from data_collectors.delta import (frame_to_cells, first_revisable_year, plan_delta, plan_requests, upsert_cells,
+                                  read_absent_cells, write_absent_cells, absent_cells)
+from data_collectors.accumulator import IndicatorAccumulator
+from country_registry import AFRICA, ASIA, EUROPE, countries_in_region, region_of
+from data_processing.schema import write_partitioned, KEY_SCHEMA
 
 # Configuration du logging
 logging.basicConfig(
@@ -21,187 +34,148 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Constantes pour les régions
-country_regions = {
-    # African countries
-    'DZ': 'Africa',  # Algeria
-    'BJ': 'Africa',  # Benin
-    'BW': 'Africa',  # Botswana
-    'BF': 'Africa',  # Burkina Faso
-    'BI': 'Africa',  # Burundi
-    'CM': 'Africa',  # Cameroon
-    'CV': 'Africa',  # Cape Verde
-    'CF': 'Africa',  # Central African Republic
-    'TD': 'Africa',  # Chad
-    'KM': 'Africa',  # Comoros
-    'CG': 'Africa',  # Congo
-    'CD': 'Africa',  # DR Congo
-    'DJ': 'Africa',  # Djibouti
-    'EG': 'Africa',  # Egypt
-    'GQ': 'Africa',  # Equatorial Guinea
-    'ER': 'Africa',  # Eritrea
-    'ET': 'Africa',  # Ethiopia
-    'GA': 'Africa',  # Gabon
-    'GM': 'Africa',  # Gambia
-    'GH': 'Africa',  # Ghana
-    'GN': 'Africa',  # Guinea
-    'GW': 'Africa',  # Guinea-Bissau
-    'CI': 'Africa',  # Ivory Coast
-    'KE': 'Africa',  # Kenya
-    'LS': 'Africa',  # Lesotho
-    'LR': 'Africa',  # Liberia
-    'LY': 'Africa',  # Libya
-    'MG': 'Africa',  # Madagascar
-    'MW': 'Africa',  # Malawi
-    'ML': 'Africa',  # Mali
-    'MR': 'Africa',  # Mauritania
-    'MU': 'Africa',  # Mauritius
-    'MA': 'Africa',  # Morocco
-    'MZ': 'Africa',  # Mozambique
-    'NA': 'Africa',  # Namibia
-    'NE': 'Africa',  # Niger
-    'NG': 'Africa',  # Nigeria
-    'RW': 'Africa',  # Rwanda
-    'ST': 'Africa',  # Sao Tome and Principe
-    'SN': 'Africa',  # Senegal
-    'SC': 'Africa',  # Seychelles
-    'SL': 'Africa',  # Sierra Leone
-    'SO': 'Africa',  # Somalia
-    'ZA': 'Africa',  # South Africa
-    'SS': 'Africa',  # South Sudan
-    'SD': 'Africa',  # Sudan
-    'SZ': 'Africa',  # Eswatini (Swaziland)
-    'TZ': 'Africa',  # Tanzania
-    'TG': 'Africa',  # Togo
-    'TN': 'Africa',  # Tunisia
-    'UG': 'Africa',  # Uganda
-    'ZM': 'Africa',  # Zambia
-    'ZW': 'Africa',  # Zimbabwe
-
-    # Asian countries
-    'AF': 'Asia',   # Afghanistan
-    'AM': 'Asia',   # Armenia
-    'AZ': 'Asia',   # Azerbaijan
-    'BH': 'Asia',   # Bahrain
-    'BD': 'Asia',   # Bangladesh
-    'BT': 'Asia',   # Bhutan
-    'BN': 'Asia',   # Brunei
-    'KH': 'Asia',   # Cambodia
-    'CN': 'Asia',   # China
-    'CY': 'Asia',   # Cyprus
-    'GE': 'Asia',   # Georgia
-    'IN': 'Asia',   # India
-    'ID': 'Asia',   # Indonesia
-    'IR': 'Asia',   # Iran
-    'IQ': 'Asia',   # Iraq
-    'IL': 'Asia',   # Israel
-    'JP': 'Asia',   # Japan
-    'JO': 'Asia',   # Jordan
-    'KZ': 'Asia',   # Kazakhstan
-    'KW': 'Asia',   # Kuwait
-    'KG': 'Asia',   # Kyrgyzstan
-    'LA': 'Asia',   # Laos
-    'LB': 'Asia',   # Lebanon
-    'MY': 'Asia',   # Malaysia
-    'MV': 'Asia',   # Maldives
-    'MN': 'Asia',   # Mongolia
-    'MM': 'Asia',   # Myanmar
-    'NP': 'Asia',   # Nepal
-    'OM': 'Asia',   # Oman
-    'PK': 'Asia',   # Pakistan
-    'PS': 'Asia',   # Palestine
-    'PH': 'Asia',   # Philippines
-    'QA': 'Asia',   # Qatar
-    'SA': 'Asia',   # Saudi Arabia
-    'SG': 'Asia',   # Singapore
-    'KR': 'Asia',   # South Korea
-    'LK': 'Asia',   # Sri Lanka
-    'SY': 'Asia',   # Syria
-    'TW': 'Asia',   # Taiwan
-    'TJ': 'Asia',   # Tajikistan
-    'TH': 'Asia',   # Thailand
-    'TL': 'Asia',   # Timor-Leste
-    'TR': 'Asia',   # Turkey
-    'TM': 'Asia',   # Turkmenistan
-    'AE': 'Asia',   # United Arab Emirates
-    'UZ': 'Asia',   # Uzbekistan
-    'YE': 'Asia',    # Yemen
-    # European countries
-    'AL': 'Albania',
-    'AD': 'Andorra',
-    'AT': 'Austria',
-    'BY': 'Belarus',
-    'BE': 'Belgium',
-    'BA': 'Bosnia and Herzegovina',
-    'BG': 'Bulgaria',
-    'HR': 'Croatia',
-    'CY': 'Cyprus',
-    'CZ': 'Czech Republic',
-    'DK': 'Denmark',
-    'EE': 'Estonia',
-    'FI': 'Finland',
-    'FR': 'France',
-    'DE': 'Germany',
-    'GR': 'Greece',
-    'HU': 'Hungary',
-    'IS': 'Iceland',
-    'IE': 'Ireland',
-    'IT': 'Italy',
-    'LV': 'Latvia',
-    'LI': 'Liechtenstein',
-    'LT': 'Lithuania',
-    'LU': 'Luxembourg',
-    'MT': 'Malta',
-    'MD': 'Moldova',
-    'MC': 'Monaco',
-    'ME': 'Montenegro',
-    'NL': 'Netherlands',
-    'MK': 'North Macedonia',
-    'NO': 'Norway',
-    'PL': 'Poland',
-    'PT': 'Portugal',
-    'RO': 'Romania',
-    'RU': 'Russia',
-    'SM': 'San Marino',
-    'RS': 'Serbia',
-    'SK': 'Slovakia',
-    'SI': 'Slovenia',
-    'ES': 'Spain',
-    'SE': 'Sweden',
-    'CH': 'Switzerland',
-    'UA': 'Ukraine',
-    'GB': 'United Kingdom',
-    'VA': 'Vatican City'
+# Indicateurs éducatifs et socio-économiques
+DEFAULT_INDICATORS = {
+    # 🎓 Accès à l'éducation
+    # Taux de scolarisation tertiaire (%)
+    "SE.XPD.TOTL.GD.ZS": "education_expenditure_gdp",     # Dépenses publiques en éducation (% du PIB)
+    "SE.PRM.TCHR": "student_teacher_ratio_primary",       # Ratio élèves/enseignant (primaire)
+    "SE.PRM.CMPT.ZS": "primary_completion_rate",          # Taux d'achèvement du primaire
+    # Alphabétisation des jeunes (% 15-24 ans)
+    "SE.SCH.LIFE": "school_life_expectancy",              # Durée moyenne de scolarisation (années)
+
+    # ⚖️ Égalité des genres
+    "SE.ENR.PRIM.FM.ZS": "gender_ratio_primary",          # Ratio filles/garçons en primaire
+    "SE.ENR.SECO.FM.ZS": "gender_ratio_secondary",        # Ratio filles/garçons en secondaire
+    "SE.ENR.TERT.FM.ZS": "gender_ratio_tertiary",         # Ratio filles/garçons en tertiaire
+
+    # 💰 Économie et pauvreté
+    "NY.GNP.PCAP.CD": "gni_per_capita",                   # Revenu national brut par habitant
+    "SP.POV.DDAY": "poverty_rate_1.9",                     # Taux de pauvreté à 1.90$/jour
+    "SE.XPD.PRIM.PC.ZS": "public_expenditure_per_student",# Dépenses gouvernementales par élève (primaire)
+
+    # 🌍 Contexte général
+    "SP.POP.TOTL": "total_population",                    # Population totale
+    "SP.DYN.LE00.IN": "life_expectancy",                  # Espérance de vie à la naissance
+    "SP.DYN.TFRT.IN": "fertility_rate"                    # Taux de fécondité
 }
-AFRICA = 'Africa'
-ASIA = 'Asia'
-EUROPE = 'Europe'
 
-@sleep_and_retry
-@limits(calls=RATE_LIMIT, period=1)
-def make_request(url, params=None):
+class IncompleteCollectionError(Exception):
+    """
+    Levée lorsque des unités (pays, indicateur) n'ont pas pu être collectées,
+    même après découpage des groupes de pays en échec.
+
+    Args:
+        data (pandas.DataFrame): Données partiellement collectées
+        failed (list): Unités (code pays, code indicateur) non collectées
+    """
+
+    def __init__(self, data, failed):
+        super().__init__(f"{len(failed)} unités (pays, indicateur) non collectées")
+        self.data = data
+        self.failed = failed
+
+def send_request(url, params=None, headers=None):
     """
-    Effectue une requête HTTP avec gestion des limites de taux et des erreurs.
+    Envoie une requête HTTP sur le réseau avec contrôle adaptatif du débit,
+    disjoncteur par hôte et nouvelles tentatives avec gigue.
+
+    Les réponses 429/503 réduisent le débit de l'hôte et leur ``Retry-After``
+    est respecté; les autres erreurs client (4xx) ne sont pas retentées.
     
     Args:
         url (str): URL de la requête
         params (dict, optional): Paramètres de la requête
+        headers (dict, optional): En-têtes de la requête
         
     Returns:
         requests.Response: Objet de réponse de la requête
     """
+    controller = host_controller(url)
     for attempt in range(MAX_RETRIES):
+        controller.wait()
+        retry_after = None
         try:
-            response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            return response
+            response = requests.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Tentative {attempt + 1}/{MAX_RETRIES} échouée: {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(2 ** attempt)  # Backoff exponentiel
-            else:
-                logger.error(f"Échec de la requête après {MAX_RETRIES} tentatives: {url}")
-                raise
+            controller.on_error()
+            error = e
+        else:
+            retryable, retry_after = controller.on_response(response.status_code, response.headers)
+            if not retryable:
+                response.raise_for_status()
+                return response
+            error = requests.exceptions.HTTPError(f"{response.status_code} pour {response.url}", response=response)
+
+        delay = retry_delay(attempt, retry_after)
+        if not can_retry(attempt, delay):
+            logger.error(f"Échec de la requête après {attempt + 1} tentatives: {url}")
+            raise error
+        logger.warning(f"Tentative {attempt + 1}/{MAX_RETRIES} échouée: {error} (nouvel essai dans {delay:.1f}s)")
+        time.sleep(delay)
+
+def cached_response(url, body):
+    """
+    Construit un objet réponse à partir d'un corps servi par le cache.
+    """
+    response = requests.Response()
+    response._content = body
+    response.status_code = 200
+    response.url = url
+    response.encoding = 'utf-8'
+    return response
+
+def check_payload(body):
+    """
+    Vérifie qu'un corps de réponse de l'API World Bank est une réponse valide
+    ``[métadonnées, observations]``. L'API renvoie ses erreurs avec un statut
+    200 (``[{"message": ...}]``): elles ne doivent pas être mises en cache.
+
+    Args:
+        body (bytes): Corps de la réponse
+
+    Raises:
+        ValueError: Si le corps n'est pas une réponse valide
+    """
+    data_json = json.loads(body)
+    meta = data_json[0] if isinstance(data_json, list) and data_json and isinstance(data_json[0], dict) else {}
+    if 'message' in meta:
+        raise ValueError(f"Réponse d'erreur de l'API: {meta['message']}")
+    if not meta or len(data_json) != 2:
+        raise ValueError("Réponse de l'API inattendue: [métadonnées, observations] attendu")
+
+def make_request(url, params=None, ttl=None, validate=None):
+    """
+    Effectue une requête HTTP en passant par le cache disque: une entrée fraîche
+    est servie sans accès réseau, une entrée expirée est revalidée par
+    ``ETag``/``Last-Modified``, et le mode hors-ligne rejoue le cache.
+    
+    Args:
+        url (str): URL de la requête
+        params (dict, optional): Paramètres de la requête
+        ttl (float, optional): Durée de validité de la réponse en cache (secondes)
+        validate (callable, optional): Vérifie le corps de la réponse avant sa
+            mise en cache (lève une exception pour une réponse invalide)
+        
+    Returns:
+        requests.Response: Objet de réponse de la requête
+    """
+    entry = http_cache.lookup(url, params)
+    if entry is not None and (entry['fresh'] or http_cache.offline):
+        http_cache.hits += 1
+        return cached_response(url, entry['body'])
+    if http_cache.offline:
+        raise OfflineCacheMiss(f"Réponse absente du cache en mode hors-ligne: {url} {params}")
+
+    http_cache.misses += 1
+    response = send_request(url, params, headers=http_cache.validators(entry))
+    if response.status_code == 304 and entry is not None:
+        http_cache.refresh(entry, ttl)
+        return cached_response(url, entry['body'])
+    if validate is not None:
+        validate(response.content)
+    http_cache.store(url, params, response.content, response.headers, ttl)
+    return response
 
 def get_countries_by_region(region):
     """
@@ -211,121 +185,492 @@ def get_countries_by_region(region):
     Returns:
         list: Liste des codes pays ISO-2 pour la région
     """
-    return [code for code, reg in country_regions.items() if reg == region]
+    return countries_in_region(region, code='iso2')
 
-def get_worldbank_data(indicators=None, countries=None, years=None):
+def resolve_collection_params(indicators=None, countries=None, years=None):
     """
-    Collecte les données socio-économiques de l'API World Bank.
-    
+    Complète les paramètres de collecte avec les valeurs par défaut.
+
     Args:
-        indicators (list, optional): Liste des indicateurs à collecter
-        countries (list, optional): Liste des pays à collecter
-        years (list, optional): Liste des années à collecter
-        
+        indicators (dict, optional): Indicateurs {code: nom de colonne}
+        countries (list, optional): Liste des codes pays ISO-2
+        years (list, optional): Liste des années
+
     Returns:
-        pandas.DataFrame: DataFrame contenant les données collectées
+        tuple: (indicators, countries, years)
     """
     if indicators is None:
-        # Indicateurs éducatifs et socio-économiques
-        indicators = {
-            # 🎓 Accès à l'éducation
-                        # Taux de scolarisation tertiaire (%)
-            "SE.XPD.TOTL.GD.ZS": "education_expenditure_gdp",     # Dépenses publiques en éducation (% du PIB)
-            "SE.PRM.TCHR": "student_teacher_ratio_primary",       # Ratio élèves/enseignant (primaire)
-            "SE.PRM.CMPT.ZS": "primary_completion_rate",          # Taux d'achèvement du primaire
-          # Alphabétisation des jeunes (% 15-24 ans)
-            "SE.SCH.LIFE": "school_life_expectancy",              # Durée moyenne de scolarisation (années)
-
-            # ⚖️ Égalité des genres
-            "SE.ENR.PRIM.FM.ZS": "gender_ratio_primary",          # Ratio filles/garçons en primaire
-            "SE.ENR.SECO.FM.ZS": "gender_ratio_secondary",        # Ratio filles/garçons en secondaire
-            "SE.ENR.TERT.FM.ZS": "gender_ratio_tertiary",         # Ratio filles/garçons en tertiaire
-
-            # 💰 Économie et pauvreté
-            "NY.GNP.PCAP.CD": "gni_per_capita",                   # Revenu national brut par habitant
-            "SP.POV.DDAY": "poverty_rate_1.9",                     # Taux de pauvreté à 1.90$/jour
-            "SE.XPD.PRIM.PC.ZS": "public_expenditure_per_student",# Dépenses gouvernementales par élève (primaire)
-
-            # 🌍 Contexte général
-            "SP.POP.TOTL": "total_population",                    # Population totale
-            "SP.DYN.LE00.IN": "life_expectancy",                  # Espérance de vie à la naissance
-            "SP.DYN.TFRT.IN": "fertility_rate"                    # Taux de fécondité
-        }
-    
+        indicators = DEFAULT_INDICATORS
+
     if countries is None:
-        # Ne collecter que les pays d'Afrique et d'Asie
+        # Collecter les pays d'Afrique, d'Asie et d'Europe
         african_countries = get_countries_by_region(AFRICA)
         asian_countries = get_countries_by_region(ASIA)
-        european_countries = get_countries_by_region(EUROPE)  # Pour l'Europe, si nécessaire
+        european_countries = get_countries_by_region(EUROPE)
         countries = african_countries + asian_countries + european_countries
         logger.info(f"Liste des pays chargée: {len(countries)} pays ({len(african_countries)} Afrique, {len(asian_countries)} Asie , {len(european_countries)} Europe) ")
     
     if years is None:
         # Par défaut, collectons les données pour les 5 dernières années
         years = list(range(2013, 2023))
+
+    return indicators, countries, years
+
+def pending_countries(indicator_code, countries, journal=None):
+    """
+    Retourne les pays dont l'unité (pays, indicateur) reste à collecter.
+    """
+    if journal is None:
+        return list(countries)
+    return [country for country in countries if not journal.is_done(country, indicator_code)]
+
+def fetch_indicator_batch(indicator_code, countries, years, journal=None, ttl=None):
+    """
+    Collecte un indicateur pour plusieurs pays et plusieurs années en une série
+    d'appels paginés, en utilisant la syntaxe multi-pays (``DZ;BJ;...``) et
+    plage de dates (``2013:2022``) de l'API World Bank. Un groupe en échec est
+    recollecté en deux moitiés, jusqu'au pays seul.
+
+    Args:
+        indicator_code (str): Code de l'indicateur World Bank
+        countries (list): Liste des codes pays ISO-2
+        years (list): Liste des années à collecter
+        journal (CollectionJournal, optional): Journal de reprise; les unités
+            déjà journalisées sont ignorées et chaque groupe terminé y est ajouté
+        ttl (float, optional): Durée de validité des réponses en cache, par
+            défaut selon les années demandées (``ttl_for_years``)
+
+    Returns:
+        tuple: (valeurs nouvellement collectées indexées par (code pays, année),
+        codes des pays non collectés)
+    """
+    values = {}
+    failed = []
+    wanted_years = set(years)
+    date_range = f"{min(years)}:{max(years)}"
+    ttl = ttl_for_years(years) if ttl is None else ttl
+    countries = pending_countries(indicator_code, countries, journal)
+    chunks = [countries[start:start + WORLDBANK_BATCH_COUNTRIES]
+              for start in range(0, len(countries), WORLDBANK_BATCH_COUNTRIES)]
+
+    while chunks:
+        chunk = chunks.pop(0)
+        url = f"{WORLDBANK_API_URL}/country/{';'.join(chunk)}/indicator/{indicator_code}"
+        chunk_values = {}
+        page, pages = 1, 1
+        try:
+            while page <= pages:
+                params = {
+                    'date': date_range,
+                    'format': 'json',
+                    'per_page': WORLDBANK_PER_PAGE,
+                    'page': page
+                }
+                data_json = make_request(url, params, ttl=ttl, validate=check_payload).json()
+                pages = parse_indicator_page(data_json, wanted_years, chunk_values)
+                page += 1
+        except (CircuitOpenError, OfflineCacheMiss):
+            raise
+        except Exception as e:
+            if len(chunk) > 1:
+                logger.warning(f"Erreur lors de la collecte groupée de {indicator_code} pour {len(chunk)} pays: {e} "
+                               f"(nouvel essai en deux groupes)")
+                half = len(chunk) // 2
+                chunks[:0] = [chunk[:half], chunk[half:]]
+            else:
+                logger.error(f"Échec de la collecte de {indicator_code} pour {chunk[0]}: {e}")
+                failed.extend(chunk)
+            continue
+        values.update(chunk_values)
+        if journal is not None:
+            journal.record_chunk(indicator_code, chunk, chunk_values)
+    return values, failed
+
+def parse_indicator_page(data_json, wanted_years, values):
+    """
+    Extrait les observations d'une page de réponse de l'API World Bank.
+
+    Args:
+        data_json (list): Réponse JSON décodée ``[métadonnées, observations]``
+        wanted_years (set): Années à conserver
+        values (dict): Dictionnaire (code pays, année) -> valeur à compléter
+
+    Returns:
+        int: Nombre total de pages annoncé par l'API
+    """
+    meta = data_json[0] if data_json else {}
+    if 'message' in meta:
+        raise ValueError(f"Réponse d'erreur de l'API: {meta['message']}")
+    if len(data_json) > 1 and data_json[1]:
+        for record in data_json[1]:
+            year = int(record['date'])
+            if year in wanted_years:
+                values[(record['country']['id'], year)] = record['value']
+    return int(meta.get('pages') or 1)
+
+def new_accumulator(countries, years, indicators, journal=None):
+    """
+    Prépare le tableau préalloué des valeurs à collecter, prérempli avec les
+    unités déjà présentes dans le journal de reprise.
+
+    Args:
+        countries (list): Liste des codes pays ISO-2
+        years (list): Liste des années
+        indicators (dict): Indicateurs {code: nom de colonne}
+        journal (CollectionJournal, optional): Journal de reprise
+
+    Returns:
+        IndicatorAccumulator: Tableau des valeurs (pays, année, indicateur)
+    """
+    regions = dict(zip(countries, region_of(countries)))
+    values = IndicatorAccumulator(countries, years, indicators, regions=regions)
+    if journal is not None:
+        for indicator_code in indicators:
+            values.update(indicator_code, journal.values.get(indicator_code, {}))
+    return values
+
+def get_worldbank_data(indicators=None, countries=None, years=None, batch=False, journal=None):
+    """
+    Collecte les données socio-économiques de l'API World Bank.
     
+    Args:
+        indicators (list, optional): Liste des indicateurs à collecter
+        countries (list, optional): Liste des pays à collecter
+        years (list, optional): Liste des années à collecter
+        batch (bool, optional): Si True, collecte chaque indicateur pour tous
+            les pays et toutes les années via des requêtes groupées et paginées
+            au lieu d'une requête par (pays, année, indicateur)
+        journal (CollectionJournal, optional): Journal de reprise des unités
+            (pays, indicateur) terminées
+        
+    Returns:
+        pandas.DataFrame: DataFrame contenant les données collectées
+
+    Raises:
+        IncompleteCollectionError: Si des unités (pays, indicateur) n'ont pas pu
+            être collectées (les données partielles sont jointes à l'exception)
+    """
+    indicators, countries, years = resolve_collection_params(indicators, countries, years)
+    values = new_accumulator(countries, years, indicators, journal)
+    failed = []
+
     logger.info(f"Collecte des données World Bank pour {len(indicators)} indicateurs, {len(countries)} pays et {len(years)} années")
+
+    if batch:
+        for indicator_code in tqdm(indicators, desc="Collecte des indicateurs"):
+            indicator_values, indicator_failed = fetch_indicator_batch(indicator_code, countries, years, journal)
+            values.update(indicator_code, indicator_values)
+            failed.extend((country, indicator_code) for country in indicator_failed)
+        return collected_frame(values, failed)
     
-    data = []
-    total_requests = len(countries) * len(years) * len(indicators)
-    processed_requests = 0
-    
-    # Traiter tous les pays sans batching
+    # Traiter tous les pays sans batching, par unité (pays, indicateur)
     for country in tqdm(countries, desc="Collecte des pays"):
-        for year in years:
-            country_data = {
-                'country_code': country,
-                'country_name': country,  # Utiliser directement le code pays comme nom
-                'region': country_regions.get(country, 'Unknown'),
-                'year': year
-            }
-            # Collecter les données pour chaque indicateur
-            for indicator_code, indicator_name in indicators.items():
+        for indicator_code, indicator_name in indicators.items():
+            if journal is not None and journal.is_done(country, indicator_code):
+                continue
+            unit_values = {}
+            complete = True
+            for year in years:
                 try:
                     url = f"{WORLDBANK_API_URL}/country/{country}/indicator/{indicator_code}"
                     params = {'date': str(year), 'format': 'json'}
-                    response = make_request(url, params)
+                    response = make_request(url, params, ttl=ttl_for_years([year]), validate=check_payload)
                     data_json = response.json()
                     if len(data_json) > 1 and data_json[1]:
-                        value = data_json[1][0]['value']
-                        country_data[indicator_name] = value
+                        unit_values[year] = data_json[1][0]['value']
+                except (CircuitOpenError, OfflineCacheMiss):
+                    raise
                 except Exception as e:
                     logger.warning(f"Erreur lors de la collecte de {indicator_name} pour {country} en {year}: {e}")
-                    country_data[indicator_name] = None
-            data.append(country_data)
-        # Sauvegarde intermédiaire tous les 10 pays
-        if len(data) % (10 * len(years)) == 0:
-            temp_df = pd.DataFrame(data)
-            temp_file = f"{WORLDBANK_RAW_FILE}.temp"
-            temp_df.to_csv(temp_file, index=False)
-            logger.info(f"Données intermédiaires sauvegardées ({len(temp_df)} lignes)")
-    # Créer le DataFrame final
-    df = pd.DataFrame(data)
+                    complete = False
+            values.update(indicator_code, {(country, year): value for year, value in unit_values.items()})
+            # Seules les unités complètes sont journalisées, les autres seront reprises
+            if not complete:
+                failed.append((country, indicator_code))
+            elif journal is not None:
+                journal.record(country, indicator_code, unit_values)
+    return collected_frame(values, failed)
+
+def collected_frame(values, failed):
+    """
+    Construit le DataFrame des valeurs collectées et signale les unités en échec.
+
+    Args:
+        values (IndicatorAccumulator): Valeurs collectées
+        failed (list): Unités (code pays, code indicateur) non collectées
+
+    Returns:
+        pandas.DataFrame: DataFrame contenant les données collectées
+
+    Raises:
+        IncompleteCollectionError: Si des unités n'ont pas pu être collectées
+    """
+    df = values.to_frame()
     logger.info(f"Collectées {len(df)} lignes de données World Bank")
+    if failed:
+        logger.error(f"{len(failed)} unités (pays, indicateur) non collectées: {failed[:10]}")
+        raise IncompleteCollectionError(df, failed)
+    return df
+
+async def fetch_indicator_batch_async(client, indicator_code, countries, years, journal=None, ttl=None):
+    """
+    Version asynchrone de ``fetch_indicator_batch``: la première page de chaque
+    groupe de pays annonce le nombre de pages, les suivantes sont demandées
+    simultanément.
+
+    Args:
+        client (AsyncHttpClient): Client HTTP asynchrone ouvert
+        indicator_code (str): Code de l'indicateur World Bank
+        countries (list): Liste des codes pays ISO-2
+        years (list): Liste des années à collecter
+        journal (CollectionJournal, optional): Journal de reprise
+        ttl (float, optional): Durée de validité des réponses en cache
+
+    Returns:
+        tuple: (valeurs nouvellement collectées indexées par (code pays, année),
+        codes des pays non collectés)
+    """
+    values = {}
+    failed = []
+    wanted_years = set(years)
+    date_range = f"{min(years)}:{max(years)}"
+    ttl = ttl_for_years(years) if ttl is None else ttl
+    countries = pending_countries(indicator_code, countries, journal)
+
+    async def fetch_chunk(chunk):
+        url = f"{WORLDBANK_API_URL}/country/{';'.join(chunk)}/indicator/{indicator_code}"
+        params = {'date': date_range, 'format': 'json', 'per_page': WORLDBANK_PER_PAGE}
+        chunk_values = {}
+        try:
+            first_page = await client.get_json(url, {**params, 'page': 1}, ttl=ttl, validate=check_payload)
+            pages = parse_indicator_page(first_page, wanted_years, chunk_values)
+            other_pages = await asyncio.gather(*[
+                client.get_json(url, {**params, 'page': page}, ttl=ttl, validate=check_payload)
+                for page in range(2, pages + 1)
+            ])
+            for data_json in other_pages:
+                parse_indicator_page(data_json, wanted_years, chunk_values)
+        except (CircuitOpenError, OfflineCacheMiss):
+            raise
+        except Exception as e:
+            # Groupe recollecté en deux moitiés, jusqu'au pays seul
+            if len(chunk) > 1:
+                logger.warning(f"Erreur lors de la collecte groupée de {indicator_code} pour {len(chunk)} pays: {e} "
+                               f"(nouvel essai en deux groupes)")
+                half = len(chunk) // 2
+                await asyncio.gather(fetch_chunk(chunk[:half]), fetch_chunk(chunk[half:]))
+            else:
+                logger.error(f"Échec de la collecte de {indicator_code} pour {chunk[0]}: {e}")
+                failed.extend(chunk)
+            return
+        values.update(chunk_values)
+        if journal is not None:
+            journal.record_chunk(indicator_code, chunk, chunk_values)
+
+    await asyncio.gather(*[
+        fetch_chunk(countries[start:start + WORLDBANK_BATCH_COUNTRIES])
+        for start in range(0, len(countries), WORLDBANK_BATCH_COUNTRIES)
+    ])
+    return values, failed
+
+async def get_worldbank_data_async(indicators=None, countries=None, years=None, journal=None):
+    """
+    Collecte les données World Bank avec le moteur asynchrone: toutes les
+    requêtes groupées sont lancées ensemble, le client borne le nombre de
+    requêtes simultanées et le débit par hôte.
+
+    Args:
+        indicators (dict, optional): Indicateurs {code: nom de colonne}
+        countries (list, optional): Liste des codes pays ISO-2
+        years (list, optional): Liste des années
+        journal (CollectionJournal, optional): Journal de reprise
+
+    Returns:
+        pandas.DataFrame: DataFrame au même format que ``get_worldbank_data``
+
+    Raises:
+        IncompleteCollectionError: Si des unités (pays, indicateur) n'ont pas pu être collectées
+    """
+    indicators, countries, years = resolve_collection_params(indicators, countries, years)
+    values = new_accumulator(countries, years, indicators, journal)
+    logger.info(f"Collecte asynchrone World Bank pour {len(indicators)} indicateurs, {len(countries)} pays et {len(years)} années")
+
+    async with AsyncHttpClient() as client:
+        results = await asyncio.gather(*[
+            fetch_indicator_batch_async(client, indicator_code, countries, years, journal)
+            for indicator_code in indicators
+        ])
+        logger.info(f"{client.request_count} requêtes World Bank effectuées")
+
+    failed = []
+    for indicator_code, (indicator_values, indicator_failed) in zip(indicators, results):
+        values.update(indicator_code, indicator_values)
+        failed.extend((country, indicator_code) for country in indicator_failed)
+    return collected_frame(values, failed)
+
+def update_worldbank_data(existing_df, indicators=None, countries=None, years=None, use_async=True,
+                          absent_file=WORLDBANK_ABSENT_FILE):
+    """
+    Met à jour incrémentalement des données World Bank existantes: seules les
+    cellules manquantes ou appartenant aux dernières années de la collecte
+    (révisables) sont collectées, puis fusionnées dans les données existantes.
+    Les cellules d'années closes sans valeur à la source sont ajoutées au
+    registre ``absent_file`` et ne sont plus redemandées.
+
+    Args:
+        existing_df (pandas.DataFrame): Contenu actuel de ``WORLDBANK_RAW_FILE``
+        indicators (dict, optional): Indicateurs {code: nom de colonne}
+        countries (list, optional): Liste des codes pays ISO-2
+        years (list, optional): Liste des années
+        use_async (bool, optional): Utiliser le moteur asynchrone
+        absent_file (Path, optional): Registre des cellules absentes de la source
+
+    Returns:
+        pandas.DataFrame: Données complètes après mise à jour
+
+    Raises:
+        IncompleteCollectionError: Si des unités n'ont pas pu être collectées;
+            les données jointes conservent les valeurs existantes de ces unités
+    """
+    indicators, countries, years = resolve_collection_params(indicators, countries, years)
+    cells = frame_to_cells(existing_df, indicators.values())
+    revisable_from = first_revisable_year(years)
+    absent = read_absent_cells(absent_file)
+    plan = plan_delta(cells, countries, years, indicators.values(), revisable_from, absent)
+
+    values = {code: cells[name] for code, name in indicators.items()}
+    tasks = [
+        (code, task_countries, task_years)
+        for code, name in indicators.items()
+        for task_countries, task_years in plan_requests(plan[name], countries)
+    ]
+    logger.info(f"{len(tasks)} requêtes groupées planifiées")
+
+    def task_ttl(task_years):
+        # Les années révisables de la collecte ne doivent pas être servies par un cache de longue durée
+        return HTTP_CACHE_TTL if max(task_years) >= revisable_from else ttl_for_years(task_years)
+
+    if use_async:
+        async def fetch_all():
+            async with AsyncHttpClient() as client:
+                results = await asyncio.gather(*[
+                    fetch_indicator_batch_async(client, code, task_countries, task_years, ttl=task_ttl(task_years))
+                    for code, task_countries, task_years in tasks
+                ])
+                logger.info(f"{client.request_count} requêtes World Bank effectuées")
+            return results
+        results = asyncio.run(fetch_all())
+    else:
+        results = [
+            fetch_indicator_batch(code, task_countries, task_years, ttl=task_ttl(task_years))
+            for code, task_countries, task_years in tqdm(tasks, desc="Collecte des indicateurs")
+        ]
+
+    fetched = {code: {} for code in indicators}
+    failed = []
+    for (code, _, _), (task_values, task_failed) in zip(tasks, results):
+        fetched[code].update(task_values)
+        failed.extend((country, code) for country in task_failed)
+
+    updated = 0
+    for code, name in indicators.items():
+        updated += upsert_cells(values[code], fetched[code], plan[name])
+        failed_countries = [country for country, failed_code in failed if failed_code == code]
+        absent.setdefault(name, set()).update(absent_cells(plan[name], fetched[code], revisable_from, failed_countries))
+    write_absent_cells(absent_file, absent)
+    logger.info(f"{updated} cellules mises à jour")
+
+    accumulator = new_accumulator(countries, years, indicators)
+    for code in indicators:
+        accumulator.update(code, values[code])
+    df = accumulator.to_frame()
+    # Conserver les lignes existantes hors de la grille collectée
+    grid = pd.MultiIndex.from_frame(df[['country_code', 'year']])
+    existing_keys = pd.MultiIndex.from_frame(existing_df[['country_code', 'year']])
+    others = existing_df[~existing_keys.isin(grid)]
+    if not others.empty:
+        df = pd.concat([df, others[[col for col in df.columns if col in others.columns]]], ignore_index=True)
+    if failed:
+        logger.error(f"{len(failed)} unités (pays, indicateur) non mises à jour: {failed[:10]}")
+        raise IncompleteCollectionError(df, failed)
     return df
 
 def save_worldbank_data(df):
     """
-    Sauvegarde les données World Bank dans un fichier CSV.
+    Sauvegarde les données World Bank dans un fichier CSV et un jeu de
+    données Parquet partitionné par région et année.
     
     Args:
         df (pandas.DataFrame): DataFrame à sauvegarder
     """
     os.makedirs(os.path.dirname(WORLDBANK_RAW_FILE), exist_ok=True)
     df.to_csv(WORLDBANK_RAW_FILE, index=False)
+    write_partitioned(df, WORLDBANK_RAW_DATASET, KEY_SCHEMA)
     logger.info(f"Données World Bank sauvegardées dans {WORLDBANK_RAW_FILE}")
 
-def collect_worldbank_data():
+def collect_worldbank_data(batch=True, use_async=True, resume=False, delta=False):
     """
     Fonction principale pour collecter et sauvegarder les données World Bank.
+
+    Les unités (pays, indicateur) terminées sont ajoutées au journal
+    ``WORLDBANK_JOURNAL_FILE``; le journal est compacté dans le fichier final
+    puis supprimé une fois la collecte sauvegardée. Il est conservé si des
+    unités n'ont pas pu être collectées, pour les reprendre avec ``resume``.
     
+    Args:
+        batch (bool, optional): Utiliser la collecte groupée multi-pays
+        use_async (bool, optional): Utiliser le moteur asynchrone (mode groupé uniquement)
+        resume (bool, optional): Reprendre une collecte interrompue à partir du journal
+        delta (bool, optional): Ne collecter que les cellules manquantes ou
+            révisables du fichier existant et les fusionner dans celui-ci
+
     Returns:
         pandas.DataFrame: DataFrame contenant les données collectées
+
+    Raises:
+        IncompleteCollectionError: Si des unités n'ont pas pu être collectées;
+            le fichier existant n'est alors pas remplacé par une collecte partielle
     """
-    # Call get_worldbank_data with no countries parameter to get all countries
-    df = get_worldbank_data(countries=None)
+    run_budget.restart()
+    if delta and os.path.exists(WORLDBANK_RAW_FILE):
+        try:
+            df = update_worldbank_data(pd.read_csv(WORLDBANK_RAW_FILE), use_async=use_async)
+        except IncompleteCollectionError as e:
+            # Les unités en échec gardent leurs valeurs existantes: les mises à jour réussies sont conservées
+            save_worldbank_data(e.data)
+            raise
+        save_worldbank_data(df)
+        return df
+
+    # Call resolve_collection_params with no countries parameter to get all countries
+    indicators, countries, years = resolve_collection_params()
+    journal = CollectionJournal(WORLDBANK_JOURNAL_FILE, years, resume=resume)
+    try:
+        if batch and use_async:
+            df = asyncio.run(get_worldbank_data_async(indicators, countries, years, journal=journal))
+        else:
+            df = get_worldbank_data(indicators, countries, years, batch=batch, journal=journal)
+    except IncompleteCollectionError as e:
+        logger.error(f"Journal conservé pour reprendre les {len(e.failed)} unités manquantes "
+                     f"(--resume): {WORLDBANK_JOURNAL_FILE}")
+        raise
+    finally:
+        journal.close()
     save_worldbank_data(df)
+    journal.discard()
     return df
 
 if __name__ == "__main__":
-    collect_worldbank_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collecte des données World Bank")
+    parser.add_argument('--offline', action='store_true',
+                        help="Rejouer uniquement les réponses du cache HTTP, sans accès réseau")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignorer le cache HTTP disque")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre une collecte interrompue à partir du journal")
+    parser.add_argument('--delta', action='store_true',
+                        help="Ne collecter que les cellules manquantes ou révisables du fichier existant")
+    args = parser.parse_args()
+    http_cache.offline = args.offline
+    http_cache.enabled = not args.no_cache
+    collect_worldbank_data(resume=args.resume, delta=args.delta)
\ No newline at end of file
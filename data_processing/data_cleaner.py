@@ -1,12 +1,20 @@
 """
 Module pour nettoyer et normaliser les données.
 """
+import numpy as np
 import pandas as pd
 import logging
+import time
+import os
 from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from config import UNESCO_RAW_FILE, WORLDBANK_RAW_FILE
+from config import UNESCO_RAW_FILE, WORLDBANK_RAW_FILE, QUARANTINE_FILE, COLUMN_SCHEMA
+from data_processing.schema import apply_schema, read_dataset, log_memory
+
+# Les colonnes numériques sont lues sans conversion pour que la validation
+# puisse signaler les valeurs non numériques
+RAW_SCHEMA = {column: dtype for column, dtype in COLUMN_SCHEMA.items() if dtype == 'category'}
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,76 +41,264 @@ def normalize_country_names(df):
     
     return df
 
-def normalize_numeric_values(df):
-    """
-    Normalise les valeurs numériques.
-    """
-    # Liste des colonnes à traiter comme numériques
-    numeric_columns = [
-        'free_education_years',
-        'inbound_mobility_rate',
-        'outbound_mobility_rate',
-        'education_expenditure_gdp',
-        'student_teacher_ratio_primary',
-        'primary_completion_rate',
-        'school_life_expectancy',
-        'gender_ratio_primary',
-        'gender_ratio_secondary',
-        'gender_ratio_tertiary',
-        'public_expenditure_per_student'
-    ]
-    
-    for col in numeric_columns:
-        if col in df.columns:
-            # Convertir en numérique, les erreurs deviennent NaN
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Remplacer les valeurs aberrantes par NaN
-            # Par exemple, les taux ne devraient pas dépasser 100%
-            if 'rate' in col or 'ratio' in col:
-                df[col] = df[col].clip(0, 100)
-                
-    return df
+# Règles de validation: plages de valeurs admises et contraintes entre colonnes.
+# Chaque cellule en infraction est mise en quarantaine avec le code de la règle.
+VALIDATION_RULES = [
+    {'code': 'YEAR_OUT_OF_RANGE', 'type': 'range', 'columns': ['year'], 'min': 1960, 'max': 2100},
+    {'code': 'PERCENT_OUT_OF_RANGE', 'type': 'range', 'min': 0, 'max': 100, 'columns': [
+        'inbound_mobility_rate', 'education_expenditure_gdp', 'poverty_rate_1.9', 'public_expenditure_per_student'
+    ]},
+    # Le taux d'achèvement brut peut dépasser 100%
+    {'code': 'COMPLETION_OUT_OF_RANGE', 'type': 'range', 'columns': ['primary_completion_rate'], 'min': 0, 'max': 200},
+    # Indices de parité filles/garçons (1 = parité)
+    {'code': 'PARITY_INDEX_OUT_OF_RANGE', 'type': 'range', 'min': 0, 'max': 5, 'columns': [
+        'gender_ratio_primary', 'gender_ratio_secondary', 'gender_ratio_tertiary'
+    ]},
+    # Le ratio de mobilité sortante (étudiants partis / inscrits dans le pays)
+    # dépasse 100% pour les petits systèmes d'enseignement supérieur
+    {'code': 'NEGATIVE_VALUE', 'type': 'range', 'min': 0, 'columns': [
+        'student_teacher_ratio_primary', 'gni_per_capita', 'total_population', 'outbound_mobility_rate'
+    ]},
+    {'code': 'FREE_EDUCATION_OUT_OF_RANGE', 'type': 'range', 'columns': ['free_education_years'], 'min': 0, 'max': 20},
+    {'code': 'SCHOOL_LIFE_OUT_OF_RANGE', 'type': 'range', 'columns': ['school_life_expectancy'], 'min': 0, 'max': 30},
+    {'code': 'LIFE_EXPECTANCY_OUT_OF_RANGE', 'type': 'range', 'columns': ['life_expectancy'], 'min': 10, 'max': 100},
+    {'code': 'FERTILITY_OUT_OF_RANGE', 'type': 'range', 'columns': ['fertility_rate'], 'min': 0, 'max': 15},
+    # La durée de scolarisation ne peut dépasser l'espérance de vie
+    {'code': 'SCHOOL_LIFE_ABOVE_LIFE_EXPECTANCY', 'type': 'compare',
+     'column': 'school_life_expectancy', 'op': '<=', 'other': 'life_expectancy'},
+]
+
+# Codes des contrôles toujours appliqués
+NOT_NUMERIC = 'NOT_NUMERIC'
+MISSING_KEY = 'MISSING_KEY'
+DUPLICATE_KEY = 'DUPLICATE_KEY'
+
+# Nombre maximal de cellules (lignes x règles) évaluées à la fois
+VALIDATION_BLOCK_CELLS = 1_000_000
+
+COMPARISONS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+def compile_rules(rules, columns):
+    """
+    Compile les règles en tableaux (une entrée par couple règle/colonne) pour
+    les évaluer en une seule opération vectorisée.
+
+    Args:
+        rules: Règles de validation
+        columns: Colonnes numériques présentes dans les données
+
+    Returns:
+        dict: Tableaux des règles de plage et des règles de comparaison
+    """
+    position = {column: i for i, column in enumerate(columns)}
+    ranges = [(position[column], rule.get('min', -np.inf), rule.get('max', np.inf), rule['code'])
+              for rule in rules if rule['type'] == 'range'
+              for column in rule['columns'] if column in position]
+    comparisons = [(position[rule['column']], position[rule['other']], rule['op'], rule['code'])
+                   for rule in rules if rule['type'] == 'compare'
+                   and rule['column'] in position and rule['other'] in position]
+    return {
+        'range_columns': np.array([r[0] for r in ranges], dtype=np.intp),
+        'range_min': np.array([r[1] for r in ranges], dtype=np.float64),
+        'range_max': np.array([r[2] for r in ranges], dtype=np.float64),
+        'range_codes': np.array([r[3] for r in ranges], dtype=object),
+        'comparisons': comparisons
+    }
+
+def evaluate_rules(values, compiled):
+    """
+    Évalue toutes les règles compilées sur la matrice des valeurs numériques.
+    Les règles de plage sont évaluées ensemble par blocs de lignes, ce qui
+    borne la mémoire et garde un temps linéaire en lignes et en règles.
 
-def clean_unesco_data(df):
+    Args:
+        values (numpy.ndarray): Valeurs numériques (lignes x colonnes)
+        compiled (dict): Règles retournées par ``compile_rules``
+
+    Returns:
+        tuple: (lignes, colonnes, codes) des cellules en infraction
+    """
+    rows, columns, codes = [], [], []
+    n_rules = max(len(compiled['range_columns']), 1)
+    block_rows = max(VALIDATION_BLOCK_CELLS // n_rules, 1)
+    for start in range(0, len(values), block_rows):
+        selected = values[start:start + block_rows, compiled['range_columns']]
+        failed = (selected < compiled['range_min']) | (selected > compiled['range_max'])
+        block_failed_rows, rule_positions = np.nonzero(failed)
+        rows.append(block_failed_rows + start)
+        columns.append(compiled['range_columns'][rule_positions])
+        codes.append(compiled['range_codes'][rule_positions])
+
+    for column, other, op, code in compiled['comparisons']:
+        both = ~np.isnan(values[:, column]) & ~np.isnan(values[:, other])
+        compare_rows = np.nonzero(both & ~COMPARISONS[op](values[:, column], values[:, other]))[0]
+        rows.append(compare_rows)
+        columns.append(np.full(len(compare_rows), column, dtype=np.intp))
+        codes.append(np.full(len(compare_rows), code, dtype=object))
+
+    if not rows:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0, dtype=object)
+    return np.concatenate(rows), np.concatenate(columns), np.concatenate(codes)
+
+def quarantine_records(df, rows, columns, values, codes, keys):
+    """
+    Construit les enregistrements de quarantaine des cellules rejetées.
+    """
+    records = pd.DataFrame({key: df[key].to_numpy()[rows] for key in keys if key in df.columns})
+    records['column'] = columns
+    records['value'] = values
+    records['reason'] = codes
+    return records
+
+def validate_data(df, source, rules=VALIDATION_RULES, keys=('country_code', 'year')):
+    """
+    Valide toutes les colonnes en un passage vectorisé: types numériques,
+    plages de valeurs, contraintes entre colonnes et unicité des clés.
+    Les cellules en infraction sont remplacées par NaN et les lignes sans clé
+    ou en double sont retirées.
+
+    Args:
+        df: DataFrame à valider
+        source: Nom de la source (pour la quarantaine et le rapport)
+        rules: Règles de validation (par défaut VALIDATION_RULES)
+        keys: Colonnes identifiant une ligne
+
+    Returns:
+        tuple: (DataFrame validé, DataFrame de quarantaine, rapport)
+    """
+    report = {'source': source, 'hits': {}, 'timings': {}}
+    quarantined = []
+    keys = [key for key in keys if key in df.columns]
+    numeric_columns = [column for column in df.columns
+                       if COLUMN_SCHEMA.get(column, 'category') != 'category']
+
+    # Types: valeurs présentes mais non numériques
+    start = time.perf_counter()
+    raw = df[numeric_columns]
+    values = raw.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    rows, positions = np.nonzero(raw.notna().to_numpy() & np.isnan(values))
+    if len(rows):
+        quarantined.append(quarantine_records(
+            df, rows, np.array(numeric_columns, dtype=object)[positions],
+            raw.to_numpy()[rows, positions], NOT_NUMERIC, keys
+        ))
+    report['timings']['types'] = time.perf_counter() - start
+
+    # Plages de valeurs et contraintes entre colonnes
+    start = time.perf_counter()
+    rows, cell_columns, codes = evaluate_rules(values, compile_rules(rules, numeric_columns))
+    if len(rows):
+        quarantined.append(quarantine_records(
+            df, rows, np.array(numeric_columns, dtype=object)[cell_columns],
+            values[rows, cell_columns], codes, keys
+        ))
+        values[rows, cell_columns] = np.nan
+    df = df.assign(**dict(zip(numeric_columns, values.T)))
+    report['timings']['rules'] = time.perf_counter() - start
+
+    # Clés manquantes ou en double (la première occurrence est conservée)
+    start = time.perf_counter()
+    missing = df[keys].isna().any(axis=1).to_numpy()
+    duplicated = ~missing & df.duplicated(subset=keys, keep='first').to_numpy()
+    for mask, code in ((missing, MISSING_KEY), (duplicated, DUPLICATE_KEY)):
+        rows = np.nonzero(mask)[0]
+        if len(rows):
+            quarantined.append(quarantine_records(df, rows, '*', np.nan, code, keys))
+    df = df[~(missing | duplicated)]
+    report['timings']['keys'] = time.perf_counter() - start
+
+    quarantine = pd.concat(quarantined, ignore_index=True) if quarantined else pd.DataFrame(
+        columns=list(keys) + ['column', 'value', 'reason'])
+    quarantine.insert(0, 'source', source)
+    quarantine = apply_schema(quarantine, {'year': COLUMN_SCHEMA['year']})
+    report['hits'] = quarantine['reason'].value_counts().to_dict()
+    log_validation_report(report)
+    return df, quarantine, report
+
+def log_validation_report(report):
+    """
+    Journalise le nombre de cellules rejetées par règle et la durée de chaque étape.
+    """
+    timings = ", ".join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in report['timings'].items())
+    logger.info(f"{report['source']} - validation: {sum(report['hits'].values())} rejets ({timings})")
+    for code, hits in sorted(report['hits'].items(), key=lambda item: -item[1]):
+        logger.info(f"{report['source']} - règle {code}: {hits} rejets")
+
+def save_quarantine(quarantine, source):
+    """
+    Enregistre la quarantaine d'une source dans QUARANTINE_FILE, en remplaçant
+    celle d'une exécution précédente pour la même source.
+    """
+    if os.path.exists(QUARANTINE_FILE):
+        previous = pd.read_csv(QUARANTINE_FILE, keep_default_na=False, na_values=[''])
+        quarantine = pd.concat([previous[previous['source'] != source], quarantine], ignore_index=True)
+    os.makedirs(os.path.dirname(QUARANTINE_FILE), exist_ok=True)
+    quarantine.to_csv(QUARANTINE_FILE, index=False)
+    logger.info(f"Quarantaine {source} enregistrée dans {QUARANTINE_FILE}")
+
+def clean_unesco_data(df, return_quarantine=False):
     """
     Nettoie et normalise les données UNESCO.
+
+    Args:
+        df: Données UNESCO brutes
+        return_quarantine (bool, optional): Retourner la quarantaine au lieu
+            de l'enregistrer dans QUARANTINE_FILE
+
+    Returns:
+        pandas.DataFrame: Données nettoyées, ou tuple (données nettoyées,
+        quarantaine ou None) si return_quarantine
     """
     if df.empty:
-        return df
+        return (df, None) if return_quarantine else df
     
     logger.info("Nettoyage des données UNESCO")
     
     # Normaliser les noms de pays
     df = normalize_country_names(df)
     
-    # Normaliser les valeurs numériques
-    df = normalize_numeric_values(df)
-    
     # Supprimer les doublons
     df = df.drop_duplicates()
     
-    return df
+    # Valider les valeurs et mettre les cellules rejetées en quarantaine
+    df, quarantine, _ = validate_data(df, "UNESCO")
+    if return_quarantine:
+        return apply_schema(df), quarantine
+    save_quarantine(quarantine, "UNESCO")
+    
+    return apply_schema(df)
 
-def clean_worldbank_data(df):
+def clean_worldbank_data(df, return_quarantine=False):
     """
     Nettoie et normalise les données World Bank.
+
+    Args:
+        df: Données World Bank brutes
+        return_quarantine (bool, optional): Retourner la quarantaine au lieu
+            de l'enregistrer dans QUARANTINE_FILE
+
+    Returns:
+        pandas.DataFrame: Données nettoyées, ou tuple (données nettoyées,
+        quarantaine ou None) si return_quarantine
     """
     if df.empty:
-        return df
+        return (df, None) if return_quarantine else df
     
     logger.info("Nettoyage des données World Bank")
     
     # Normaliser les noms de pays
     df = normalize_country_names(df)
     
-    # Normaliser les valeurs numériques
-    df = normalize_numeric_values(df)
-    
     # Supprimer les doublons
     df = df.drop_duplicates()
     
-    return df
+    # Valider les valeurs et mettre les cellules rejetées en quarantaine
+    df, quarantine, _ = validate_data(df, "World Bank")
+    if return_quarantine:
+        return apply_schema(df), quarantine
+    save_quarantine(quarantine, "World Bank")
+    
+    return apply_schema(df)
 
 def clean_all_data():
     """
@@ -113,16 +309,20 @@ def clean_all_data():
     """
     # Charger et nettoyer les données UNESCO
     try:
-        unesco_df = pd.read_csv(UNESCO_RAW_FILE)
+        unesco_df = read_dataset(UNESCO_RAW_FILE, schema=RAW_SCHEMA)
+        log_memory(unesco_df, "UNESCO brut")
         unesco_df = clean_unesco_data(unesco_df)
+        log_memory(unesco_df, "UNESCO nettoyé")
     except Exception as e:
         logger.error(f"Erreur lors du nettoyage des données UNESCO: {e}")
         unesco_df = pd.DataFrame()
 
     # Charger et nettoyer les données World Bank
     try:
-        worldbank_df = pd.read_csv(WORLDBANK_RAW_FILE)
+        worldbank_df = read_dataset(WORLDBANK_RAW_FILE, schema=RAW_SCHEMA)
+        log_memory(worldbank_df, "World Bank brut")
         worldbank_df = clean_worldbank_data(worldbank_df)
+        log_memory(worldbank_df, "World Bank nettoyé")
     except Exception as e:
         logger.error(f"Erreur lors du nettoyage des données World Bank: {e}")
         worldbank_df = pd.DataFrame()
@@ -1,8 +1,10 @@
 """
 Module pour fusionner les données des différentes sources.
 """
+import numpy as np
 import pandas as pd
 import logging
+import argparse
 from pathlib import Path
 import sys
 import os
@@ -15,40 +17,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import UNESCO_RAW_FILE, WORLDBANK_RAW_FILE, FINAL_OUTPUT_FILE
-
-# Dictionnaire de conversion entre codes pays 2 et 3 lettres
-COUNTRY_CODE_MAPPING = {
-    'AF': 'AFG', 'AO': 'AGO', 'AL': 'ALB', 'AD': 'AND', 'AE': 'ARE',
-    'AM': 'ARM', 'AT': 'AUT', 'AZ': 'AZE', 'BI': 'BDI', 'BE': 'BEL',
-    'BJ': 'BEN', 'BF': 'BFA', 'BD': 'BGD', 'BG': 'BGR', 'BH': 'BHR',
-    'BA': 'BIH', 'BY': 'BLR', 'BN': 'BRN', 'BT': 'BTN', 'BW': 'BWA',
-    'CF': 'CAF', 'CH': 'CHE', 'CN': 'CHN', 'CI': 'CIV', 'CM': 'CMR',
-    'CD': 'COD', 'CG': 'COG', 'KM': 'COM', 'CV': 'CPV', 'CY': 'CYP',
-    'CZ': 'CZE', 'DE': 'DEU', 'DJ': 'DJI', 'DK': 'DNK', 'DZ': 'DZA',
-    'EG': 'EGY', 'ER': 'ERI', 'ES': 'ESP', 'EE': 'EST', 'ET': 'ETH',
-    'FI': 'FIN', 'FR': 'FRA', 'GA': 'GAB', 'GB': 'GBR', 'GE': 'GEO',
-    'GH': 'GHA', 'GN': 'GIN', 'GM': 'GMB', 'GQ': 'GNQ', 'GR': 'GRC',
-    'HR': 'HRV', 'HU': 'HUN', 'ID': 'IDN', 'IN': 'IND', 'IE': 'IRL',
-    'IR': 'IRN', 'IQ': 'IRQ', 'IS': 'ISL', 'IL': 'ISR', 'IT': 'ITA',
-    'JO': 'JOR', 'JP': 'JPN', 'KZ': 'KAZ', 'KE': 'KEN', 'KG': 'KGZ',
-    'KH': 'KHM', 'KR': 'KOR', 'KW': 'KWT', 'LA': 'LAO', 'LB': 'LBN',
-    'LR': 'LBR', 'LY': 'LBY', 'LI': 'LIE', 'LK': 'LKA', 'LS': 'LSO',
-    'LT': 'LTU', 'LU': 'LUX', 'LV': 'LVA', 'MA': 'MAR', 'MC': 'MCO',
-    'MD': 'MDA', 'MG': 'MDG', 'MV': 'MDV', 'MK': 'MKD', 'ML': 'MLI',
-    'MT': 'MLT', 'MM': 'MMR', 'ME': 'MNE', 'MN': 'MNG', 'MZ': 'MOZ',
-    'MR': 'MRT', 'MU': 'MUS', 'MW': 'MWI', 'MY': 'MYS', 'NA': 'NAM',
-    'NE': 'NER', 'NG': 'NGA', 'NL': 'NLD', 'NO': 'NOR', 'NP': 'NPL',
-    'OM': 'OMN', 'PK': 'PAK', 'PH': 'PHL', 'PL': 'POL', 'PT': 'PRT',
-    'PS': 'PSE', 'QA': 'QAT', 'RO': 'ROU', 'RU': 'RUS', 'RW': 'RWA',
-    'SA': 'SAU', 'SD': 'SDN', 'SN': 'SEN', 'SG': 'SGP', 'SL': 'SLE',
-    'SM': 'SMR', 'RS': 'SRB', 'SS': 'SSD', 'ST': 'STP', 'SK': 'SVK',
-    'SI': 'SVN', 'SE': 'SWE', 'SZ': 'SWZ', 'SC': 'SYC', 'SY': 'SYR',
-    'TD': 'TCD', 'TG': 'TGO', 'TH': 'THA', 'TJ': 'TJK', 'TM': 'TKM',
-    'TL': 'TLS', 'TN': 'TUN', 'TR': 'TUR', 'TZ': 'TZA', 'UG': 'UGA',
-    'UA': 'UKR', 'UZ': 'UZB', 'VN': 'VNM', 'YE': 'YEM', 'ZA': 'ZAF',
-    'ZM': 'ZMB', 'ZW': 'ZWE'
-}
+from config import (UNESCO_RAW_FILE, WORLDBANK_RAW_FILE, FINAL_OUTPUT_FILE, FINAL_OUTPUT_DATASET,
+                    PANEL_CHANGES_FILE, PARTITION_COLUMNS)
+from country_registry import convert_codes
+from data_processing.schema import (apply_schema, read_dataset, write_dataset, write_partitioned,
+                                    write_partitions, read_partitioned, log_memory)
+from data_processing.panel_store import (publish_panel, patch_panel, publish_cube, build_cube, has_table,
+                                         CUBE_TABLE)
 
 def normalize_country_codes(df, column='country_code', to_alpha3=False):
     """
@@ -59,18 +34,19 @@ def normalize_country_codes(df, column='country_code', to_alpha3=False):
         to_alpha3: Si True, convertit en code 3 lettres, sinon en code 2 lettres
     """
     if column in df.columns:
+        # Ne pas modifier le DataFrame reçu (transmis en mémoire par le pipeline)
+        df = df.copy()
         # Supprimer les espaces et mettre en majuscules
         df[column] = df[column].astype(str).str.strip().str.upper()
-        # Remplacer les valeurs invalides par None
-        df[column] = df[column].replace(['', 'NAN', 'NONE', 'NA'], None)
+        # Remplacer les valeurs invalides par None ('NA' est le code ISO-2 de la Namibie)
+        df[column] = df[column].replace(['', 'NAN', 'NONE'], None)
         
         if to_alpha3:
             # Convertir de 2 lettres vers 3 lettres
-            df[column] = df[column].map(lambda x: COUNTRY_CODE_MAPPING.get(x, x))
+            df[column] = convert_codes(df[column], source='iso2', target='iso3')
         else:
             # Convertir de 3 lettres vers 2 lettres
-            reverse_mapping = {v: k for k, v in COUNTRY_CODE_MAPPING.items()}
-            df[column] = df[column].map(lambda x: reverse_mapping.get(x, x))
+            df[column] = convert_codes(df[column], source='iso3', target='iso2')
     
     return df
 
@@ -82,9 +58,12 @@ def print_country_stats(df, source):
     logger.info(f"{source} - Nombre de codes pays valides: {len(valid_codes)}")
     logger.info(f"{source} - Exemples de codes pays: {sorted(valid_codes)[:10]}")
 
-def load_worldbank_data():
+def load_worldbank_data(wb_df=None):
     """
     Charge les données World Bank avec les colonnes spécifiques.
+
+    Args:
+        wb_df: Données World Bank déjà chargées (par défaut lues depuis WORLDBANK_RAW_FILE)
     """
     logger.info("Chargement des données World Bank")
     wb_columns = [
@@ -97,7 +76,9 @@ def load_worldbank_data():
         'life_expectancy', 'fertility_rate'
     ]
     
-    wb_df = pd.read_csv(WORLDBANK_RAW_FILE)
+    if wb_df is None:
+        wb_df = read_dataset(WORLDBANK_RAW_FILE)
+    log_memory(wb_df, "World Bank brut")
     wb_df = normalize_country_codes(wb_df)
     
     # Supprimer les lignes sans code pays
@@ -113,11 +94,16 @@ def load_worldbank_data():
     wb_df = wb_df[available_cols]
     
     print_country_stats(wb_df, "World Bank")
+    wb_df = apply_schema(wb_df)
+    log_memory(wb_df, "World Bank chargé")
     return wb_df
 
-def load_unesco_data():
+def load_unesco_data(unesco_df=None):
     """
     Charge les données UNESCO avec les colonnes spécifiques.
+
+    Args:
+        unesco_df: Données UNESCO déjà chargées (par défaut lues depuis UNESCO_RAW_FILE)
     """
     logger.info("Chargement des données UNESCO")
     unesco_columns = [
@@ -128,7 +114,9 @@ def load_unesco_data():
     ]
     
     try:
-        unesco_df = pd.read_csv(UNESCO_RAW_FILE)
+        if unesco_df is None:
+            unesco_df = read_dataset(UNESCO_RAW_FILE)
+        log_memory(unesco_df, "UNESCO brut")
         
         # Convertir les codes pays UNESCO (3 lettres) en codes 2 lettres si nécessaire
         unesco_df = normalize_country_codes(unesco_df, to_alpha3=False)
@@ -141,62 +129,229 @@ def load_unesco_data():
         unesco_df = unesco_df[available_cols]
         
         print_country_stats(unesco_df, "UNESCO")
+        unesco_df = apply_schema(unesco_df)
+        log_memory(unesco_df, "UNESCO chargé")
         return unesco_df
         
     except Exception as e:
         logger.error(f"Erreur lors du chargement des données UNESCO: {str(e)}")
         raise
 
-def merge_datasets():
+# Politiques de jointure des sources, dans l'ordre de priorité de fusion. La
+# première source définit le panel; pour les suivantes:
+# - 'left': les clés absentes du panel sont ignorées
+# - 'outer': les clés absentes du panel y sont ajoutées
+# - 'coalesce': la source ne fait que compléter les valeurs manquantes des
+#   colonnes déjà présentes, sur les clés du panel
+# Dans tous les cas, une colonne déjà présente garde la valeur de la source
+# prioritaire et les valeurs divergentes sont comptées comme conflits.
+MERGE_POLICIES = {
+    'World Bank': 'outer',
+    'UNESCO': 'left'
+}
+
+MERGE_KEYS = ['country_code', 'year']
+
+def country_values(series):
+    """
+    Décompose une colonne de codes pays en (codes entiers, valeurs distinctes),
+    sans hacher chaque ligne lorsque la colonne est catégorielle.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories.astype(object)
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Index(uniques, dtype=object)
+
+def encode_keys(country_codes, years, countries, min_year, year_span):
+    """
+    Encode les clés (country_code, year) en entiers triés dans le même ordre
+    que les couples (pays, année).
+
+    Args:
+        country_codes (tuple): Codes entiers et valeurs distinctes (``country_values``)
+        years (numpy.ndarray): Années
+        countries (pandas.Index): Codes pays de toutes les sources, triés
+        min_year (int): Première année de toutes les sources
+        year_span (int): Nombre d'années couvertes par toutes les sources
+    """
+    codes, uniques = country_codes
+    positions = countries.get_indexer(uniques).astype(np.int64)[codes]
+    return positions * year_span + (years - min_year)
+
+def take_values(series, positions):
+    """
+    Aligne une colonne sur le panel (-1 signale une clé absente de la source).
+    """
+    return pd.api.extensions.take(series.array, positions, allow_fill=True)
+
+def coalesce_column(current, candidate):
+    """
+    Complète les valeurs manquantes d'une colonne par celles d'une source
+    moins prioritaire et compte les valeurs divergentes.
+
+    Returns:
+        tuple: (valeurs fusionnées, nombre de valeurs complétées, nombre de conflits)
+    """
+    current = pd.Series(current)
+    candidate = pd.Series(candidate)
+    both = current.notna() & candidate.notna()
+    if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(candidate):
+        conflicts = both & ~np.isclose(current.to_numpy(dtype=np.float64), candidate.to_numpy(dtype=np.float64),
+                                       rtol=1e-5, equal_nan=True)
+    else:
+        current, candidate = current.astype(object), candidate.astype(object)
+        conflicts = both & (current != candidate)
+    filled = current.isna() & candidate.notna()
+    return current.where(~filled, candidate).array, int(filled.sum()), int(conflicts.sum())
+
+def merge_sources(sources, policies=MERGE_POLICIES, keys=MERGE_KEYS):
+    """
+    Fusionne un nombre quelconque de sources alignées sur un index
+    (country_code, year) trié.
+
+    Les clés de toutes les sources sont encodées en entiers denses dans un
+    même espace trié (pays x années): le panel trié et la position de chaque
+    ligne de chaque source s'obtiennent par adressage direct dans cet espace,
+    en un seul passage par source, sans jointure par hachage ni tri final.
+
+    Args:
+        sources (list): Couples (nom, DataFrame) dans l'ordre de priorité
+        policies (dict): Politique de jointure par nom de source
+        keys (list): Colonnes formant la clé (pays, année)
+
+    Returns:
+        tuple: (DataFrame fusionné trié par clé, rapport par source)
+    """
+    country_key, year_key = keys
+    frames = []
+    report = {}
+    for name, df in sources:
+        # Lignes sans clé
+        missing = df[keys].isna().any(axis=1).to_numpy()
+        if missing.any():
+            logger.warning(f"{name} - {int(missing.sum())} lignes sans clé ignorées")
+            df = df[~missing]
+        frames.append((name, df))
+        report[name] = {'missing_keys': int(missing.sum())}
+
+    # Espace de clés commun: pays triés et années décalées
+    country_codes = [country_values(df[country_key]) for _, df in frames]
+    countries = pd.Index(pd.unique(np.concatenate(
+        [uniques.to_numpy() for _, uniques in country_codes]
+    ))).sort_values()
+    years = [df[year_key].to_numpy(dtype=np.int64) for _, df in frames]
+    all_years = np.concatenate(years)
+    min_year = int(all_years.min()) if len(all_years) else 0
+    year_span = int(all_years.max()) - min_year + 1 if len(all_years) else 1
+    encoded = [encode_keys(codes, source_years, countries, min_year, year_span)
+               for codes, source_years in zip(country_codes, years)]
+
+    # Doublons de clés: la première occurrence est conservée
+    for position, (name, df) in enumerate(frames):
+        duplicated = pd.Series(encoded[position]).duplicated(keep='first').to_numpy()
+        if duplicated.any():
+            logger.warning(f"{name} - {int(duplicated.sum())} clés en double ignorées")
+            frames[position] = (name, df[~duplicated])
+            encoded[position] = encoded[position][~duplicated]
+        report[name].update({'rows': len(encoded[position]), 'duplicates': int(duplicated.sum())})
+
+    # Panel: clés de la première source et des sources 'outer', dans l'ordre de l'espace de clés
+    source_policies = {name: 'outer' if position == 0 else policies.get(name, 'left')
+                       for position, (name, _) in enumerate(frames)}
+    in_panel = np.zeros(len(countries) * year_span, dtype=bool)
+    for (name, _), codes in zip(frames, encoded):
+        if source_policies[name] == 'outer':
+            in_panel[codes] = True
+    panel = np.flatnonzero(in_panel)
+    panel_rows = np.full(len(in_panel), -1, dtype=np.intp)
+    panel_rows[panel] = np.arange(len(panel))
+
+    columns = {}
+    for (name, df), codes in zip(frames, encoded):
+        policy = source_policies[name]
+        rows = panel_rows[codes]
+        found = rows >= 0
+        indexer = np.full(len(panel), -1, dtype=np.intp)
+        indexer[rows[found]] = np.flatnonzero(found)
+        report[name].update({'policy': policy, 'outside_panel': int((~found).sum()),
+                             'filled': 0, 'conflicts': {}})
+        if (~found).any():
+            outside = sorted(set(df[country_key].astype(object).to_numpy()[~found]))
+            logger.info(f"{name} - {int((~found).sum())} lignes hors panel ignorées ({len(outside)} pays: {outside[:10]})")
+
+        for column in df.columns:
+            if column in keys:
+                continue
+            candidate = take_values(df[column], indexer)
+            if column not in columns:
+                if policy != 'coalesce':
+                    columns[column] = candidate
+                continue
+            columns[column], filled, conflicts = coalesce_column(columns[column], candidate)
+            report[name]['filled'] += filled
+            if conflicts:
+                report[name]['conflicts'][column] = conflicts
+                logger.warning(f"{name} - {conflicts} valeurs en conflit pour {column} (source prioritaire conservée)")
+
+    # Décodage des clés triées
+    merged = pd.DataFrame(columns)
+    merged.insert(0, country_key, countries.take(panel // year_span))
+    merged.insert(0, year_key, (panel % year_span + min_year).astype(frames[0][1][year_key].dtype))
+    order = [column for _, df in frames for column in df.columns if column in merged.columns]
+    merged = merged[list(dict.fromkeys(order))]
+
+    for name, stats in report.items():
+        logger.info(f"{name} ({stats['policy']}) - {stats['rows']} lignes, {stats['duplicates']} doublons, "
+                    f"{stats['outside_panel']} hors panel, {stats['filled']} valeurs complétées, "
+                    f"{sum(stats['conflicts'].values())} conflits")
+    return merged, report
+
+def merge_datasets(wb_df=None, unesco_df=None):
     """
     Fusionne les datasets World Bank et UNESCO.
+
+    Args:
+        wb_df: Données World Bank (nettoyées par le pipeline), lues sur disque si absentes
+        unesco_df: Données UNESCO (nettoyées par le pipeline), lues sur disque si absentes
     """
-    # Charger les données
-    wb_df = load_worldbank_data()
-    unesco_df = load_unesco_data()
-    
-    # Obtenir la liste des pays dans World Bank
-    worldbank_countries = set(wb_df['country_code'].unique())
-    unesco_countries = set(unesco_df['country_code'].unique())
-    
-    # Afficher les statistiques de correspondance des pays
-    common_countries = worldbank_countries.intersection(unesco_countries)
-    logger.info(f"Nombre de pays en commun: {len(common_countries)}")
-    logger.info(f"Pays présents uniquement dans World Bank: {sorted(worldbank_countries - unesco_countries)}")
-    logger.info(f"Pays présents uniquement dans UNESCO: {sorted(unesco_countries - worldbank_countries)}")
-    
-    # Filtrer les données UNESCO pour ne garder que les pays de World Bank
-    unesco_df = unesco_df[unesco_df['country_code'].isin(worldbank_countries)]
-    logger.info(f"Données UNESCO filtrées: {len(unesco_df)} lignes")
-    
-    # Fusion sur country_code et year
-    merged_df = pd.merge(
-        wb_df,
-        unesco_df,
-        on=['country_code', 'year'],
-        how='left'
-    )
+    # Charger les données, dans l'ordre de priorité de MERGE_POLICIES
+    sources = [
+        ('World Bank', load_worldbank_data(wb_df)),
+        ('UNESCO', load_unesco_data(unesco_df))
+    ]
+    merged_df, _ = merge_sources(sources)
     
     # Supprimer la colonne country_name
     if 'country_name' in merged_df.columns:
         merged_df = merged_df.drop('country_name', axis=1)
         logger.info("Colonne country_name supprimée")
     
-    # Trier les données
-    merged_df = merged_df.sort_values(['country_code', 'year'])
-    
     logger.info(f"Dataset final: {len(merged_df)} lignes")
     return merged_df
 
-def save_merged_data(df):
+def save_merged_data(df, cube=None):
     """
-    Sauvegarde le dataset fusionné.
+    Sauvegarde le dataset fusionné (export CSV, jeu Parquet et base analytique
+    complets) et journalise les clés modifiées par rapport au panel précédent.
+
+    Args:
+        df: Panel fusionné
+        cube: Cube d'agrégats du panel (calculé si absent, voir ``panel_store.build_cube``)
+
+    Returns:
+        pandas.DataFrame: Clés modifiées (voir ``diff_panels``)
     """
-    output_dir = os.path.dirname(FINAL_OUTPUT_FILE)
-    os.makedirs(output_dir, exist_ok=True)
-    
-    df.to_csv(FINAL_OUTPUT_FILE, index=False)
+    previous = read_partitioned(FINAL_OUTPUT_DATASET) if os.path.isdir(FINAL_OUTPUT_DATASET) else None
+    df = write_dataset(df, FINAL_OUTPUT_FILE)
+    write_partitioned(df, FINAL_OUTPUT_DATASET)
     logger.info(f"Données fusionnées sauvegardées dans {FINAL_OUTPUT_FILE}")
+    if previous is None:
+        changes = df[MERGE_KEYS + ['region']].assign(change='insert')
+    else:
+        changes = diff_panels(df, previous)
+    version = record_panel_changes(changes) if not changes.empty else panel_version()
+    publish_panel(df, version, cube)
+    log_memory(df, "Données fusionnées")
     
     # Afficher les informations sur les colonnes
     logger.info("Colonnes dans le dataset final:")
@@ -205,14 +360,160 @@ def save_merged_data(df):
         total = len(df)
         percentage = (non_null / total) * 100
         logger.info(f"{col}: {non_null}/{total} valeurs non-null ({percentage:.2f}%)")
+    return changes
+
+def diff_panels(new_df, old_df, keys=MERGE_KEYS):
+    """
+    Compare deux versions du panel et retourne les clés ajoutées, modifiées
+    ou supprimées. Les lignes sont appariées une seule fois par clé, puis
+    chaque colonne est comparée de façon vectorisée. Une clé qui change de
+    région est retournée comme une suppression dans l'ancienne région et une
+    insertion dans la nouvelle, pour que les deux partitions soient réécrites.
+
+    Args:
+        new_df: Nouvelle version du panel
+        old_df: Version enregistrée du panel
+        keys: Colonnes formant la clé
+
+    Returns:
+        pandas.DataFrame: Colonnes des clés, region (ancienne région pour les
+        suppressions) et change ('insert', 'update' ou 'delete')
+    """
+    new_df = apply_schema(new_df).reset_index(drop=True)
+    old_df = apply_schema(old_df).reset_index(drop=True)
+    positions = pd.MultiIndex.from_frame(old_df[keys]).get_indexer(pd.MultiIndex.from_frame(new_df[keys]))
+    found = positions >= 0
+    matched = positions[found]
+
+    updated = np.zeros(found.sum(), dtype=bool)
+    for column in new_df.columns:
+        if column in keys:
+            continue
+        if column not in old_df.columns:
+            updated[:] = True
+            break
+        new_values, old_values = new_df[column], old_df[column]
+        if pd.api.types.is_numeric_dtype(new_values) and pd.api.types.is_numeric_dtype(old_values):
+            new_values = new_values.to_numpy(dtype=np.float64, na_value=np.nan)[found]
+            old_values = old_values.to_numpy(dtype=np.float64, na_value=np.nan)[matched]
+            same = (new_values == old_values) | (np.isnan(new_values) & np.isnan(old_values))
+        else:
+            new_values = new_values.to_numpy(dtype=object)[found]
+            old_values = old_values.to_numpy(dtype=object)[matched]
+            same = (new_values == old_values) | (pd.isna(new_values) & pd.isna(old_values))
+        updated |= ~same
+
+    new_regions = new_df['region'].to_numpy(dtype=object)[found]
+    old_regions = old_df['region'].to_numpy(dtype=object)[matched]
+    moved = ~((new_regions == old_regions) | (pd.isna(new_regions) & pd.isna(old_regions)))
+    inserted = ~found
+    inserted[np.flatnonzero(found)[moved]] = True
+    deleted = np.ones(len(old_df), dtype=bool)
+    deleted[matched[~moved]] = False
+    columns = keys + ['region']
+    changes = pd.concat([
+        new_df.loc[inserted, columns].assign(change='insert'),
+        new_df.loc[np.flatnonzero(found)[updated & ~moved], columns].assign(change='update'),
+        old_df.loc[deleted, columns].assign(change='delete')
+    ], ignore_index=True)
+    return changes
+
+def record_panel_changes(changes):
+    """
+    Ajoute les clés modifiées au journal PANEL_CHANGES_FILE, sous un nouveau
+    numéro de version du panel.
+
+    Returns:
+        int: Numéro de version attribué
+    """
+    version = panel_version() + 1
+    changes = changes.assign(version=version)[['version'] + [c for c in changes.columns]]
+    changes.to_csv(PANEL_CHANGES_FILE, mode='a', index=False, header=not os.path.exists(PANEL_CHANGES_FILE))
+    logger.info(f"Version {version} du panel: {len(changes)} clés modifiées enregistrées dans {PANEL_CHANGES_FILE}")
+    return version
 
-def merge_all_data():
+def read_panel_changes(since_version=0):
+    """
+    Retourne les clés modifiées après une version du panel, pour que les
+    consommateurs (caches du dashboard) ne rafraîchissent que ce qui a changé.
+
+    Args:
+        since_version (int, optional): Dernière version déjà prise en compte
+
+    Returns:
+        pandas.DataFrame: Colonnes version, country_code, year, region et change
+    """
+    if not os.path.exists(PANEL_CHANGES_FILE):
+        return pd.DataFrame(columns=['version'] + MERGE_KEYS + ['region', 'change'])
+    changes = pd.read_csv(PANEL_CHANGES_FILE, keep_default_na=False, na_values=[''])
+    return changes[changes['version'] > since_version]
+
+def panel_version():
+    """
+    Retourne le numéro de la dernière version enregistrée du panel (0 si aucune).
+    """
+    if not os.path.exists(PANEL_CHANGES_FILE):
+        return 0
+    versions = pd.read_csv(PANEL_CHANGES_FILE, usecols=['version'])['version']
+    return int(versions.max()) if len(versions) else 0
+
+def upsert_merged_data(df, cube=None):
+    """
+    Met à jour le panel enregistré sans le réécrire entièrement: seules les
+    partitions (région, année) contenant des clés ajoutées, modifiées ou
+    supprimées sont réécrites dans FINAL_OUTPUT_DATASET et dans la base
+    analytique, et ces clés sont ajoutées au journal PANEL_CHANGES_FILE.
+    L'export CSV, qui ne peut être modifié partiellement, n'est réécrit que
+    si le panel a changé (ou s'il n'existe pas encore).
+
+    Args:
+        df: Nouvelle version du panel fusionné
+        cube: Cube d'agrégats du panel (calculé si absent, voir ``panel_store.build_cube``)
+
+    Returns:
+        pandas.DataFrame: Clés modifiées (voir ``diff_panels``)
+    """
+    if not os.path.isdir(FINAL_OUTPUT_DATASET):
+        logger.info("Aucun panel enregistré, écriture complète")
+        return save_merged_data(df, cube)
+
+    df = apply_schema(df)
+    changes = diff_panels(df, read_partitioned(FINAL_OUTPUT_DATASET))
+    if changes.empty:
+        logger.info("Panel inchangé, aucune partition réécrite")
+        if not os.path.exists(FINAL_OUTPUT_FILE):
+            write_dataset(df, FINAL_OUTPUT_FILE)
+        if not has_table(CUBE_TABLE):
+            publish_cube(build_cube(df) if cube is None else cube)
+        return changes
+
+    write_dataset(df, FINAL_OUTPUT_FILE)
+    logger.info(f"Données fusionnées sauvegardées dans {FINAL_OUTPUT_FILE}")
+    logger.info(f"Mise à jour du panel: {changes['change'].value_counts().to_dict()}")
+    partitions = changes[PARTITION_COLUMNS].drop_duplicates().itertuples(index=False, name=None)
+    write_partitions(df, FINAL_OUTPUT_DATASET, list(partitions))
+    patch_panel(df, changes, record_panel_changes(changes), cube)
+    return changes
+
+def merge_all_data(wb_df=None, unesco_df=None, upsert=False):
     """
     Fonction principale pour fusionner toutes les données.
+
+    Args:
+        wb_df: Données World Bank nettoyées (lues sur disque si absentes)
+        unesco_df: Données UNESCO nettoyées (lues sur disque si absentes)
+        upsert: Ne réécrire que les partitions du panel dont les clés ont changé
     """
-    merged_df = merge_datasets()
-    save_merged_data(merged_df)
+    merged_df = merge_datasets(wb_df, unesco_df)
+    if upsert:
+        upsert_merged_data(merged_df)
+    else:
+        save_merged_data(merged_df)
     return merged_df
 
 if __name__ == "__main__":
-    merge_all_data()
+    parser = argparse.ArgumentParser(description="Fusion des données World Bank et UNESCO")
+    parser.add_argument('--upsert', action='store_true',
+                        help="Ne réécrire que les partitions du panel dont les clés ont changé")
+    args = parser.parse_args()
+    merge_all_data(upsert=args.upsert)
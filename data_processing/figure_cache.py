@@ -0,0 +1,136 @@
+"""
+Cache des figures Plotly du dashboard.
+
+Les figures construites par les helpers ``create_*`` sont conservées sous
+forme de JSON Plotly, dans un cache LRU borné en taille et partagé par toutes
+les sessions: revenir sur une page déjà affichée avec les mêmes filtres
+reconstruit la figure depuis son JSON, sans refaire les calculs de Plotly
+Express. Chaque lecture retourne une nouvelle figure, que l'appelant peut
+modifier (lignes de référence, mise en page) sans effet sur le cache.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FIGURE_CACHE_MB
+
+logger = logging.getLogger(__name__)
+
+# Colonnes de données des traces reconverties en tableaux NumPy à la lecture
+ARRAY_KEYS = ('x', 'y')
+
+def restore_arrays(spec):
+    """
+    Reconvertit en tableaux NumPy les valeurs numériques des traces (listes
+    JSON, valeurs manquantes à null): Plotly les conserve alors telles quelles
+    au lieu de parcourir les listes élément par élément.
+
+    Args:
+        spec (dict): Figure désérialisée
+
+    Returns:
+        dict: La même figure
+    """
+    for trace in spec.get('data', []):
+        for key in ARRAY_KEYS:
+            values = trace.get(key)
+            if not isinstance(values, list):
+                continue
+            try:
+                array = np.asarray(values)
+                if array.dtype == object:
+                    array = array.astype(np.float64)
+            except (TypeError, ValueError):
+                continue
+            if array.dtype.kind in 'iuf':
+                trace[key] = array
+    return spec
+
+def load_figure(spec):
+    """
+    Reconstruit une figure à partir de son JSON Plotly. Le JSON ayant été
+    produit par Plotly, la figure n'est pas revalidée.
+
+    Args:
+        spec (str): JSON de la figure
+
+    Returns:
+        plotly.graph_objects.Figure: Nouvelle figure
+    """
+    return go.Figure(restore_arrays(pio.json.from_json_plotly(spec)), _validate=False)
+
+class FigureCache:
+    """
+    Figures sérialisées, évincées de la moins récemment utilisée à la plus
+    récente au-delà de la taille maximale.
+
+    Args:
+        max_mb (float, optional): Taille maximale du JSON conservé, en Mo
+    """
+
+    def __init__(self, max_mb=FIGURE_CACHE_MB):
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """
+        Retourne la figure associée à une clé, construite par build() si elle
+        n'est pas en cache.
+
+        Args:
+            key (tuple): Clé de la figure (hachable)
+            build (callable): Construit la figure en cas d'échec du cache
+
+        Returns:
+            tuple: (figure, informations de la recherche: clé, succès du cache
+            et durée en ms)
+        """
+        start = time.perf_counter()
+        with self._lock:
+            spec = self._cache.get(key)
+            if spec is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        hit = spec is not None
+        if hit:
+            figure = load_figure(spec)
+        else:
+            figure = build()
+            spec = pio.to_json(figure, validate=False)
+            with self._lock:
+                self.misses += 1
+                # Une figure plus grande que le cache entier n'est pas conservée
+                if key not in self._cache and len(spec) <= self.max_bytes:
+                    self._cache[key] = spec
+                    self.size += len(spec)
+                while self.size > self.max_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self.size -= len(evicted)
+            logger.debug(f"Figure {key} construite: {len(spec) / 1024:.0f} Ko")
+        lookup = {'key': key, 'hit': hit, 'ms': (time.perf_counter() - start) * 1000}
+        return figure, lookup
+
+    def stats(self):
+        """
+        Retourne les statistiques du cache, cumulées sur toutes les sessions.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._cache),
+                'size_mb': self.size / 1024 ** 2,
+                'max_mb': self.max_bytes / 1024 ** 2
+            }
@@ -0,0 +1,121 @@
+"""
+Service de filtrage du panel par régions et période, pour le dashboard.
+
+Les lignes de chaque région et de chaque année sont indexées une fois pour
+toutes (bitmaps booléens, et plages de lignes pour les années puisque le
+panel est trié par année). Les sélections déjà calculées sont conservées
+dans un cache LRU borné, partagé par toutes les sessions: une interaction
+répétée (réexécution, bouton d'interprétation) retourne la sélection sans
+la recalculer.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FILTER_CACHE_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+class PanelFilter:
+    """
+    Sélections mémoïsées d'un panel trié par année.
+
+    Args:
+        panel (pandas.DataFrame): Panel partagé, trié par année (colonne region catégorielle)
+        max_entries (int, optional): Nombre maximal de sélections en cache
+    """
+
+    def __init__(self, panel, max_entries=FILTER_CACHE_ENTRIES):
+        self.panel = panel
+        self.max_entries = max_entries
+        self.regions = list(panel['region'].cat.categories)
+        codes = panel['region'].array.codes
+        self.region_bitmaps = {region: codes == position for position, region in enumerate(self.regions)}
+        years, starts = np.unique(panel['year'].to_numpy(), return_index=True)
+        stops = np.append(starts[1:], len(panel))
+        self.year_rows = {int(year): (start, stop) for year, start, stop in zip(years, starts, stops)}
+        self.years = [int(year) for year in years]
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def year_range(self, min_year, max_year):
+        """
+        Retourne la plage de lignes [début, fin) des années min_year à max_year.
+        """
+        selected = [self.year_rows[year] for year in self.years if min_year <= year <= max_year]
+        if not selected:
+            return 0, 0
+        return selected[0][0], selected[-1][1]
+
+    def compute(self, regions, min_year, max_year):
+        """
+        Calcule une sélection à partir des index. La période est une vue sans
+        copie sur le panel; seul un filtre sur une partie des régions copie
+        les lignes retenues (et retire les régions exclues des catégories,
+        que les graphiques afficheraient sinon).
+        """
+        start, stop = self.year_range(min_year, max_year)
+        rows = self.panel.iloc[start:stop]
+        if set(regions) != set(self.regions):
+            mask = np.zeros(stop - start, dtype=bool)
+            for region in regions:
+                if region in self.region_bitmaps:
+                    mask |= self.region_bitmaps[region][start:stop]
+            rows = rows[mask]
+            rows = rows.assign(region=rows['region'].cat.remove_unused_categories())
+        return rows
+
+    def select(self, regions, min_year, max_year):
+        """
+        Retourne les lignes du panel retenues par les filtres, depuis le cache
+        si la même sélection a déjà été demandée.
+
+        Args:
+            regions (list): Régions sélectionnées
+            min_year (int): Première année
+            max_year (int): Dernière année
+
+        Returns:
+            tuple: (lignes retenues, informations de la recherche: clé, succès
+            du cache et durée en ms). Les lignes sont un nouvel objet partageant
+            les colonnes de la sélection en cache (copy-on-write), que la session
+            peut enrichir sans effet sur le cache.
+        """
+        key = (tuple(sorted(regions)), int(min_year), int(max_year))
+        start = time.perf_counter()
+        with self._lock:
+            rows = self._cache.get(key)
+            if rows is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        hit = rows is not None
+        if not hit:
+            rows = self.compute(*key)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = rows
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            logger.debug(f"Sélection {key} calculée: {len(rows)} lignes")
+        lookup = {'key': key, 'hit': hit, 'ms': (time.perf_counter() - start) * 1000}
+        return rows.copy(deep=False), lookup
+
+    def stats(self):
+        """
+        Retourne les statistiques du cache, cumulées sur toutes les sessions.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._cache),
+                'max_entries': self.max_entries
+            }
@@ -0,0 +1,415 @@
+"""
+Base analytique SQLite du panel fusionné et couche de requêtes du dashboard
+et de ``analyze_data.py``.
+
+Le pipeline publie le panel dans ``ANALYTICS_DB_FILE`` (table ``panel``,
+indexée sur (region, year, country_code) et sur (country_code, year)), avec
+un cube d'agrégats précalculés (table ``cube``). Les consommateurs ne
+chargent que les lignes filtrées, ou lisent les agrégats dans le cube sans
+parcourir les lignes du panel.
+"""
+import os
+import sqlite3
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (ANALYTICS_DB_FILE, FINAL_OUTPUT_FILE, FINAL_OUTPUT_DATASET, COLUMN_SCHEMA,
+                    CUBE_QUANTILES, CUBE_BY_COUNTRY)
+from data_processing.schema import apply_schema, read_table
+
+logger = logging.getLogger(__name__)
+
+PANEL_TABLE = 'panel'
+PANEL_KEYS = ['country_code', 'year']
+
+# Types SQLite correspondant aux types du schéma
+SQL_TYPES = {'category': 'TEXT', 'int16': 'INTEGER', 'float32': 'REAL', 'float64': 'REAL'}
+
+# Fonctions d'agrégation disponibles
+AGGREGATES = {'mean': 'AVG', 'sum': 'SUM', 'count': 'COUNT', 'min': 'MIN', 'max': 'MAX'}
+
+CUBE_TABLE = 'cube'
+
+# Niveaux du cube et leurs colonnes de regroupement
+CUBE_LEVELS = {'region': ['year', 'region'], 'country': ['country_code', 'region']}
+CUBE_KEYS = ['level', 'year', 'region', 'country_code', 'indicator']
+CUBE_TYPES = {'level': 'TEXT', 'year': 'INTEGER', 'region': 'TEXT', 'country_code': 'TEXT',
+              'indicator': 'TEXT', 'count': 'INTEGER'}
+
+def quantile_name(q):
+    """
+    Nomme la colonne d'un quantile du cube (0.25 -> 'q25').
+    """
+    return f"q{round(q * 100)}"
+
+def build_cube(df, quantiles=CUBE_QUANTILES, by_country=CUBE_BY_COUNTRY):
+    """
+    Matérialise le cube d'agrégats du panel: effectif, somme, moyenne, médiane
+    et quantiles de chaque indicateur par (année, région) et, si by_country,
+    par pays sur toute la période. Les effectifs et les sommes étant
+    additifs, les moyennes de regroupements plus larges (plusieurs années ou
+    régions) s'en déduisent sans relire le panel.
+
+    Args:
+        df: Panel fusionné
+        quantiles (list, optional): Quantiles calculés
+        by_country (bool, optional): Ajouter le niveau par pays
+
+    Returns:
+        pandas.DataFrame: Une ligne par cellule (level, year, region,
+        country_code, indicator) et une colonne par statistique
+    """
+    indicators = [column for column in df.columns
+                  if column not in PANEL_KEYS + ['region'] and pd.api.types.is_numeric_dtype(df[column])]
+    # Agrégats en float64, pour ne pas cumuler les erreurs d'arrondi des float32
+    values = df.astype({column: 'float64' for column in indicators})
+    levels = {level: keys for level, keys in CUBE_LEVELS.items() if by_country or level != 'country'}
+    cubes = []
+    for level, keys in levels.items():
+        grouped = values.groupby(keys, observed=True)[indicators]
+        stats = {'count': grouped.count(), 'sum': grouped.sum(), 'mean': grouped.mean(), 'median': grouped.median()}
+        for q in quantiles:
+            stats[quantile_name(q)] = grouped.quantile(q)
+        cube = pd.concat({name: frame.stack(dropna=False) for name, frame in stats.items()}, axis=1)
+        cube.index.names = keys + ['indicator']
+        cubes.append(cube.reset_index().assign(level=level))
+    cube = pd.concat(cubes, ignore_index=True)
+    for column in CUBE_KEYS:
+        if column not in cube.columns:
+            cube[column] = None
+    stat_columns = ['count', 'sum', 'mean', 'median'] + [quantile_name(q) for q in quantiles]
+    cube = cube[CUBE_KEYS + stat_columns].astype({'count': 'int64'})
+    logger.info(f"Cube d'agrégats: {len(cube)} cellules ({', '.join(levels)})")
+    return cube
+
+def write_cube(conn, cube):
+    """
+    Remplace le contenu de la table du cube.
+    """
+    conn.execute(f"DROP TABLE IF EXISTS {CUBE_TABLE}")
+    definitions = [f"{quote(column)} {CUBE_TYPES.get(column, 'REAL')}" for column in cube.columns]
+    conn.execute(f"CREATE TABLE {CUBE_TABLE} ({', '.join(definitions)})")
+    conn.execute(f"CREATE INDEX cube_region ON {CUBE_TABLE} (level, indicator, region, year)")
+    conn.execute(f"CREATE INDEX cube_country ON {CUBE_TABLE} (level, indicator, country_code)")
+    rows = cube.astype(object).where(cube.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(
+        f"INSERT INTO {CUBE_TABLE} ({', '.join(map(quote, cube.columns))}) "
+        f"VALUES ({', '.join('?' * len(cube.columns))})",
+        rows
+    )
+
+def quote(identifier):
+    """
+    Protège un nom de colonne SQL (certaines colonnes contiennent un point).
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+def create_panel_table(conn, columns):
+    """
+    Crée la table du panel et ses index.
+    """
+    definitions = [f"{quote(column)} {SQL_TYPES.get(COLUMN_SCHEMA.get(column), 'REAL')}" for column in columns]
+    conn.execute(f"CREATE TABLE {PANEL_TABLE} ({', '.join(definitions)}, "
+                 f"PRIMARY KEY (country_code, year))")
+    conn.execute(f"CREATE INDEX panel_region_year ON {PANEL_TABLE} (region, year, country_code)")
+    conn.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+
+def insert_rows(conn, df):
+    """
+    Insère les lignes d'un DataFrame dans la table du panel.
+    """
+    columns = list(df.columns)
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(
+        f"INSERT INTO {PANEL_TABLE} ({', '.join(map(quote, columns))}) "
+        f"VALUES ({', '.join('?' * len(columns))})",
+        rows
+    )
+
+def set_version(conn, version):
+    """
+    Enregistre la version du panel publiée.
+    """
+    conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('version', ?)", (str(version),))
+
+def publish_panel(df, version=0, cube=None, path=ANALYTICS_DB_FILE):
+    """
+    Publie le panel complet et son cube d'agrégats dans la base analytique.
+    La base est construite dans un fichier temporaire qui remplace
+    l'ancienne une fois terminée.
+
+    Args:
+        df: Panel fusionné
+        version (int, optional): Version du panel (voir ``data_merger.panel_version``)
+        cube (pandas.DataFrame, optional): Cube du panel (calculé si absent, voir ``build_cube``)
+        path (Path, optional): Fichier de la base
+    """
+    df = apply_schema(df)
+    if cube is None:
+        cube = build_cube(df)
+    path = Path(path)
+    temp_path = path.with_name(path.name + '.tmp')
+    if temp_path.exists():
+        temp_path.unlink()
+    with sqlite3.connect(temp_path) as conn:
+        create_panel_table(conn, df.columns)
+        insert_rows(conn, df)
+        write_cube(conn, cube)
+        set_version(conn, version)
+    conn.close()
+    os.replace(temp_path, path)
+    logger.info(f"Panel publié dans {path} ({len(df)} lignes, version {version})")
+
+def patch_panel(df, changes, version, cube=None, path=ANALYTICS_DB_FILE):
+    """
+    Met à jour la base analytique pour les seules clés modifiées, et remplace
+    le cube d'agrégats, en une transaction.
+
+    Args:
+        df: Nouvelle version du panel
+        changes: Clés modifiées (colonnes country_code, year et change)
+        version (int): Nouvelle version du panel
+        cube (pandas.DataFrame, optional): Cube du panel (calculé si absent, voir ``build_cube``)
+        path (Path, optional): Fichier de la base
+    """
+    if not os.path.exists(path):
+        publish_panel(df, version, cube, path)
+        return
+    df = apply_schema(df)
+    if cube is None:
+        cube = build_cube(df)
+    keys = changes[PANEL_KEYS].astype({'country_code': str}).astype(object)
+    changed_rows = df.merge(changes.loc[changes['change'] != 'delete', PANEL_KEYS], on=PANEL_KEYS)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            f"DELETE FROM {PANEL_TABLE} WHERE country_code = ? AND year = ?",
+            [(code, int(year)) for code, year in keys.itertuples(index=False, name=None)]
+        )
+        insert_rows(conn, changed_rows)
+        write_cube(conn, cube)
+        set_version(conn, version)
+    conn.close()
+    logger.info(f"Base analytique mise à jour: {len(changes)} clés modifiées (version {version})")
+
+def publish_cube(cube, path=ANALYTICS_DB_FILE):
+    """
+    Remplace le cube d'agrégats d'une base analytique existante.
+    """
+    with sqlite3.connect(path) as conn:
+        write_cube(conn, cube)
+    conn.close()
+    logger.info(f"Cube d'agrégats publié dans {path}")
+
+def has_table(name, path=ANALYTICS_DB_FILE):
+    """
+    Indique si la base analytique existe et contient une table.
+    """
+    if not os.path.exists(path):
+        return False
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    finally:
+        conn.close()
+    return row is not None
+
+def connect(path=ANALYTICS_DB_FILE):
+    """
+    Ouvre la base analytique en lecture seule. Si elle n'a pas encore été
+    publiée, elle est construite à partir du dataset final.
+
+    Returns:
+        sqlite3.Connection: Connexion en lecture seule
+    """
+    if not os.path.exists(path):
+        logger.info(f"Base analytique absente, construction depuis {FINAL_OUTPUT_DATASET}")
+        df = read_table(FINAL_OUTPUT_DATASET, FINAL_OUTPUT_FILE)
+        duplicated = df.duplicated(PANEL_KEYS)
+        if duplicated.any():
+            # Export antérieur à la fusion dédoublonnée
+            logger.warning(f"{duplicated.sum()} lignes en double (pays, année) ignorées")
+            df = df[~duplicated]
+        publish_panel(df, path=path)
+    return sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True, check_same_thread=False)
+
+def panel_columns(conn):
+    """
+    Retourne les colonnes de la table du panel.
+    """
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({PANEL_TABLE})")]
+
+def where_clause(regions=None, min_year=None, max_year=None, countries=None):
+    """
+    Construit la clause WHERE (et ses paramètres) des filtres région/année/pays.
+    """
+    conditions, params = [], []
+    if regions is not None:
+        conditions.append(f"region IN ({', '.join('?' * len(regions))})")
+        params.extend(regions)
+    if min_year is not None:
+        conditions.append("year >= ?")
+        params.append(int(min_year))
+    if max_year is not None:
+        conditions.append("year <= ?")
+        params.append(int(max_year))
+    if countries is not None:
+        conditions.append(f"country_code IN ({', '.join('?' * len(countries))})")
+        params.extend(countries)
+    if not conditions:
+        return '', params
+    return ' WHERE ' + ' AND '.join(conditions), params
+
+def query_panel(columns=None, regions=None, min_year=None, max_year=None, countries=None,
+                path=ANALYTICS_DB_FILE):
+    """
+    Retourne les lignes du panel correspondant aux filtres.
+
+    Args:
+        columns (list, optional): Colonnes à lire (toutes par défaut, les colonnes absentes sont ignorées)
+        regions (list, optional): Régions retenues
+        min_year (int, optional): Première année retenue
+        max_year (int, optional): Dernière année retenue
+        countries (list, optional): Codes pays retenus
+        path (Path, optional): Fichier de la base
+
+    Returns:
+        pandas.DataFrame: Lignes typées, triées par pays et année
+    """
+    conn = connect(path)
+    try:
+        available = panel_columns(conn)
+        columns = available if columns is None else [column for column in columns if column in available]
+        where, params = where_clause(regions, min_year, max_year, countries)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(map(quote, columns))} FROM {PANEL_TABLE}{where} ORDER BY country_code, year",
+            conn, params=params
+        )
+    finally:
+        conn.close()
+    return apply_schema(df)
+
+def query_aggregates(indicators=None, by=(), agg='mean', regions=None, min_year=None, max_year=None,
+                     countries=None, path=ANALYTICS_DB_FILE):
+    """
+    Calcule des agrégats filtrés des indicateurs dans la base.
+
+    Args:
+        indicators (list, optional): Indicateurs agrégés (tous par défaut)
+        by (tuple, optional): Colonnes de regroupement, par exemple ('year', 'region')
+        agg (str, optional): Agrégat ('mean', 'sum', 'count', 'min' ou 'max')
+        regions, min_year, max_year, countries: Filtres (voir ``query_panel``)
+        path (Path, optional): Fichier de la base
+
+    Returns:
+        pandas.DataFrame: Une ligne par groupe (une seule ligne sans regroupement)
+    """
+    conn = connect(path)
+    try:
+        available = panel_columns(conn)
+        if indicators is None:
+            indicators = [column for column in available if column not in PANEL_KEYS + ['region']]
+        indicators = [column for column in indicators if column in available]
+        by = [column for column in by if column in available]
+        where, params = where_clause(regions, min_year, max_year, countries)
+        select = [quote(column) for column in by] + [
+            f"{AGGREGATES[agg]}({quote(column)}) AS {quote(column)}" for column in indicators
+        ]
+        group = f" GROUP BY {', '.join(map(quote, by))} ORDER BY {', '.join(map(quote, by))}" if by else ''
+        df = pd.read_sql_query(f"SELECT {', '.join(select)} FROM {PANEL_TABLE}{where}{group}", conn, params=params)
+    finally:
+        conn.close()
+    # Un agrégat sans valeur est lu comme None: NaN, comme pour pandas
+    df = df.astype({column: 'int64' if agg == 'count' else 'float64' for column in indicators})
+    return apply_schema(df, {column: dtype for column, dtype in COLUMN_SCHEMA.items() if column in by})
+
+def query_cube(indicators=None, level='region', regions=None, min_year=None, max_year=None,
+               countries=None, path=ANALYTICS_DB_FILE):
+    """
+    Retourne les cellules du cube d'agrégats correspondant aux filtres.
+
+    Args:
+        indicators (list, optional): Indicateurs retenus (tous par défaut)
+        level (str, optional): Niveau du cube ('region' ou 'country')
+        regions, min_year, max_year, countries: Filtres (voir ``query_panel``;
+            les filtres d'années ne s'appliquent qu'au niveau 'region')
+        path (Path, optional): Fichier de la base
+
+    Returns:
+        pandas.DataFrame: Une ligne par cellule et une colonne par statistique
+    """
+    # Les cellules du niveau pays couvrent toute la période (année NULL)
+    if 'year' not in CUBE_LEVELS[level]:
+        min_year = max_year = None
+    where, params = where_clause(regions, min_year, max_year, countries)
+    where += (' AND' if where else ' WHERE') + ' level = ?'
+    params.append(level)
+    if indicators is not None:
+        where += f" AND indicator IN ({', '.join('?' * len(indicators))})"
+        params.extend(indicators)
+    conn = connect(path)
+    try:
+        df = pd.read_sql_query(f"SELECT * FROM {CUBE_TABLE}{where}", conn, params=params)
+    finally:
+        conn.close()
+    # Clés inutilisées par le niveau (année du niveau pays, pays du niveau région)
+    return df.drop(columns=[column for column in ('year', 'country_code') if column not in CUBE_LEVELS[level]])
+
+def cube_means(indicators, by=(), level='region', regions=None, min_year=None, max_year=None,
+               countries=None, path=ANALYTICS_DB_FILE):
+    """
+    Calcule des moyennes filtrées à partir des effectifs et des sommes du cube,
+    sans parcourir les lignes du panel: les cellules retenues sont cumulées
+    par groupe (par exemple sur toutes les années d'une région).
+
+    Args:
+        indicators (list): Indicateurs
+        by (tuple, optional): Colonnes de regroupement parmi les clés du niveau,
+            par exemple ('year', 'region'); une seule ligne sans regroupement
+        level (str, optional): Niveau du cube ('region' ou 'country')
+        regions, min_year, max_year, countries: Filtres (voir ``query_cube``)
+        path (Path, optional): Fichier de la base
+
+    Returns:
+        pandas.DataFrame: Colonnes de regroupement et une colonne par indicateur
+    """
+    cells = query_cube(indicators, level, regions, min_year, max_year, countries, path)
+    by = list(by)
+    totals = cells.groupby(by + ['indicator'], sort=True)[['sum', 'count']].sum()
+    # Moyenne NaN pour un groupe sans valeur (effectif nul)
+    means = totals['sum'] / totals['count'].where(totals['count'] > 0)
+    if not by:
+        return means.reindex(list(indicators)).to_frame().T.reset_index(drop=True).rename_axis(columns=None)
+    means = means.unstack('indicator').reindex(columns=list(indicators))
+    means.columns.name = None
+    return apply_schema(means.reset_index(), {column: dtype for column, dtype in COLUMN_SCHEMA.items() if column in by})
+
+def filter_options(path=ANALYTICS_DB_FILE):
+    """
+    Retourne les régions et les années disponibles (lues sur les index).
+
+    Returns:
+        tuple: (liste des régions, liste des années)
+    """
+    conn = connect(path)
+    try:
+        regions = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT region FROM {PANEL_TABLE} WHERE region IS NOT NULL ORDER BY region")]
+        years = [row[0] for row in conn.execute(f"SELECT DISTINCT year FROM {PANEL_TABLE} ORDER BY year")]
+    finally:
+        conn.close()
+    return regions, years
+
+def store_version(path=ANALYTICS_DB_FILE):
+    """
+    Retourne la version du panel publiée dans la base.
+    """
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT value FROM metadata WHERE key = 'version'").fetchone()
+    finally:
+        conn.close()
+    return int(row[0]) if row else 0
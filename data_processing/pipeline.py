@@ -0,0 +1,213 @@
+"""
+Exécution du pipeline de traitement sous forme de graphe d'étapes (DAG).
+
+Chaque étape reçoit en mémoire les résultats des étapes dont elle dépend. Son
+résultat est mis en cache sur disque sous une clé dérivée du code des modules
+qui l'implémentent, du contenu de ses fichiers d'entrée et des clés de ses
+dépendances: une nouvelle exécution ne recalcule que les étapes dont une
+entrée a changé, et ne relit pas les résultats intermédiaires inutiles.
+"""
+import os
+import json
+import time
+import hashlib
+import inspect
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import STAGE_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+class Stage:
+    """
+    Étape du pipeline.
+
+    Args:
+        name (str): Nom unique de l'étape
+        func (callable): Fonction appelée avec les résultats des dépendances, dans l'ordre de ``deps``
+        deps (tuple, optional): Noms des étapes dont l'étape dépend
+        files (tuple, optional): Fichiers lus par l'étape (leur contenu entre dans la clé)
+        modules (tuple, optional): Modules implémentant l'étape (leur code entre dans la clé),
+            en plus du module de ``func``
+        cache (bool, optional): Mettre le résultat en cache (False pour les étapes
+            à effet de bord, comme l'écriture des fichiers de sortie)
+    """
+
+    def __init__(self, name, func, deps=(), files=(), modules=(), cache=True):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.files = tuple(files)
+        self.modules = (sys.modules[func.__module__],) + tuple(modules)
+        self.cache = cache
+
+def file_digest(path, block_size=1024 * 1024):
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier ('absent' s'il n'existe pas).
+    """
+    if not os.path.exists(path):
+        return 'absent'
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_version(modules):
+    """
+    Calcule l'empreinte du code source d'une liste de modules.
+    """
+    digest = hashlib.sha256()
+    for module in sorted(set(modules), key=lambda module: module.__name__):
+        digest.update(module.__name__.encode('utf-8'))
+        digest.update(file_digest(inspect.getsourcefile(module)).encode('utf-8'))
+    return digest.hexdigest()
+
+def stage_key(stage, dep_keys):
+    """
+    Calcule la clé de cache d'une étape.
+
+    Args:
+        stage (Stage): Étape
+        dep_keys (list): Clés des dépendances, dans l'ordre de ``stage.deps``
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    canonical = json.dumps([
+        stage.name,
+        code_version(stage.modules),
+        list(dep_keys),
+        [[str(path), file_digest(path)] for path in stage.files]
+    ], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class StageCache:
+    """
+    Cache disque des résultats d'étapes (un fichier pickle par étape, seule
+    la dernière version de chaque étape étant conservée).
+
+    Args:
+        cache_dir (Path, optional): Répertoire du cache
+    """
+
+    def __init__(self, cache_dir=STAGE_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = True
+
+    def _path(self, name, key):
+        return self.cache_dir / f"{name}-{key[:16]}.pkl"
+
+    def load(self, name, key):
+        """
+        Retourne le résultat en cache d'une étape, ou None s'il est absent ou illisible.
+        """
+        path = self._path(name, key)
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"Cache de l'étape {name} illisible, recalcul: {e}")
+            return None
+
+    def store(self, name, key, output):
+        """
+        Enregistre le résultat d'une étape et supprime ses versions précédentes.
+        """
+        if not self.enabled:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(name, key)
+        temp_path = path.with_suffix('.tmp')
+        pd.to_pickle(output, temp_path)
+        os.replace(temp_path, path)
+        for previous in self.cache_dir.glob(f"{name}-*.pkl"):
+            if previous != path:
+                previous.unlink()
+
+def sort_stages(stages):
+    """
+    Ordonne les étapes de sorte que chaque étape suive ses dépendances.
+
+    Raises:
+        ValueError: Si une dépendance est inconnue ou si le graphe contient un cycle
+    """
+    by_name = {stage.name: stage for stage in stages}
+    ordered, state = [], {}
+
+    def visit(name, path):
+        if name not in by_name:
+            raise ValueError(f"Étape inconnue: {name} (requise par {path[-1]})")
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Cycle dans le pipeline: {' -> '.join(path + [name])}")
+        state[name] = 'visiting'
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        state[name] = 'done'
+        ordered.append(by_name[name])
+
+    for stage in stages:
+        visit(stage.name, [])
+    return ordered
+
+def run_pipeline(stages, cache=None, force=False):
+    """
+    Exécute les étapes du pipeline en réutilisant les résultats en cache.
+
+    Les clés de toutes les étapes sont calculées d'abord; une étape n'est
+    ensuite exécutée que si son résultat n'est pas en cache, et les résultats
+    de ses dépendances ne sont chargés ou calculés que dans ce cas.
+
+    Args:
+        stages (list): Étapes (Stage) du pipeline
+        cache (StageCache, optional): Cache des résultats (par défaut STAGE_CACHE_DIR)
+        force (bool, optional): Ignorer les résultats en cache et tout recalculer
+
+    Returns:
+        dict: Résultat de chaque étape évaluée, par nom d'étape
+    """
+    if cache is None:
+        cache = StageCache()
+    ordered = sort_stages(stages)
+    by_name = {stage.name: stage for stage in ordered}
+    keys = {}
+    for stage in ordered:
+        keys[stage.name] = stage_key(stage, [keys[dep] for dep in stage.deps])
+
+    outputs = {}
+
+    def resolve(name):
+        if name in outputs:
+            return outputs[name]
+        stage = by_name[name]
+        key = keys[name]
+        if stage.cache and not force:
+            output = cache.load(name, key)
+            if output is not None:
+                logger.info(f"Étape {name}: résultat en cache ({key[:12]})")
+                outputs[name] = output
+                return output
+
+        inputs = [resolve(dep) for dep in stage.deps]
+        start = time.perf_counter()
+        output = stage.func(*inputs)
+        logger.info(f"Étape {name}: exécutée en {time.perf_counter() - start:.2f} s ({key[:12]})")
+        if stage.cache:
+            cache.store(name, key, output)
+        outputs[name] = output
+        return output
+
+    # Les étapes sans successeur sont les cibles du pipeline
+    successors = {dep for stage in ordered for dep in stage.deps}
+    for stage in ordered:
+        if stage.name not in successors:
+            resolve(stage.name)
+    return outputs
@@ -0,0 +1,154 @@
+"""
+Droites de régression (moindres carrés ordinaires) des graphiques du dashboard.
+
+Les pentes, ordonnées à l'origine, R² et bandes de confiance de tous les
+couples (x, y) et de tous les groupes (régions) sont calculés en une seule
+passe vectorisée NumPy (sommes par groupe via ``np.bincount``), sans
+statsmodels ni ajustement d'un modèle par groupe.
+"""
+import logging
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TRENDLINE_CONFIDENCE, TRENDLINE_POINTS
+
+logger = logging.getLogger(__name__)
+
+# Transformations applicables à x avant l'ajustement
+TRANSFORMS = {
+    'linear': lambda values: values,
+    'log': np.log
+}
+
+# Groupe unique lorsque les droites ne sont pas ajustées par groupe
+ALL_GROUPS = 'Ensemble'
+
+def t_quantile(p, dof):
+    """
+    Quantile de la loi de Student: formes exactes pour 1 et 2 degrés de
+    liberté, développement de Cornish-Fisher autour de la loi normale au-delà
+    (précis à 5e-3 près dès 3 degrés de liberté, 1e-3 dès 5).
+
+    Args:
+        p (float): Probabilité
+        dof: Degrés de liberté (scalaire ou tableau)
+
+    Returns:
+        numpy.ndarray: Quantiles (NaN pour moins d'un degré de liberté)
+    """
+    z = NormalDist().inv_cdf(p)
+    dof = np.asarray(dof, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (z
+             + (z ** 3 + z) / (4 * dof)
+             + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+             + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3)
+             + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * dof ** 4))
+    t = np.where(dof == 1, np.tan(np.pi * (p - 0.5)), t)
+    t = np.where(dof == 2, (2 * p - 1) / np.sqrt(2 * p * (1 - p)), t)
+    return np.where(dof >= 1, t, np.nan)
+
+def fit_trendlines(df, specs, group='region', confidence=TRENDLINE_CONFIDENCE):
+    """
+    Ajuste une droite y = intercept + slope * x par groupe pour chaque couple
+    (x, y), tous couples et groupes confondus en une passe vectorisée. Les
+    sommes centrées sont calculées en deux passes pour rester précises sur
+    les grandes valeurs (RNB, population).
+
+    Args:
+        df: Données (lignes d'une sélection du panel)
+        specs (list): Couples [(x, y, transformation de x), ...], transformation
+            parmi TRANSFORMS ('linear' ou 'log')
+        group (str, optional): Colonne de regroupement (None pour une droite unique)
+        confidence (float, optional): Niveau des bandes de confiance de la droite
+
+    Returns:
+        pandas.DataFrame: Une ligne par (x, y, transform, group) avec n, slope,
+        intercept, r2, x_mean, sxx, se (écart-type résiduel), t (quantile de
+        Student), x_min et x_max
+    """
+    if group is None:
+        codes, groups = np.zeros(len(df), dtype=np.int64), [ALL_GROUPS]
+    elif isinstance(df[group].dtype, pd.CategoricalDtype):
+        codes, groups = df[group].array.codes.astype(np.int64), list(df[group].cat.categories)
+    else:
+        codes, groups = pd.factorize(df[group], sort=True)
+        groups = list(groups)
+    n_specs, n_groups = len(specs), len(groups)
+
+    # Valeurs de tous les couples, empilées: une ligne par couple (le log
+    # d'une valeur nulle ou négative n'est pas fini et la ligne est ignorée)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.stack([TRANSFORMS[transform](df[x_col].to_numpy(dtype=np.float64, na_value=np.nan))
+                      for x_col, _, transform in specs]) if specs else np.empty((0, len(df)))
+    y = np.stack([df[y_col].to_numpy(dtype=np.float64, na_value=np.nan) for _, y_col, _ in specs]) \
+        if specs else np.empty((0, len(df)))
+    valid = np.isfinite(x) & np.isfinite(y) & (codes >= 0)
+    weights = valid.astype(np.float64)
+    x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+    bins = (np.arange(n_specs)[:, None] * n_groups + np.maximum(codes, 0)[None, :]).ravel()
+
+    def group_sums(values):
+        return np.bincount(bins, weights=values.ravel(), minlength=n_specs * n_groups).reshape(n_specs, n_groups)
+
+    n = group_sums(weights)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = group_sums(x) / n
+        y_mean = group_sums(y) / n
+        # Seconde passe: écarts aux moyennes du groupe
+        dx = (x - x_mean.ravel()[bins].reshape(x.shape)) * weights
+        dy = (y - y_mean.ravel()[bins].reshape(y.shape)) * weights
+        sxx, sxy, syy = group_sums(dx * dx), group_sums(dx * dy), group_sums(dy * dy)
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        r2 = sxy ** 2 / (sxx * syy)
+        se = np.sqrt(np.maximum(syy - slope * sxy, 0.0) / (n - 2))
+
+    x_min = np.full(n_specs * n_groups, np.inf)
+    x_max = np.full(n_specs * n_groups, -np.inf)
+    flat_valid = valid.ravel()
+    np.minimum.at(x_min, bins[flat_valid], x.ravel()[flat_valid])
+    np.maximum.at(x_max, bins[flat_valid], x.ravel()[flat_valid])
+
+    fits = pd.DataFrame({
+        'x': np.repeat([x_col for x_col, _, _ in specs], n_groups),
+        'y': np.repeat([y_col for _, y_col, _ in specs], n_groups),
+        'transform': np.repeat([transform for _, _, transform in specs], n_groups),
+        'group': np.tile(np.array(groups, dtype=object), n_specs),
+        'n': n.ravel().astype(np.int64),
+        'slope': slope.ravel(),
+        'intercept': intercept.ravel(),
+        'r2': r2.ravel(),
+        'x_mean': x_mean.ravel(),
+        'sxx': sxx.ravel(),
+        'se': se.ravel(),
+        't': t_quantile((1 + confidence) / 2, n.ravel() - 2),
+        'x_min': x_min,
+        'x_max': x_max
+    })
+    # Une droite demande au moins deux valeurs de x distinctes
+    fits = fits[(fits['n'] >= 2) & (fits['sxx'] > 0)].reset_index(drop=True)
+    logger.debug(f"{len(fits)} droites de régression ajustées ({n_specs} couples, {n_groups} groupes)")
+    return fits
+
+def trendline_band(fit, points=TRENDLINE_POINTS):
+    """
+    Évalue une droite ajustée et sa bande de confiance sur l'étendue de x.
+
+    Args:
+        fit: Ligne du résultat de ``fit_trendlines``
+        points (int, optional): Nombre de points d'évaluation
+
+    Returns:
+        tuple: (x, y ajusté, borne basse, borne haute), tableaux NumPy
+        (bornes NaN avec moins de trois observations)
+    """
+    xs = np.linspace(fit['x_min'], fit['x_max'], points)
+    fitted = fit['intercept'] + fit['slope'] * xs
+    half_width = fit['t'] * fit['se'] * np.sqrt(1 / fit['n'] + (xs - fit['x_mean']) ** 2 / fit['sxx'])
+    return xs, fitted, fitted - half_width, fitted + half_width
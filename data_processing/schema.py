@@ -0,0 +1,324 @@
+"""
+Module pour appliquer le schéma des colonnes (``config.COLUMN_SCHEMA``) aux
+données lues et écrites par le pipeline.
+
+Les jeux de données sont écrits en CSV et en Parquet compressé, partitionné
+par région et année: les lecteurs Parquet ne décodent que les colonnes
+demandées et ne parcourent que les partitions retenues par les filtres.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import logging
+import shutil
+import sys
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import COLUMN_SCHEMA, PARTITION_COLUMNS, PARQUET_COMPRESSION, PARQUET_ROW_GROUP_ROWS
+
+# Schéma des clés uniquement (codes et années), pour écrire les extraits bruts
+# sans réduire la précision des valeurs
+KEY_SCHEMA = {column: dtype for column, dtype in COLUMN_SCHEMA.items() if not dtype.startswith('float')}
+
+# Nom de la partition des valeurs manquantes (convention Hive de pyarrow)
+HIVE_NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# Opérateurs des filtres, pour la lecture CSV de repli
+FILTER_OPERATORS = {
+    '=': lambda series, value: series == value,
+    '==': lambda series, value: series == value,
+    '!=': lambda series, value: series != value,
+    '<': lambda series, value: series < value,
+    '<=': lambda series, value: series <= value,
+    '>': lambda series, value: series > value,
+    '>=': lambda series, value: series >= value,
+    'in': lambda series, value: series.isin(value),
+    'not in': lambda series, value: ~series.isin(value)
+}
+
+def apply_schema(df, schema=COLUMN_SCHEMA):
+    """
+    Convertit les colonnes d'un DataFrame vers les types du schéma.
+    Les valeurs non numériques des colonnes numériques deviennent NaN.
+
+    Args:
+        df: DataFrame à convertir
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+
+    Returns:
+        pandas.DataFrame: DataFrame converti (les colonnes hors schéma sont inchangées)
+    """
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        series = df[column]
+        if dtype != 'category' and not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series, errors='coerce')
+        if dtype.startswith('int') and series.isna().any():
+            # Entier nullable lorsque des valeurs manquent
+            dtype = dtype.capitalize()
+        converted[column] = series.astype(dtype)
+    return df.assign(**converted) if converted else df
+
+def read_dataset(path, columns=None, schema=COLUMN_SCHEMA):
+    """
+    Lit un fichier CSV du pipeline et lui applique le schéma.
+
+    Args:
+        path: Chemin du fichier CSV
+        columns: Colonnes à lire (toutes par défaut)
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+
+    Returns:
+        pandas.DataFrame: Données typées
+    """
+    # keep_default_na=False: 'NA' est le code ISO-2 de la Namibie
+    df = pd.read_csv(
+        path,
+        usecols=(lambda column: column in columns) if columns is not None else None,
+        dtype={column: dtype for column, dtype in schema.items() if dtype == 'category'},
+        keep_default_na=False,
+        na_values=['']
+    )
+    return apply_schema(df, schema)
+
+def write_dataset(df, path, schema=COLUMN_SCHEMA):
+    """
+    Applique le schéma puis écrit un DataFrame au format CSV.
+
+    Args:
+        df: DataFrame à écrire
+        path: Chemin du fichier CSV
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+
+    Returns:
+        pandas.DataFrame: DataFrame typé tel qu'écrit
+    """
+    df = apply_schema(df, schema)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+    return df
+
+def arrow_table(df, partition_cols=()):
+    """
+    Convertit un DataFrame en table Arrow pour l'écriture Parquet.
+
+    Les catégories hors partitionnement sont écrites en chaînes (encodées par
+    dictionnaire dans chaque fichier): sinon chaque partition porterait toutes
+    les catégories.
+    """
+    as_strings = {column: object for column in df.columns
+                  if isinstance(df[column].dtype, pd.CategoricalDtype) and column not in partition_cols}
+    return pa.Table.from_pandas(df.astype(as_strings), preserve_index=False)
+
+def partition_dir(path, partition_cols, values):
+    """
+    Retourne le répertoire d'une partition (``region=.../year=...``), nommé comme par pyarrow.
+    """
+    directory = Path(path)
+    for column, value in zip(partition_cols, values):
+        name = HIVE_NULL_PARTITION if pd.isna(value) else quote(str(value), safe='')
+        directory = directory / f"{column}={name}"
+    return directory
+
+def write_partitioned(df, path, schema=COLUMN_SCHEMA, partition_cols=PARTITION_COLUMNS):
+    """
+    Applique le schéma puis écrit un DataFrame en jeu de données Parquet
+    compressé, partitionné par région et année. Le jeu existant n'est
+    remplacé qu'une fois l'écriture terminée.
+
+    Args:
+        df: DataFrame à écrire
+        path: Répertoire du jeu de données
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+        partition_cols: Colonnes de partitionnement présentes dans df
+
+    Returns:
+        pandas.DataFrame: DataFrame typé tel qu'écrit
+    """
+    df = apply_schema(df, schema)
+    path = Path(path)
+    temp_path = path.with_name(path.name + '.tmp')
+    old_path = path.with_name(path.name + '.old')
+    shutil.rmtree(temp_path, ignore_errors=True)
+    partition_cols = [column for column in partition_cols if column in df.columns]
+    pq.write_to_dataset(
+        arrow_table(df, partition_cols),
+        temp_path,
+        partition_cols=partition_cols,
+        compression=PARQUET_COMPRESSION,
+        min_rows_per_group=PARQUET_ROW_GROUP_ROWS,
+        basename_template='part-{i}.parquet'
+    )
+    if path.exists():
+        os.replace(path, old_path)
+    os.replace(temp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    logger.info(f"Jeu de données Parquet écrit dans {path}")
+    return df
+
+def write_partitions(df, path, partitions, schema=COLUMN_SCHEMA, partition_cols=PARTITION_COLUMNS):
+    """
+    Réécrit uniquement certaines partitions d'un jeu de données Parquet
+    existant, à partir du contenu de df pour ces partitions. Une partition
+    sans ligne dans df est supprimée.
+
+    Args:
+        df: DataFrame contenant au moins les lignes des partitions réécrites
+        path: Répertoire du jeu de données
+        partitions: Valeurs des colonnes de partitionnement des partitions à
+            réécrire, par exemple [('Africa', 2015), ('Asia', 2016)]
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+        partition_cols: Colonnes de partitionnement
+
+    Returns:
+        int: Nombre de partitions réécrites ou supprimées
+    """
+    df = apply_schema(df, schema)
+    # Schéma Arrow des fichiers existants, pour que les partitions restent homogènes
+    file_schema = ds.dataset(path, format='parquet', partitioning='hive').schema
+    file_schema = pa.schema([field for field in file_schema if field.name not in partition_cols])
+    groups = df.groupby(partition_cols, observed=True, dropna=False, sort=False).indices
+    # Clés de partition comparables (NaN n'est pas égal à lui-même)
+    normalize = lambda values: tuple(None if pd.isna(value) else value for value in values)
+    group_rows = {normalize(key if isinstance(key, tuple) else (key,)): rows for key, rows in groups.items()}
+    count = 0
+    for values in partitions:
+        values = normalize(values)
+        directory = partition_dir(path, partition_cols, values)
+        rows = group_rows.get(values)
+        if rows is None or len(rows) == 0:
+            shutil.rmtree(directory, ignore_errors=True)
+            count += 1
+            continue
+        table = arrow_table(df.iloc[rows].drop(columns=partition_cols)).select(file_schema.names).cast(file_schema)
+        directory.mkdir(parents=True, exist_ok=True)
+        temp_file = directory / 'part-0.parquet.tmp'
+        pq.write_table(table, temp_file, compression=PARQUET_COMPRESSION,
+                       row_group_size=max(len(table), PARQUET_ROW_GROUP_ROWS))
+        os.replace(temp_file, directory / 'part-0.parquet')
+        for other in directory.glob('*.parquet'):
+            if other.name != 'part-0.parquet':
+                other.unlink()
+        count += 1
+    logger.info(f"{count} partitions réécrites dans {path}")
+    return count
+
+def read_partitioned(path, columns=None, filters=None, schema=COLUMN_SCHEMA):
+    """
+    Lit un jeu de données Parquet partitionné en ne décodant que les colonnes
+    demandées et les partitions retenues par les filtres.
+
+    Args:
+        path: Répertoire du jeu de données
+        columns: Colonnes à lire (toutes par défaut, les colonnes absentes sont ignorées)
+        filters: Filtres [(colonne, opérateur, valeur), ...], par exemple
+            [('region', 'in', ['Africa']), ('year', '>=', 2015)]
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+
+    Returns:
+        pandas.DataFrame: Données typées
+    """
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    if columns is not None:
+        columns = [column for column in columns if column in dataset.schema.names]
+    table = dataset.to_table(
+        columns=columns,
+        filter=pq.filters_to_expression(filters) if filters else None
+    )
+    return apply_schema(table.to_pandas(), schema)
+
+def read_table(dataset_path, csv_path, columns=None, filters=None, schema=COLUMN_SCHEMA):
+    """
+    Lit le jeu de données Parquet s'il existe, sinon le fichier CSV
+    équivalent (les filtres sont alors appliqués après lecture).
+
+    Args:
+        dataset_path: Répertoire du jeu de données Parquet
+        csv_path: Chemin du fichier CSV de repli
+        columns: Colonnes à lire (toutes par défaut, les colonnes absentes sont ignorées)
+        filters: Filtres [(colonne, opérateur, valeur), ...]
+        schema: Types par colonne (par défaut COLUMN_SCHEMA)
+
+    Returns:
+        pandas.DataFrame: Données typées
+    """
+    if os.path.isdir(dataset_path):
+        return read_partitioned(dataset_path, columns, filters, schema)
+    df = read_dataset(csv_path, columns, schema)
+    for column, op, value in filters or []:
+        df = df[FILTER_OPERATORS[op](df[column], value)]
+    return df
+
+def read_only(df):
+    """
+    Retourne une copie d'un DataFrame dont les tableaux de valeurs sont en
+    lecture seule (une colonne par tableau, sans consolidation), pour être
+    partagée entre plusieurs consommateurs. Avec le mode copy-on-write de
+    pandas, les vues de cette copie ne copient une colonne que lorsqu'elles
+    la modifient.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.array.codes.copy()
+            codes.flags.writeable = False
+            columns[column] = pd.Categorical.from_codes(codes, dtype=series.dtype)
+        else:
+            values = series.to_numpy().copy()
+            values.flags.writeable = False
+            columns[column] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+def column_buffer(series):
+    """
+    Retourne le tableau NumPy portant les valeurs d'une colonne (les codes pour une catégorie).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes
+    return series.to_numpy()
+
+def memory_mb(df):
+    """
+    Retourne l'empreinte mémoire d'un DataFrame en Mo.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def owned_memory_mb(df, base):
+    """
+    Retourne l'empreinte mémoire d'un DataFrame en Mo, sans les colonnes dont
+    les valeurs sont partagées avec base (vues sur base non modifiées).
+    """
+    owned = df.index.memory_usage()
+    for column in df.columns:
+        series = df[column]
+        if column in base.columns and np.may_share_memory(column_buffer(series), column_buffer(base[column])):
+            continue
+        owned += series.memory_usage(deep=True, index=False)
+    return owned / 1024 ** 2
+
+def log_memory(df, stage, shared_with=None):
+    """
+    Journalise l'empreinte mémoire d'un DataFrame à une étape du pipeline.
+
+    Args:
+        df: DataFrame mesuré
+        stage (str): Étape journalisée
+        shared_with (pandas.DataFrame, optional): DataFrame partagé dont df
+            est une vue; seule la mémoire propre à df est alors comptée
+    """
+    if shared_with is None:
+        logger.info(f"{stage} - mémoire: {memory_mb(df):.3f} Mo pour {len(df)} lignes")
+        return
+    owned = owned_memory_mb(df, shared_with)
+    logger.info(f"{stage} - mémoire propre: {owned:.3f} Mo "
+                f"({memory_mb(df) - owned:.3f} Mo partagés) pour {len(df)} lignes")
@@ -1,10 +1,30 @@
 """
 Script principal pour exécuter le pipeline de traitement des données.
+
+Le pipeline est un graphe d'étapes (collect -> clean -> merge -> cube -> save)
+dont les résultats sont transmis en mémoire et mis en cache sur disque: une
+nouvelle exécution ne recalcule que les étapes dont les entrées ou le code ont
+changé. L'étape cube matérialise les agrégats du panel fusionné, publiés avec
+lui dans la base analytique. L'étape quarantine, jamais mise en cache,
+enregistre les cellules rejetées au nettoyage (résultat des étapes clean).
+L'étape save met à jour le panel par upsert: seules les partitions contenant
+des clés modifiées sont réécrites, et ces clés sont journalisées (--force
+réécrit tout le panel). L'export CSV n'est réécrit que si le panel a changé.
+Les extraits bruts sont produits par les collecteurs (data_collectors).
+
+Utilisation:
+    python main.py [--force]
 """
 import logging
-from data_processing.data_cleaner import clean_unesco_data, clean_worldbank_data
-from data_processing.data_merger import merge_all_data
-import pandas as pd
+import argparse
+from data_processing import data_cleaner, data_merger, schema
+from data_processing.data_cleaner import clean_unesco_data, clean_worldbank_data, save_quarantine, RAW_SCHEMA
+from data_processing.data_merger import merge_datasets, save_merged_data, upsert_merged_data
+from data_processing.panel_store import build_cube
+from data_processing.pipeline import Stage, run_pipeline
+from data_processing.schema import read_dataset
+import config
+import country_registry
 from config import UNESCO_RAW_FILE, WORLDBANK_RAW_FILE
 
 # Configuration du logging
@@ -14,25 +34,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
+def collect_unesco():
+    """
+    Charge l'extrait UNESCO brut, sans conversion des colonnes numériques (validées au nettoyage).
+    """
+    return read_dataset(UNESCO_RAW_FILE, schema=RAW_SCHEMA)
+
+def collect_worldbank():
+    """
+    Charge l'extrait World Bank brut, sans conversion des colonnes numériques (validées au nettoyage).
+    """
+    return read_dataset(WORLDBANK_RAW_FILE, schema=RAW_SCHEMA)
+
+def clean_unesco(df):
+    """
+    Nettoie l'extrait UNESCO et retourne (données nettoyées, quarantaine).
+    """
+    return clean_unesco_data(df, return_quarantine=True)
+
+def clean_worldbank(df):
+    """
+    Nettoie l'extrait World Bank et retourne (données nettoyées, quarantaine).
+    """
+    return clean_worldbank_data(df, return_quarantine=True)
+
+def save_quarantines(unesco, worldbank):
+    """
+    Enregistre les quarantaines reçues des étapes de nettoyage, en cache ou non.
+    """
+    for (_, quarantine), source in ((unesco, "UNESCO"), (worldbank, "World Bank")):
+        if quarantine is not None:
+            save_quarantine(quarantine, source)
+
+def merge_cleaned_data(unesco, wb):
+    """
+    Fusionne les données nettoyées reçues des étapes de nettoyage.
+    """
+    return merge_datasets(wb[0], unesco[0])
+
+def build_pipeline(full_save=False):
+    """
+    Construit les étapes du pipeline.
+
+    Args:
+        full_save (bool, optional): Réécrire tout le panel au lieu de ne
+            mettre à jour que les partitions modifiées
+    """
+    return [
+        Stage('collect_unesco', collect_unesco,
+              files=[UNESCO_RAW_FILE], modules=[schema, config], cache=False),
+        Stage('collect_worldbank', collect_worldbank,
+              files=[WORLDBANK_RAW_FILE], modules=[schema, config], cache=False),
+        Stage('clean_unesco', clean_unesco, deps=['collect_unesco'],
+              modules=[data_cleaner, schema, config]),
+        Stage('clean_worldbank', clean_worldbank, deps=['collect_worldbank'],
+              modules=[data_cleaner, schema, config]),
+        Stage('quarantine', save_quarantines, deps=['clean_unesco', 'clean_worldbank'], cache=False),
+        Stage('merge', merge_cleaned_data, deps=['clean_unesco', 'clean_worldbank'],
+              modules=[data_merger, country_registry, schema, config]),
+        Stage('cube', build_cube, deps=['merge'], modules=[config]),
+        Stage('save', save_merged_data if full_save else upsert_merged_data, deps=['merge', 'cube'], cache=False),
+    ]
+
+def main(force=False):
     """
     Exécute le pipeline complet de traitement des données.
+
+    Args:
+        force (bool, optional): Recalculer toutes les étapes sans utiliser le cache
+            et réécrire tout le panel
     """
     try:
-        # Charger et nettoyer les données UNESCO
-        logger.info("Chargement des données UNESCO")
-        unesco_df = pd.read_csv(UNESCO_RAW_FILE)
-        unesco_df = clean_unesco_data(unesco_df)
-        
-        # Charger et nettoyer les données World Bank
-        logger.info("Chargement des données World Bank")
-        wb_df = pd.read_csv(WORLDBANK_RAW_FILE)
-        wb_df = clean_worldbank_data(wb_df)
-        
-        # Fusionner les données
-        logger.info("Fusion des données")
-        merged_df = merge_all_data()
-        
+        run_pipeline(build_pipeline(full_save=force), force=force)
         logger.info("Pipeline de traitement terminé avec succès")
         
     except Exception as e:
@@ -40,4 +113,8 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pipeline de traitement des données")
+    parser.add_argument('--force', action='store_true',
+                        help="Recalculer toutes les étapes sans utiliser le cache et réécrire tout le panel")
+    args = parser.parse_args()
+    main(force=args.force)
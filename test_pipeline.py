@@ -1 +1,508 @@
- 
\ No newline at end of file
+"""
+Tests des collecteurs et du pipeline de traitement.
+
+Utilisation:
+    python -m pytest -q
+"""
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_collectors import uis_sdmx_collector
+from data_collectors.async_engine import AsyncHttpClient
+from data_collectors.checkpoint import CollectionJournal
+from data_collectors.delta import (frame_to_cells, first_revisable_year, plan_delta, plan_requests,
+                                   upsert_cells)
+from data_collectors.http_cache import http_cache, OfflineCacheMiss
+from data_collectors.rate_control import CircuitBreaker
+from data_collectors.uis_sdmx_collector import check_sdmx_csv, sdmx_key
+from data_collectors.worldbank_collector import make_request, check_payload
+from data_processing import data_merger
+from data_processing.data_cleaner import validate_data
+from data_processing.data_merger import merge_sources, diff_panels, upsert_merged_data
+from data_processing.panel_store import build_cube, publish_panel, query_cube, cube_means
+from data_processing.pipeline import Stage, StageCache, run_pipeline, sort_stages
+from data_processing.regression import fit_trendlines
+from data_processing.schema import apply_schema, write_partitioned, write_partitions, read_partitioned
+
+# --- Cache HTTP (revalidation, mode hors-ligne) ---
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Répond avec un ETag, et 304 Not Modified lorsque la requête le présente.
+    """
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get('If-None-Match'))
+        if self.path.startswith('/error'):
+            # L'API World Bank renvoie ses erreurs avec un statut 200
+            self.send_body(b'[{"message": [{"id": "120", "key": "Invalid value", "value": "bad"}]}]')
+            return
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_body(b'[{"page": 1}, []]')
+
+    def send_body(self, body):
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def api_server():
+    ApiHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, 'cache_dir', tmp_path / 'http')
+    monkeypatch.setattr(http_cache, 'enabled', True)
+    monkeypatch.setattr(http_cache, 'offline', False)
+    monkeypatch.setattr(http_cache, '_size', None)
+    return http_cache
+
+def test_http_cache_revalidates_stale_entry_with_etag(cache, api_server):
+    url = f"{api_server}/data"
+    first = make_request(url, {'page': 1}, ttl=0)
+    revalidations = cache.revalidations
+
+    second = make_request(url, {'page': 1}, ttl=3600)
+
+    assert second.content == first.content
+    assert ApiHandler.requests == [None, '"v1"']
+    assert cache.revalidations == revalidations + 1
+    # Entrée prolongée: servie sans accès réseau
+    make_request(url, {'page': 1})
+    assert len(ApiHandler.requests) == 2
+
+def test_http_cache_offline_replays_stale_entries_and_raises_on_miss(cache, api_server):
+    url = f"{api_server}/data"
+    make_request(url, {'page': 1}, ttl=0)
+    cache.offline = True
+
+    assert make_request(url, {'page': 1}).content == b'[{"page": 1}, []]'
+    with pytest.raises(OfflineCacheMiss):
+        make_request(url, {'page': 2})
+    assert len(ApiHandler.requests) == 1
+
+def test_http_cache_never_stores_api_error_payloads(cache, api_server):
+    url = f"{api_server}/error"
+    with pytest.raises(ValueError):
+        make_request(url, {'date': '2015'}, validate=check_payload)
+
+    async def fetch():
+        async with AsyncHttpClient() as client:
+            await client.get_json(url, {'date': '2016'}, validate=check_payload)
+
+    with pytest.raises(ValueError):
+        asyncio.run(fetch())
+    assert cache.lookup(url, {'date': '2015'}) is None
+    assert cache.lookup(url, {'date': '2016'}) is None
+
+# --- Disjoncteur (CircuitBreaker) ---
+
+def test_half_open_breaker_lets_a_single_probe_through(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('data_collectors.rate_control.time.monotonic', lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.pause() == 0
+    # Les autres requêtes attendent l'issue de la requête d'essai
+    assert breaker.pause() > 0
+    breaker.record_failure()
+    assert breaker.pause() == 10
+    clock[0] += 10
+    assert breaker.pause() == 0
+    assert breaker.pause() > 0
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.pause() == 0 and breaker.pause() == 0
+
+def test_stalled_probe_is_replaced_after_cooldown(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('data_collectors.rate_control.time.monotonic', lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.pause() == 0
+    clock[0] += 5
+    assert breaker.pause() > 0
+    # Requête d'essai sans issue (429, réponse invalide): un nouvel essai est permis
+    clock[0] += 5
+    assert breaker.pause() == 0
+
+# --- Collecte UIS SDMX (clé, validation des réponses) ---
+
+UIS_KEYS = {'MSEP.5T8': {'STAT_UNIT': 'MSEP', 'EDU_LEVEL': 'L5T8'},
+            'MOR.5T8.40510': {'STAT_UNIT': 'MOR', 'EDU_LEVEL': 'L5T8', 'SEX': '_T'}}
+
+def test_sdmx_key_follows_the_dataflow_dimension_order():
+    dimensions = ['STAT_UNIT', 'EDU_LEVEL', 'SEX', 'REF_AREA']
+
+    # SEX n'est précisé que pour un indicateur: toutes ses valeurs sont demandées
+    assert sdmx_key(dimensions, UIS_KEYS, ['DZA', 'TUN']) == 'MOR+MSEP.L5T8..DZA+TUN'
+    with pytest.raises(ValueError):
+        sdmx_key(['STAT_UNIT', 'REF_AREA'], UIS_KEYS, ['DZA'])
+
+def test_check_sdmx_csv_rejects_error_and_empty_bodies():
+    check_sdmx_csv(b'DATAFLOW,STAT_UNIT,REF_AREA,TIME_PERIOD,OBS_VALUE\nUNESCO:EDU(3.0),MOR,DZA,2015,2.5\n')
+    for body in (b'', b'<message:Error>NoResultsFound</message:Error>', b'{"errors": ["Unauthorized"]}'):
+        with pytest.raises(ValueError):
+            check_sdmx_csv(body)
+
+def test_sdmx_chunk_never_caches_invalid_bodies_and_propagates_offline_misses(cache, api_server, monkeypatch):
+    monkeypatch.setattr(uis_sdmx_collector, 'UNESCO_BASE_URL', f"{api_server}/error")
+
+    async def fetch():
+        async with AsyncHttpClient() as client:
+            return await uis_sdmx_collector.fetch_sdmx_chunk(
+                client, ['STAT_UNIT', 'REF_AREA'], {'MSEP.5T8': {'STAT_UNIT': 'MSEP'}}, ['DZA'], 2015, 2016)
+
+    assert asyncio.run(fetch()) is None
+    assert not list(cache.cache_dir.glob('*/*.json'))
+    cache.offline = True
+    with pytest.raises(OfflineCacheMiss):
+        asyncio.run(fetch())
+
+# --- Journal de reprise (CollectionJournal) ---
+
+def test_journal_resume_skips_completed_units(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CollectionJournal(path, [2015, 2016], flush_every=1)
+    journal.record('DZ', 'X', {2015: 1.0, 2016: 2.0})
+    journal.record_chunk('Y', ['DZ', 'TN'], {('DZ', 2015): 3.0, ('TN', 2016): 4.0})
+    journal.close()
+
+    resumed = CollectionJournal(path, [2016, 2015], resume=True)
+    resumed.close()
+    assert resumed.completed == {('DZ', 'X'), ('DZ', 'Y'), ('TN', 'Y')}
+    assert resumed.is_done('TN', 'Y') and not resumed.is_done('TN', 'X')
+    assert resumed.values['X'] == {('DZ', 2015): 1.0, ('DZ', 2016): 2.0}
+    assert resumed.values['Y'] == {('DZ', 2015): 3.0, ('TN', 2016): 4.0}
+
+def test_journal_with_other_years_is_not_resumed(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CollectionJournal(path, [2015], flush_every=1)
+    journal.record('DZ', 'X', {2015: 1.0})
+    journal.close()
+
+    restarted = CollectionJournal(path, [2015, 2016], resume=True)
+    restarted.close()
+    assert restarted.completed == set()
+    assert path.read_text(encoding='utf-8').splitlines() == [json.dumps({'years': [2015, 2016]})]
+
+def test_journal_resume_truncates_torn_line(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CollectionJournal(path, [2015], flush_every=1)
+    journal.record('DZ', 'X', {2015: 1.0})
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"country": "MA", "indic')
+
+    resumed = CollectionJournal(path, [2015], resume=True, flush_every=1)
+    assert resumed.completed == {('DZ', 'X')}
+    resumed.record('MA', 'X', {2015: 5.0})
+    resumed.close()
+
+    # Les unités ajoutées après la reprise survivent à une seconde reprise
+    again = CollectionJournal(path, [2015], resume=True)
+    assert again.completed == {('DZ', 'X'), ('MA', 'X')}
+    assert again.values['X'][('MA', 2015)] == 5.0
+    again.discard()
+    assert not path.exists()
+
+# --- Collecte incrémentale (plan_delta, plan_requests) ---
+
+def test_plan_delta_refetches_revisable_years_and_missing_cells():
+    existing = pd.DataFrame([('DZ', 2015, 1.0), ('DZ', 2016, None), ('DZ', 2019, 2.0), ('TN', 2015, 3.0)],
+                            columns=['country_code', 'year', 'gni_per_capita'])
+    cells = frame_to_cells(existing, ['gni_per_capita', 'life_expectancy'])
+    years = list(range(2015, 2021))
+
+    plan = plan_delta(cells, ['DZ', 'TN'], years, ['gni_per_capita', 'life_expectancy'], revisable_from=2019,
+                      absent={'gni_per_capita': {('TN', 2016), ('TN', 2019)}})
+
+    # Les cellules absentes de la source ne sont pas redemandées, sauf sur les années révisables
+    assert plan['gni_per_capita'] == {
+        ('DZ', 2016), ('DZ', 2017), ('DZ', 2018), ('DZ', 2019), ('DZ', 2020),
+        ('TN', 2017), ('TN', 2018), ('TN', 2019), ('TN', 2020),
+    }
+    assert plan['life_expectancy'] == {(country, year) for country in ['DZ', 'TN'] for year in years}
+
+def test_upsert_cells_only_updates_planned_cells():
+    existing = {('DZ', 2015): 1.0, ('DZ', 2019): 2.0}
+    fetched = {('DZ', 2015): 9.0, ('DZ', 2019): 2.5, ('DZ', 2020): 3.0}
+
+    updated = upsert_cells(existing, fetched, {('DZ', 2019), ('DZ', 2020), ('TN', 2020)})
+
+    assert updated == 2
+    assert existing == {('DZ', 2015): 1.0, ('DZ', 2019): 2.5, ('DZ', 2020): 3.0}
+
+def test_first_revisable_year_is_anchored_to_the_collection_window():
+    assert first_revisable_year(range(2000, 2011), revisable_years=3) == 2008
+
+def test_plan_requests_groups_countries_by_contiguous_year_range():
+    needed = {('DZ', 2016), ('DZ', 2017), ('DZ', 2020), ('TN', 2016), ('TN', 2017), ('MA', 2020)}
+
+    requests = plan_requests(needed, ['TN', 'DZ', 'MA'])
+
+    assert requests == [(['TN', 'DZ'], [2016, 2017]), (['DZ', 'MA'], [2020])]
+    assert {(country, year) for countries, years in requests for country in countries for year in years} == needed
+
+# --- Validation (validate_data) ---
+
+def test_validate_data_quarantines_invalid_cells_and_rows():
+    df = pd.DataFrame([
+        ('DZ', 2015, '150', '20', '-1', '25', '20'),
+        ('TN', 2015, 'abc', '20', '3', '12', '75'),
+        ('TN', 2015, '10', '20', '3', '12', '75'),
+        (None, 2016, '10', '20', '3', '12', '75'),
+    ], columns=['country_code', 'year', 'inbound_mobility_rate', 'outbound_mobility_rate', 'gni_per_capita',
+                'school_life_expectancy', 'life_expectancy'])
+
+    validated, quarantine, report = validate_data(df, 'test')
+
+    # Première occurrence d'une clé en double conservée
+    assert list(zip(validated['country_code'], validated['year'].astype(int))) == [('DZ', 2015), ('TN', 2015)]
+    dz, tn = validated.iloc[0], validated.iloc[1]
+    assert pd.isna(dz['inbound_mobility_rate'])
+    assert pd.isna(dz['gni_per_capita'])
+    # La durée de scolarisation ne peut dépasser l'espérance de vie
+    assert pd.isna(dz['school_life_expectancy']) and dz['life_expectancy'] == 20
+    assert pd.isna(tn['inbound_mobility_rate'])
+    assert tn['gni_per_capita'] == 3
+    assert report['hits'] == {'PERCENT_OUT_OF_RANGE': 1, 'NEGATIVE_VALUE': 1, 'NOT_NUMERIC': 1,
+                              'SCHOOL_LIFE_ABOVE_LIFE_EXPECTANCY': 1, 'MISSING_KEY': 1, 'DUPLICATE_KEY': 1}
+    assert set(quarantine['source']) == {'test'}
+
+def test_validate_data_accepts_outbound_mobility_above_100():
+    df = pd.DataFrame([('COM', 2015, '150', '-2'), ('SYC', 2015, '583', '4')],
+                      columns=['country_code', 'year', 'outbound_mobility_rate', 'inbound_mobility_rate'])
+
+    validated, _, report = validate_data(df, 'test')
+
+    assert validated['outbound_mobility_rate'].tolist() == [150, 583]
+    assert report['hits'] == {'PERCENT_OUT_OF_RANGE': 1}
+
+# --- Pipeline en graphe d'étapes (run_pipeline, StageCache) ---
+
+calls = []
+
+def load_source(path):
+    calls.append('load')
+    return path.read_text(encoding='utf-8')
+
+def count_words(text):
+    calls.append('count')
+    return len(text.split())
+
+def publish(count):
+    calls.append('publish')
+    return count
+
+def dag(path):
+    return [
+        Stage('load', lambda: load_source(path), files=[path], cache=False),
+        Stage('count', count_words, deps=['load']),
+        Stage('publish', publish, deps=['count'], cache=False),
+    ]
+
+def test_run_pipeline_reuses_cached_stages_until_an_input_changes(tmp_path):
+    source = tmp_path / 'source.txt'
+    source.write_text('a b c', encoding='utf-8')
+    cache = StageCache(tmp_path / 'cache')
+    calls.clear()
+
+    assert run_pipeline(dag(source), cache)['publish'] == 3
+    assert calls == ['load', 'count', 'publish']
+
+    # Résultat en cache: la source n'est pas relue, l'étape non mise en cache s'exécute
+    calls.clear()
+    assert run_pipeline(dag(source), cache)['publish'] == 3
+    assert calls == ['publish']
+
+    source.write_text('a b c d', encoding='utf-8')
+    calls.clear()
+    assert run_pipeline(dag(source), cache)['publish'] == 4
+    assert calls == ['load', 'count', 'publish']
+
+    calls.clear()
+    run_pipeline(dag(source), cache, force=True)
+    assert calls == ['load', 'count', 'publish']
+
+def test_sort_stages_rejects_unknown_dependencies_and_cycles():
+    with pytest.raises(ValueError, match='inconnue'):
+        sort_stages([Stage('count', count_words, deps=['load'])])
+    with pytest.raises(ValueError, match='Cycle'):
+        sort_stages([Stage('count', count_words, deps=['publish']), Stage('publish', publish, deps=['count'])])
+
+# --- Fusion des sources (merge_sources) ---
+
+def frame(rows, columns):
+    return pd.DataFrame(rows, columns=columns)
+
+def test_merge_sources_left_policy_keeps_priority_and_counts_conflicts():
+    wb = frame([('DZ', 2015, 1.0), ('DZ', 2016, 2.0), ('DZ', 2016, 99.0), ('TN', 2015, 3.0)],
+               ['country_code', 'year', 'gni_per_capita'])
+    unesco = frame([('DZ', 2015, 1.5, 10.0), ('MA', 2015, None, 20.0), ('TN', 2015, None, 30.0)],
+                   ['country_code', 'year', 'gni_per_capita', 'free_education_years'])
+
+    merged, report = merge_sources([('World Bank', wb), ('UNESCO', unesco)],
+                                   policies={'World Bank': 'outer', 'UNESCO': 'left'})
+
+    assert list(zip(merged['country_code'], merged['year'])) == [('DZ', 2015), ('DZ', 2016), ('TN', 2015)]
+    # Première occurrence d'une clé en double, valeur de la source prioritaire en cas de conflit
+    assert merged['gni_per_capita'].tolist() == [1.0, 2.0, 3.0]
+    assert merged['free_education_years'].isna().tolist() == [False, True, False]
+    assert report['World Bank']['duplicates'] == 1
+    assert report['UNESCO']['outside_panel'] == 1
+    assert report['UNESCO']['conflicts'] == {'gni_per_capita': 1}
+
+def test_merge_sources_outer_policy_adds_keys():
+    wb = frame([('DZ', 2015, 1.0)], ['country_code', 'year', 'gni_per_capita'])
+    unesco = frame([('MA', 2015, 20.0)], ['country_code', 'year', 'free_education_years'])
+
+    merged, _ = merge_sources([('World Bank', wb), ('UNESCO', unesco)],
+                              policies={'World Bank': 'outer', 'UNESCO': 'outer'})
+
+    assert list(zip(merged['country_code'], merged['year'])) == [('DZ', 2015), ('MA', 2015)]
+    assert merged['free_education_years'].isna().tolist() == [True, False]
+
+def test_merge_sources_coalesce_only_fills_existing_columns():
+    wb = frame([('DZ', 2015, None), ('DZ', 2016, 2.0)], ['country_code', 'year', 'gni_per_capita'])
+    fallback = frame([('DZ', 2015, 5.0, 7.0), ('DZ', 2016, 4.0, 8.0)],
+                     ['country_code', 'year', 'gni_per_capita', 'free_education_years'])
+
+    merged, report = merge_sources([('World Bank', wb), ('Fallback', fallback)],
+                                   policies={'World Bank': 'outer', 'Fallback': 'coalesce'})
+
+    assert merged['gni_per_capita'].tolist() == [5.0, 2.0]
+    assert 'free_education_years' not in merged.columns
+    assert report['Fallback']['filled'] == 1
+    assert report['Fallback']['conflicts'] == {'gni_per_capita': 1}
+
+def test_merge_sources_drops_rows_without_key():
+    wb = frame([('DZ', 2015, 1.0), (None, 2015, 2.0)], ['country_code', 'year', 'gni_per_capita'])
+
+    merged, report = merge_sources([('World Bank', wb)])
+
+    assert len(merged) == 1
+    assert report['World Bank']['missing_keys'] == 1
+
+# --- Mise à jour partielle du panel (diff_panels, write_partitions) ---
+
+def panel(rows):
+    return apply_schema(pd.DataFrame(rows, columns=['country_code', 'year', 'region', 'gni_per_capita']))
+
+def change_set(changes):
+    return set(zip(changes['country_code'].astype(str), changes['year'], changes['region'].astype(str),
+                   changes['change']))
+
+def test_diff_panels_reports_inserts_updates_and_deletes():
+    old = panel([('DZ', 2015, 'Africa', 2.0), ('TN', 2015, 'Africa', 3.0), ('FR', 2015, 'Europe', 4.0)])
+    new = panel([('DZ', 2015, 'Africa', 2.5), ('TN', 2015, 'Africa', 3.0), ('IT', 2015, 'Europe', 5.0)])
+
+    assert change_set(diff_panels(new, old)) == {
+        ('DZ', 2015, 'Africa', 'update'), ('IT', 2015, 'Europe', 'insert'), ('FR', 2015, 'Europe', 'delete'),
+    }
+    assert diff_panels(old, old).empty
+
+def test_write_partitions_rewrites_changed_partitions_only(tmp_path):
+    path = tmp_path / 'panel.parquet'
+    old = panel([('DZ', 2014, 'Africa', 1.0), ('DZ', 2015, 'Africa', 2.0), ('FR', 2015, 'Europe', 4.0)])
+    new = panel([('DZ', 2015, 'Africa', 2.0), ('FR', 2015, 'Europe', 4.5)])
+    write_partitioned(old, path)
+    untouched = next(path.glob('region=Africa/year=2015/*.parquet')).stat().st_mtime_ns
+
+    changes = diff_panels(new, old)
+    write_partitions(new, path, list(changes[['region', 'year']].drop_duplicates().itertuples(index=False, name=None)))
+
+    result = read_partitioned(path).sort_values(['country_code', 'year']).reset_index(drop=True)
+    assert list(zip(result['country_code'].astype(str), result['year'], result['gni_per_capita'])) == [
+        ('DZ', 2015, 2.0), ('FR', 2015, 4.5)]
+    assert not (path / 'region=Africa' / 'year=2014').exists()
+    assert next(path.glob('region=Africa/year=2015/*.parquet')).stat().st_mtime_ns == untouched
+
+def test_region_change_rewrites_old_and_new_partitions(tmp_path):
+    path = tmp_path / 'panel.parquet'
+    old = panel([('DZ', 2014, 'Africa', 1.0), ('TN', 2014, 'Africa', 3.0)])
+    new = panel([('DZ', 2014, 'Europe', 1.0), ('TN', 2014, 'Africa', 3.0)])
+    write_partitioned(old, path)
+
+    changes = diff_panels(new, old)
+    assert change_set(changes) == {('DZ', 2014, 'Europe', 'insert'), ('DZ', 2014, 'Africa', 'delete')}
+    write_partitions(new, path, list(changes[['region', 'year']].drop_duplicates().itertuples(index=False, name=None)))
+
+    result = read_partitioned(path).sort_values('country_code').reset_index(drop=True)
+    assert list(zip(result['country_code'].astype(str), result['region'].astype(str))) == [
+        ('DZ', 'Europe'), ('TN', 'Africa')]
+
+def test_upsert_leaves_outputs_untouched_when_panel_is_unchanged(tmp_path, monkeypatch):
+    dataset, csv_path = tmp_path / 'panel.parquet', tmp_path / 'combined_data.csv'
+    monkeypatch.setattr(data_merger, 'FINAL_OUTPUT_DATASET', dataset)
+    monkeypatch.setattr(data_merger, 'FINAL_OUTPUT_FILE', csv_path)
+    monkeypatch.setattr(data_merger, 'has_table', lambda name: True)
+    df = panel([('DZ', 2015, 'Africa', 2.0), ('FR', 2015, 'Europe', 4.0)])
+    write_partitioned(df, dataset)
+    csv_path.write_text('export précédent', encoding='utf-8')
+
+    assert upsert_merged_data(df).empty
+    assert csv_path.read_text(encoding='utf-8') == 'export précédent'
+
+# --- Cube d'agrégats (query_cube, cube_means) ---
+
+def test_country_level_cube_ignores_year_filters(tmp_path):
+    path = tmp_path / 'panel.sqlite'
+    df = panel([('DZ', 2014, 'Africa', 1.0), ('DZ', 2015, 'Africa', 3.0), ('FR', 2015, 'Europe', 4.0)])
+    publish_panel(df, cube=build_cube(df, by_country=True), path=path)
+
+    cells = query_cube(['gni_per_capita'], level='country', min_year=2015, max_year=2015, path=path)
+    assert sorted(cells['country_code']) == ['DZ', 'FR']
+    means = cube_means(['gni_per_capita'], level='country', countries=['DZ'], min_year=2015, path=path)
+    assert means['gni_per_capita'].iloc[0] == 2.0
+    # Au niveau région, les filtres d'années s'appliquent
+    means = cube_means(['gni_per_capita'], regions=['Africa'], min_year=2015, path=path)
+    assert means['gni_per_capita'].iloc[0] == 3.0
+
+# --- Droites de régression (fit_trendlines) ---
+
+def test_fit_trendlines_matches_polyfit():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'region': rng.choice(['Africa', 'Asia', 'Europe'], 300),
+        'gni_per_capita': rng.uniform(500, 60000, 300),
+        'life_expectancy': rng.normal(70, 5, 300),
+    })
+    df.loc[::17, 'life_expectancy'] = np.nan
+    specs = [('gni_per_capita', 'life_expectancy', 'linear'), ('gni_per_capita', 'life_expectancy', 'log')]
+
+    fits = fit_trendlines(df, specs)
+
+    assert len(fits) == 6
+    for fit in fits.itertuples():
+        rows = df[(df['region'] == fit.group) & df['life_expectancy'].notna()]
+        x = rows['gni_per_capita'].to_numpy()
+        x = np.log(x) if fit.transform == 'log' else x
+        y = rows['life_expectancy'].to_numpy()
+        slope, intercept = np.polyfit(x, y, 1)
+        assert fit.n == len(rows)
+        assert fit.slope == pytest.approx(slope, rel=1e-9)
+        assert fit.intercept == pytest.approx(intercept, rel=1e-9)
+        assert fit.r2 == pytest.approx(np.corrcoef(x, y)[0, 1] ** 2, rel=1e-9)